@@ -21,6 +21,23 @@ if config.config_file_name is not None:
 # tell Alembic about your metadata
 target_metadata = SQLModel.metadata
 
+# Search objects created by raw SQL in e5f0b2c94a13 and not part of the models:
+# the FTS5 table and its shadow tables on SQLite, the generated tsvector
+# column and its GIN index on PostgreSQL. Autogenerate must not drop them.
+SEARCH_TABLE_PREFIX = "journalentry_fts"
+SEARCH_COLUMNS = {("journalentry", "search_vector")}
+SEARCH_INDEXES = {"ix_journalentry_search_vector"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith(SEARCH_TABLE_PREFIX):
+        return False
+    if type_ == "column" and (obj.table.name, name) in SEARCH_COLUMNS:
+        return False
+    if type_ == "index" and name in SEARCH_INDEXES:
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -29,6 +46,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -43,6 +61,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,  # so ALTER TYPE / column-type changes are detected
+            include_object=include_object,
         )
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,44 @@
+"""add journal daily rollup
+
+Revision ID: a81c4e27d593
+Revises: f3b6d1e8a274
+Create Date: 2026-10-17 17:31:42.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81c4e27d593'
+down_revision: Union[str, Sequence[str], None] = 'f3b6d1e8a274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('journal_daily_rollup',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('mood', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'mood')
+    )
+    # Seed from existing entries; `python -m app.commands.rebuild_rollups`
+    # does the same for a database that drifted.
+    op.execute(
+        'INSERT INTO journal_daily_rollup (user_id, day, mood, count) '
+        'SELECT user_id, DATE(created_at), mood, COUNT(*) FROM journalentry '
+        'WHERE user_id IS NOT NULL '
+        'GROUP BY user_id, DATE(created_at), mood'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('journal_daily_rollup')
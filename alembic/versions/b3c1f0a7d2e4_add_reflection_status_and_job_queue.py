@@ -0,0 +1,65 @@
+"""add reflection status and reflection job queue
+
+Revision ID: b3c1f0a7d2e4
+Revises: 74920cfa29c9
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c1f0a7d2e4'
+down_revision: Union[str, Sequence[str], None] = '74920cfa29c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'journalentry',
+        sa.Column(
+            'reflection_status',
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+            server_default='pending',
+        ),
+    )
+    # Existing rows were reflected inline; ask_gpt stored its errors as text
+    op.execute(
+        "UPDATE journalentry SET reflection_status = CASE "
+        "WHEN reflection IS NOT NULL AND reflection NOT LIKE 'Error from OpenAI:%' "
+        "THEN 'done' ELSE 'failed' END"
+    )
+    op.create_table('reflectionjob',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['journalentry.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reflectionjob_entry_id', 'reflectionjob', ['entry_id'])
+    op.create_index(
+        'ix_reflectionjob_status_available_at',
+        'reflectionjob',
+        ['status', 'available_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reflectionjob_status_available_at', table_name='reflectionjob')
+    op.drop_index('ix_reflectionjob_entry_id', table_name='reflectionjob')
+    op.drop_table('reflectionjob')
+    with op.batch_alter_table('journalentry') as batch_op:
+        batch_op.drop_column('reflection_status')
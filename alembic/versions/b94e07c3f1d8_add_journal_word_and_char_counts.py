@@ -0,0 +1,76 @@
+"""add journal word and char counts
+
+Revision ID: b94e07c3f1d8
+Revises: a81c4e27d593
+Create Date: 2026-10-17 18:05:27.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b94e07c3f1d8'
+down_revision: Union[str, Sequence[str], None] = 'a81c4e27d593'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'journalentry',
+        sa.Column('word_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'journalentry',
+        sa.Column('char_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Backfill BATCH_SIZE rows at a time in id order so a large table is
+    # never held in memory at once.
+    entries = sa.table(
+        'journalentry',
+        sa.column('id', sa.Integer),
+        sa.column('content', sa.String),
+        sa.column('word_count', sa.Integer),
+        sa.column('char_count', sa.Integer),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(entries.c.id, entries.c.content)
+            .where(entries.c.id > last_id)
+            .order_by(entries.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            entries.update()
+            .where(entries.c.id == sa.bindparam('_id'))
+            .values(
+                word_count=sa.bindparam('_words'), char_count=sa.bindparam('_chars')
+            ),
+            [
+                {
+                    '_id': row.id,
+                    '_words': len((row.content or '').split()),
+                    '_chars': len(row.content or ''),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('journalentry') as batch_op:
+        batch_op.drop_column('char_count')
+        batch_op.drop_column('word_count')
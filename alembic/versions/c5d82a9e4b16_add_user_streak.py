@@ -0,0 +1,37 @@
+"""add user streak
+
+Revision ID: c5d82a9e4b16
+Revises: b94e07c3f1d8
+Create Date: 2026-10-17 18:47:09.385562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d82a9e4b16'
+down_revision: Union[str, Sequence[str], None] = 'b94e07c3f1d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Left empty: each user's row is computed on their first streak read or
+    # journal write (app.streaks.compute_streak).
+    op.create_table('userstreak',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_entry_day', sa.Date(), nullable=True),
+    sa.Column('current', sa.Integer(), nullable=False),
+    sa.Column('longest', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('userstreak')
@@ -0,0 +1,42 @@
+"""add reflection cache table
+
+Revision ID: c7d41e9a5b20
+Revises: b3c1f0a7d2e4
+Create Date: 2026-10-17 11:02:18.664130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d41e9a5b20'
+down_revision: Union[str, Sequence[str], None] = 'b3c1f0a7d2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reflectioncacheentry',
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('model', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('response', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('total_tokens', sa.Integer(), nullable=False),
+    sa.Column('latency_ms', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(
+        'ix_reflectioncacheentry_expires_at', 'reflectioncacheentry', ['expires_at']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reflectioncacheentry_expires_at', table_name='reflectioncacheentry')
+    op.drop_table('reflectioncacheentry')
@@ -0,0 +1,45 @@
+"""add email and journal lookup indexes
+
+Revision ID: d2a8f63c1e97
+Revises: c7d41e9a5b20
+Create Date: 2026-10-17 13:40:05.271893
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f63c1e97'
+down_revision: Union[str, Sequence[str], None] = 'c7d41e9a5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # register_user never checked for existing emails, so refuse to guess
+    # which duplicate account should survive.
+    duplicates = op.get_bind().execute(
+        sa.text('SELECT email FROM "user" GROUP BY email HAVING COUNT(*) > 1')
+    ).fetchall()
+    if duplicates:
+        emails = ", ".join(row[0] for row in duplicates[:10])
+        raise RuntimeError(
+            f"Cannot add unique index on user.email; merge or remove duplicate "
+            f"accounts first: {emails}"
+        )
+    op.create_index('ix_user_email', 'user', ['email'], unique=True)
+    op.create_index(
+        'ix_journalentry_user_id_created_at',
+        'journalentry',
+        ['user_id', sa.text('created_at DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_journalentry_user_id_created_at', table_name='journalentry')
+    op.drop_index('ix_user_email', table_name='user')
@@ -0,0 +1,35 @@
+"""add journal data version
+
+Revision ID: d4e91b7a3c58
+Revises: c5d82a9e4b16
+Create Date: 2026-10-17 21:12:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e91b7a3c58'
+down_revision: Union[str, Sequence[str], None] = 'c5d82a9e4b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Left empty: a missing row reads as version 0 and the first write
+    # creates it (app.etags.bump_data_version).
+    op.create_table('journal_data_version',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('journal_data_version')
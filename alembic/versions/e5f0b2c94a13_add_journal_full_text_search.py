@@ -0,0 +1,75 @@
+"""add journal full-text search
+
+Revision ID: e5f0b2c94a13
+Revises: d2a8f63c1e97
+Create Date: 2026-10-17 15:26:51.903377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f0b2c94a13'
+down_revision: Union[str, Sequence[str], None] = 'd2a8f63c1e97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS journalentry_fts USING fts5("
+    "title, content, user_id, content='journalentry', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS journalentry_fts_ai AFTER INSERT ON journalentry BEGIN "
+    "INSERT INTO journalentry_fts(rowid, title, content, user_id) "
+    "VALUES (new.id, new.title, new.content, new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS journalentry_fts_ad AFTER DELETE ON journalentry BEGIN "
+    "INSERT INTO journalentry_fts(journalentry_fts, rowid, title, content, user_id) "
+    "VALUES ('delete', old.id, old.title, old.content, old.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS journalentry_fts_au "
+    "AFTER UPDATE OF title, content ON journalentry BEGIN "
+    "INSERT INTO journalentry_fts(journalentry_fts, rowid, title, content, user_id) "
+    "VALUES ('delete', old.id, old.title, old.content, old.user_id); "
+    "INSERT INTO journalentry_fts(rowid, title, content, user_id) "
+    "VALUES (new.id, new.title, new.content, new.user_id); END",
+    # Index the rows that already exist
+    "INSERT INTO journalentry_fts(journalentry_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS journalentry_fts_au",
+    "DROP TRIGGER IF EXISTS journalentry_fts_ad",
+    "DROP TRIGGER IF EXISTS journalentry_fts_ai",
+    "DROP TABLE IF EXISTS journalentry_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "ALTER TABLE journalentry ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_journalentry_search_vector "
+    "ON journalentry USING GIN (search_vector)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_journalentry_search_vector",
+    "ALTER TABLE journalentry DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE}
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
@@ -0,0 +1,39 @@
+"""add id to journal lookup index
+
+Revision ID: f3b6d1e8a274
+Revises: e5f0b2c94a13
+Create Date: 2026-10-17 16:52:14.608291
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b6d1e8a274'
+down_revision: Union[str, Sequence[str], None] = 'e5f0b2c94a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_journalentry_user_id_created_at', table_name='journalentry')
+    op.create_index(
+        'ix_journalentry_user_id_created_at',
+        'journalentry',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_journalentry_user_id_created_at', table_name='journalentry')
+    op.create_index(
+        'ix_journalentry_user_id_created_at',
+        'journalentry',
+        ['user_id', sa.text('created_at DESC')],
+    )
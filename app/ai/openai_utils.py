@@ -1,23 +1,178 @@
+import asyncio
 import os
-from openai import OpenAI
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from app.ai.reflection_cache import CachedCompletion, cache_key, reflection_cache
+from app.config import (
+    OPENAI_KEEPALIVE_CONNECTIONS,
+    OPENAI_MAX_CONCURRENCY,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MODEL,
+    OPENAI_TIMEOUT_SECONDS,
+)
+from app.metrics import observe_openai
+
 load_dotenv()  # Load .env file
 
-# Create OpenAI client using key from environment
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+SYSTEM_PROMPT = "You are a helpful assistant."
 
+# The async client, its keep-alive connection pool and the concurrency
+# semaphore all belong to one event loop, so they are created lazily on first
+# use and rebuilt if a different loop shows up (tests, CLI scripts).
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
 
-def ask_gpt(prompt: str, model="gpt-3.5-turbo", temperature=0.7) -> str:
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=temperature,
+
+def get_async_client() -> AsyncOpenAI:
+    global _loop, _client, _semaphore
+    loop = asyncio.get_running_loop()
+    if _client is None or _loop is not loop:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=30,
+            ),
+            timeout=OPENAI_TIMEOUT_SECONDS,
+        )
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client
         )
-        return response.choices[0].message.content.strip()
+        _semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+        _loop = loop
+    return _client
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    get_async_client()
+    return _semaphore
+
+
+async def close_async_client() -> None:
+    global _loop, _client, _semaphore
+    if _client is not None:
+        await _client.close()
+    _loop = _client = _semaphore = None
+
+
+async def _request_completion(
+    prompt: str, model: str, temperature: float
+) -> CachedCompletion:
+    client = get_async_client()
+    async with get_semaphore():
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=temperature,
+            )
+        except Exception:
+            observe_openai("completion", "error", time.perf_counter() - started)
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+    observe_openai("completion", "ok", latency_ms / 1000)
+    usage = getattr(response, "usage", None)
+    return CachedCompletion(
+        text=response.choices[0].message.content.strip(),
+        total_tokens=getattr(usage, "total_tokens", 0) or 0,
+        latency_ms=latency_ms,
+    )
+
+
+async def acomplete(
+    prompt: str, model=OPENAI_MODEL, temperature=0.7, use_cache: bool = True
+) -> str:
+    """Run a chat completion and return the stripped text.
+
+    Answers are served from the reflection cache when possible. At most
+    ``OPENAI_MAX_CONCURRENCY`` upstream calls are in flight per process; the
+    rest wait on the semaphore without blocking the event loop. Raises on
+    failure (errors are never cached), so callers that retry can tell errors
+    apart from answers.
+    """
+    if not use_cache:
+        return (await _request_completion(prompt, model, temperature)).text
+    key = cache_key(model, temperature, SYSTEM_PROMPT, prompt)
+    return await reflection_cache.get_or_compute(
+        key, model, lambda: _request_completion(prompt, model, temperature)
+    )
+
+
+async def astream(
+    prompt: str, model=OPENAI_MODEL, temperature=0.7
+) -> AsyncIterator[str]:
+    """Yield completion text as the model produces it.
+
+    A cached answer is yielded in one piece. Closing the generator early
+    (client went away) closes the upstream HTTP stream as well. The full text
+    is cached once the stream finishes.
+    """
+    key = cache_key(model, temperature, SYSTEM_PROMPT, prompt)
+    cached = await reflection_cache.lookup(key)
+    if cached is not None:
+        yield cached.text
+        return
+
+    client = get_async_client()
+    parts = []
+    total_tokens = 0
+    async with get_semaphore():
+        started = time.perf_counter()
+        try:
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except Exception:
+            observe_openai("stream", "error", time.perf_counter() - started)
+            raise
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    total_tokens = chunk.usage.total_tokens or 0
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not parts:
+                    # Match the stripped non-streaming answer
+                    delta = delta.lstrip()
+                    if not delta:
+                        continue
+                parts.append(delta)
+                yield delta
+        except Exception:
+            observe_openai("stream", "error", time.perf_counter() - started)
+            raise
+        finally:
+            await stream.close()
+        latency_ms = (time.perf_counter() - started) * 1000
+    observe_openai("stream", "ok", latency_ms / 1000)
+
+    text = "".join(parts).strip()
+    if text:
+        await reflection_cache.store(
+            key, model, CachedCompletion(text, total_tokens, latency_ms)
+        )
+
+
+async def ask_gpt(prompt: str, model=OPENAI_MODEL, temperature=0.7) -> str:
+    try:
+        return await acomplete(prompt, model=model, temperature=temperature)
     except Exception as e:
         return f"Error from OpenAI: {e}"
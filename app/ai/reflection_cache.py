@@ -0,0 +1,244 @@
+# app/ai/reflection_cache.py
+"""Content-addressed cache for AI completions.
+
+Keys hash everything that determines the answer (model, temperature, system
+prompt and the whitespace-normalised user prompt). Lookups go in-process LRU
+→ database table → upstream, and identical requests that arrive while one is
+already in flight await that call instead of starting their own.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.config import (
+    REFLECTION_CACHE_PERSIST,
+    REFLECTION_CACHE_SIZE,
+    REFLECTION_CACHE_TTL_SECONDS,
+)
+from app.database import engine as default_engine
+from app.logger import logger
+from app.models import ReflectionCacheEntry
+
+# Expired rows in the persistent tier are swept every this many writes
+SWEEP_EVERY = 100
+
+
+@dataclass
+class CachedCompletion:
+    text: str
+    total_tokens: int = 0
+    latency_ms: float = 0.0
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+def cache_key(model: str, temperature: float, system_prompt: str, prompt: str) -> str:
+    payload = json.dumps(
+        [model, round(float(temperature), 4), system_prompt, normalize_prompt(prompt)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReflectionCache:
+    def __init__(
+        self,
+        engine=None,
+        max_size: int = REFLECTION_CACHE_SIZE,
+        ttl_seconds: int = REFLECTION_CACHE_TTL_SECONDS,
+        persist: bool = REFLECTION_CACHE_PERSIST,
+    ):
+        self.engine = engine or default_engine
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._memory: "OrderedDict[str, Tuple[float, CachedCompletion]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._writes = 0
+        self.counters = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "tokens_saved": 0,
+            "latency_saved_seconds": 0.0,
+        }
+
+    # -- in-process tier -------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[CachedCompletion]:
+        item = self._memory.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires <= time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: CachedCompletion) -> None:
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    # -- persistent tier -------------------------------------------------
+
+    def _db_get(self, key: str) -> Optional[CachedCompletion]:
+        with Session(self.engine) as session:
+            row = session.get(ReflectionCacheEntry, key)
+            if row is None or row.expires_at <= datetime.utcnow():
+                return None
+            return CachedCompletion(row.response, row.total_tokens, row.latency_ms)
+
+    def _db_put(
+        self, key: str, model: str, value: CachedCompletion, sweep: bool
+    ) -> None:
+        now = datetime.utcnow()
+        with Session(self.engine) as session:
+            session.merge(
+                ReflectionCacheEntry(
+                    key=key,
+                    model=model,
+                    response=value.text,
+                    total_tokens=value.total_tokens,
+                    latency_ms=value.latency_ms,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                )
+            )
+            if sweep:
+                session.execute(
+                    delete(ReflectionCacheEntry).where(
+                        ReflectionCacheEntry.expires_at <= now
+                    )
+                )
+            session.commit()
+
+    async def _lookup_db(self, key: str) -> Optional[CachedCompletion]:
+        if not self.persist:
+            return None
+        try:
+            return await asyncio.to_thread(self._db_get, key)
+        except Exception as e:
+            logger.warning("Reflection cache read failed: %s", e)
+            return None
+
+    async def _store_db(self, key: str, model: str, value: CachedCompletion) -> None:
+        if not self.persist:
+            return
+        # Counted on the loop, like the other counters, not in the worker thread
+        self._writes += 1
+        sweep = self._writes % SWEEP_EVERY == 0
+        try:
+            await asyncio.to_thread(self._db_put, key, model, value, sweep)
+        except Exception as e:
+            logger.warning("Reflection cache write failed: %s", e)
+
+    # -- public API ------------------------------------------------------
+
+    def _hit(self, counter: str, value: CachedCompletion) -> str:
+        self.counters[counter] += 1
+        self.counters["tokens_saved"] += value.total_tokens
+        self.counters["latency_saved_seconds"] += value.latency_ms / 1000
+        return value.text
+
+    async def get_or_compute(
+        self,
+        key: str,
+        model: str,
+        compute: Callable[[], Awaitable[CachedCompletion]],
+    ) -> str:
+        while True:
+            value = self._memory_get(key)
+            if value is not None:
+                return self._hit("memory_hits", value)
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                value = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading request was cancelled; try again ourselves
+                continue
+            return self._hit("coalesced", value)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._lookup_db(key)
+            if value is not None:
+                self._memory_put(key, value)
+                future.set_result(value)
+                return self._hit("db_hits", value)
+
+            self.counters["misses"] += 1
+            value = await compute()
+            self._memory_put(key, value)
+            future.set_result(value)
+            await self._store_db(key, model, value)
+            return value.text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # followers re-raise it; don't warn if there are none
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def lookup(self, key: str) -> Optional[CachedCompletion]:
+        """Plain two-tier lookup for callers that cannot share a result
+        through ``get_or_compute`` (streaming). Counts a miss if absent."""
+        value = self._memory_get(key)
+        if value is not None:
+            self._hit("memory_hits", value)
+            return value
+        value = await self._lookup_db(key)
+        if value is not None:
+            self._memory_put(key, value)
+            self._hit("db_hits", value)
+            return value
+        self.counters["misses"] += 1
+        return None
+
+    async def store(self, key: str, model: str, value: CachedCompletion) -> None:
+        self._memory_put(key, value)
+        await self._store_db(key, model, value)
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        lookups = (
+            self.counters["memory_hits"]
+            + self.counters["db_hits"]
+            + self.counters["coalesced"]
+            + self.counters["misses"]
+        )
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "latency_saved_seconds": round(self.counters["latency_saved_seconds"], 3),
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_max_entries": self.max_size,
+        }
+
+
+reflection_cache = ReflectionCache()
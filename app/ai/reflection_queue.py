@@ -0,0 +1,282 @@
+# app/ai/reflection_queue.py
+"""Durable reflection queue and the background workers that drain it.
+
+Journal entries are committed together with a ``ReflectionJob`` row. Workers
+running on the app's event loop claim jobs from that table, ask the model for
+a reflection and write it back, retrying failed attempts with exponential
+backoff. Because the queue lives in the database, jobs survive restarts and
+can be shared by several API processes.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, delete, or_, update
+from sqlmodel import Session, select
+
+from app.ai.openai_utils import acomplete
+from app.config import (
+    REFLECTION_JOB_TIMEOUT_SECONDS,
+    REFLECTION_MAX_ATTEMPTS,
+    REFLECTION_POLL_SECONDS,
+    REFLECTION_RETRY_BASE_SECONDS,
+    REFLECTION_RETRY_MAX_SECONDS,
+    REFLECTION_WORKERS,
+)
+from app.database import engine as default_engine
+from app.etags import bump_data_version
+from app.logger import logger
+from app.models import JobStatus, JournalEntry, ReflectionJob, ReflectionStatus
+
+CompletionFn = Callable[[str], Awaitable[str]]
+
+
+def build_reflection_prompt(title: str, mood: str, content: str) -> str:
+    return f"Reflect on the following journal entry:\n\nTitle: {title}\nMood: {mood}\nContent:\n{content}"
+
+
+def enqueue_reflection(session: Session, entry: JournalEntry) -> ReflectionJob:
+    """Queue a reflection for ``entry`` inside the caller's transaction.
+
+    The entry must already have an id (add + flush it first).
+    """
+    entry.reflection_status = ReflectionStatus.PENDING.value
+    job = ReflectionJob(entry_id=entry.id)
+    session.add(job)
+    return job
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with a little jitter, capped at the configured max."""
+    delay = REFLECTION_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    delay = min(delay, REFLECTION_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _claimable(now: datetime):
+    stale = now - timedelta(seconds=REFLECTION_JOB_TIMEOUT_SECONDS)
+    return or_(
+        and_(
+            ReflectionJob.status == JobStatus.QUEUED.value,
+            ReflectionJob.available_at <= now,
+        ),
+        # A worker died mid-job: hand the job to someone else
+        and_(
+            ReflectionJob.status == JobStatus.RUNNING.value,
+            ReflectionJob.locked_at < stale,
+        ),
+    )
+
+
+def claim_next_job(engine=default_engine) -> Optional[ReflectionJob]:
+    """Atomically move the oldest due job to ``running`` and return it."""
+    with Session(engine) as session:
+        for _ in range(5):
+            now = datetime.utcnow()
+            job_id = session.exec(
+                select(ReflectionJob.id)
+                .where(_claimable(now))
+                .order_by(ReflectionJob.available_at)
+                .limit(1)
+            ).first()
+            if job_id is None:
+                return None
+            # Conditional UPDATE: only one worker can win the row
+            claimed = session.execute(
+                update(ReflectionJob)
+                .where(ReflectionJob.id == job_id, _claimable(now))
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    locked_at=now,
+                    attempts=ReflectionJob.attempts + 1,
+                )
+            )
+            session.commit()
+            if claimed.rowcount == 1:
+                return session.get(ReflectionJob, job_id)
+    return None
+
+
+def load_prompt(engine, entry_id: int) -> Optional[str]:
+    with Session(engine) as session:
+        entry = session.get(JournalEntry, entry_id)
+        if not entry:
+            return None
+        return build_reflection_prompt(entry.title, entry.mood, entry.content)
+
+
+def complete_job(session: Session, job: ReflectionJob, reflection: str) -> None:
+    """Store ``reflection`` and drop the job, inside the caller's transaction."""
+    user_id = session.execute(
+        update(JournalEntry)
+        .where(JournalEntry.id == job.entry_id)
+        .values(reflection=reflection, reflection_status=ReflectionStatus.DONE.value)
+        .returning(JournalEntry.user_id)
+    ).scalar()
+    if user_id is not None:
+        bump_data_version(session, user_id)
+    session.execute(delete(ReflectionJob).where(ReflectionJob.id == job.id))
+
+
+def record_failure(session: Session, job: ReflectionJob, error: str) -> bool:
+    """Requeue a failed attempt with backoff, or give up after the last one.
+
+    Runs inside the caller's transaction. Returns True if the job will be
+    retried.
+    """
+    retry = job.attempts < REFLECTION_MAX_ATTEMPTS
+    if retry:
+        available_at = datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))
+        values = dict(status=JobStatus.QUEUED.value, available_at=available_at)
+    else:
+        values = dict(status=JobStatus.FAILED.value)
+        user_id = session.execute(
+            update(JournalEntry)
+            .where(JournalEntry.id == job.entry_id)
+            .values(reflection_status=ReflectionStatus.FAILED.value)
+            .returning(JournalEntry.user_id)
+        ).scalar()
+        if user_id is not None:
+            bump_data_version(session, user_id)
+    session.execute(
+        update(ReflectionJob)
+        .where(ReflectionJob.id == job.id)
+        .values(locked_at=None, last_error=error[:1000], **values)
+    )
+    return retry
+
+
+def finish_job(engine, job: ReflectionJob, reflection: str) -> None:
+    with Session(engine) as session:
+        complete_job(session, job, reflection)
+        session.commit()
+
+
+def fail_job(engine, job: ReflectionJob, error: str) -> bool:
+    """Record a failed attempt. Returns True if the job will be retried."""
+    with Session(engine) as session:
+        retry = record_failure(session, job, error)
+        session.commit()
+    return retry
+
+
+def drop_job(engine, job: ReflectionJob) -> None:
+    with Session(engine) as session:
+        session.execute(delete(ReflectionJob).where(ReflectionJob.id == job.id))
+        session.commit()
+
+
+class ReflectionWorkerPool:
+    """A fixed number of asyncio tasks draining the reflection queue."""
+
+    def __init__(
+        self,
+        engine=None,
+        complete: Optional[CompletionFn] = None,
+        size: int = REFLECTION_WORKERS,
+    ):
+        self.engine = engine or default_engine
+        self.complete = complete or acomplete
+        self.size = size
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: Dict[int, Set[asyncio.Event]] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self._tasks or self.size <= 0:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"reflection-worker-{n}")
+            for n in range(self.size)
+        ]
+        logger.info("Started %d reflection workers", self.size)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def notify(self) -> None:
+        """Wake idle workers. Safe to call from sync route handlers."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def wait_for(self, entry_id: int, timeout: float) -> None:
+        """Sleep until this process finishes ``entry_id`` or ``timeout`` passes."""
+        event = asyncio.Event()
+        self._waiters.setdefault(entry_id, set()).add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(entry_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[entry_id]
+
+    def _wake_waiters(self, entry_id: int) -> None:
+        for event in self._waiters.get(entry_id, ()):
+            event.set()
+
+    async def run_once(self) -> bool:
+        """Claim and process a single job. Returns False if the queue is idle."""
+        job = await asyncio.to_thread(claim_next_job, self.engine)
+        if job is None:
+            return False
+        await self._process(job)
+        return True
+
+    async def _process(self, job: ReflectionJob) -> None:
+        prompt = await asyncio.to_thread(load_prompt, self.engine, job.entry_id)
+        if prompt is None:
+            # Entry was deleted while the job was queued
+            await asyncio.to_thread(drop_job, self.engine, job)
+            return
+        try:
+            reflection = await self.complete(prompt)
+        except Exception as e:
+            retry = await asyncio.to_thread(fail_job, self.engine, job, str(e))
+            logger.warning(
+                "Reflection for entry %s failed (attempt %s, retry=%s): %s",
+                job.entry_id,
+                job.attempts,
+                retry,
+                e,
+            )
+            if retry:
+                return
+        else:
+            await asyncio.to_thread(finish_job, self.engine, job, reflection)
+        self._wake_waiters(job.entry_id)
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                if await self.run_once():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Reflection worker %d crashed on a job: %s", n, e, exc_info=e
+                )
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), REFLECTION_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+reflection_workers = ReflectionWorkerPool()
@@ -0,0 +1,56 @@
+# app/ai/streaming.py
+"""Server-sent-event helpers for streaming AI completions."""
+import json
+from typing import AsyncIterator, Callable
+
+import anyio
+from starlette.responses import StreamingResponse
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_completion(
+    tokens: AsyncIterator[str], final: Callable[[str], dict]
+) -> AsyncIterator[str]:
+    """Turn a token stream into ``token`` events and a closing ``done`` event.
+
+    ``final`` builds the ``done`` payload from the full text, so clients that
+    only care about the result get the same JSON the non-streaming route
+    returns. Upstream errors become an ``error`` event.
+    """
+    parts = []
+    try:
+        async for delta in tokens:
+            parts.append(delta)
+            yield sse_event("token", {"delta": delta})
+        yield sse_event("done", final("".join(parts).strip()))
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+    finally:
+        await tokens.aclose()
+
+
+class EventSourceResponse(StreamingResponse):
+    media_type = "text/event-stream"
+
+    def __init__(self, content, **kwargs):
+        headers = {
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # don't let proxies hold back events
+            **(kwargs.pop("headers", None) or {}),
+        }
+        super().__init__(content, headers=headers, **kwargs)
+
+    async def stream_response(self, send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            # When the client disconnects Starlette cancels the send loop and
+            # abandons the body iterator mid-stream. Close it right away so
+            # the upstream completion request is cancelled too.
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                with anyio.CancelScope(shield=True):
+                    await aclose()
@@ -0,0 +1,204 @@
+# app/analytics.py
+"""Per-day mood rollups backing the journal analytics endpoints.
+
+``journal_daily_rollup`` holds one row per (user, UTC day, mood) with the
+number of entries written. The write routes adjust it in the same transaction
+as the entry itself, so the analytics reads touch a few dozen small rows
+instead of every entry the user has ever written.
+"""
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from app.etags import bump_data_version
+from app.models import JournalDailyRollup, JournalEntry, UserStreak
+from app.streaks import compute_streak
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def bump_rollup(
+    session: Session, user_id: int, day: date, mood: str, delta: int
+) -> None:
+    """Add ``delta`` to one (user, day, mood) counter, dropping it at zero."""
+    key = {"user_id": user_id, "day": day, "mood": mood}
+    upsert = _UPSERTS.get(session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(JournalDailyRollup).values(**key, count=delta)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={"count": JournalDailyRollup.count + stmt.excluded.count},
+            )
+        )
+    else:
+        row = session.get(JournalDailyRollup, (user_id, day, mood))
+        if row is None:
+            session.add(JournalDailyRollup(**key, count=delta))
+        else:
+            row.count += delta
+        session.flush()
+    if delta < 0:
+        session.execute(
+            delete(JournalDailyRollup).where(
+                JournalDailyRollup.user_id == user_id,
+                JournalDailyRollup.day == day,
+                JournalDailyRollup.mood == mood,
+                JournalDailyRollup.count <= 0,
+            )
+        )
+
+
+def rollup_entry_added(session: Session, entry: JournalEntry) -> None:
+    bump_rollup(session, entry.user_id, entry.created_at.date(), entry.mood, 1)
+
+
+def rollup_entry_removed(
+    session: Session, entry: JournalEntry, mood: Optional[str] = None
+) -> None:
+    """Undo ``rollup_entry_added``; pass ``mood`` if the entry's has changed."""
+    mood = entry.mood if mood is None else mood
+    bump_rollup(session, entry.user_id, entry.created_at.date(), mood, -1)
+
+
+def rebuild_rollups(session: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups from journalentry (one user, or everyone).
+
+    The streaks of the affected users are recomputed from the new rollups
+    and their ETags invalidated, since their analytics reads change.
+    Returns the number of rollup rows written. The caller commits.
+    """
+    clear = delete(JournalDailyRollup)
+    counts = select(
+        JournalEntry.user_id,
+        func.date(JournalEntry.created_at),
+        JournalEntry.mood,
+        func.count(),
+    ).where(JournalEntry.user_id.is_not(None))
+    if user_id is not None:
+        clear = clear.where(JournalDailyRollup.user_id == user_id)
+        counts = counts.where(JournalEntry.user_id == user_id)
+    counts = counts.group_by(
+        JournalEntry.user_id, func.date(JournalEntry.created_at), JournalEntry.mood
+    )
+    if user_id is not None:
+        users = {user_id}
+    else:
+        # Users whose last entry is gone still have rows to reset
+        users = set(session.exec(select(JournalDailyRollup.user_id).distinct()))
+        users.update(session.exec(select(UserStreak.user_id)))
+    session.execute(clear)
+    result = session.execute(
+        insert(JournalDailyRollup).from_select(
+            ["user_id", "day", "mood", "count"], counts
+        )
+    )
+    if user_id is None:
+        users.update(session.exec(select(JournalDailyRollup.user_id).distinct()))
+    for affected in sorted(users):
+        compute_streak(session, affected)
+        bump_data_version(session, affected)
+    return result.rowcount
+
+
+def daily_mood_counts(
+    session: Session, user_id: int, since: Optional[date] = None
+) -> List[Tuple[date, str, int]]:
+    """(day, mood, count) rows for a user, oldest day first."""
+    stmt = select(
+        JournalDailyRollup.day, JournalDailyRollup.mood, JournalDailyRollup.count
+    ).where(JournalDailyRollup.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(JournalDailyRollup.day >= since)
+    return session.exec(
+        stmt.order_by(JournalDailyRollup.day, JournalDailyRollup.mood)
+    ).all()
+
+
+def journal_stats_query(user_id: int):
+    """One-row aggregate over a user's entries, constant size for any history.
+
+    The most common mood comes from the rollup (ties go to the mood that
+    sorts first) rather than a GROUP BY over every entry.
+    """
+    most_common_mood = (
+        select(JournalDailyRollup.mood)
+        .where(JournalDailyRollup.user_id == user_id, JournalDailyRollup.mood != "")
+        .group_by(JournalDailyRollup.mood)
+        .order_by(func.sum(JournalDailyRollup.count).desc(), JournalDailyRollup.mood)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return select(
+        func.count(JournalEntry.id).label("total_entries"),
+        func.coalesce(func.sum(JournalEntry.word_count), 0).label("total_words"),
+        func.coalesce(func.sum(JournalEntry.char_count), 0).label("total_characters"),
+        func.min(JournalEntry.created_at).label("first_entry"),
+        func.max(JournalEntry.created_at).label("latest_entry"),
+        most_common_mood.label("most_common_mood"),
+    ).where(JournalEntry.user_id == user_id)
+
+
+def _raw_mood_counts(session, user_id, lower, upper, upper_inclusive) -> Counter:
+    stmt = select(JournalEntry.mood, func.count(JournalEntry.id)).where(
+        JournalEntry.user_id == user_id
+    )
+    if lower is not None:
+        stmt = stmt.where(JournalEntry.created_at >= lower)
+    if upper is not None:
+        stmt = stmt.where(
+            JournalEntry.created_at <= upper
+            if upper_inclusive
+            else JournalEntry.created_at < upper
+        )
+    return Counter(dict(session.exec(stmt.group_by(JournalEntry.mood)).all()))
+
+
+def mood_counts(
+    session: Session,
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Entries per mood with ``start <= created_at <= end``.
+
+    Whole days come from the rollup; a partial day at either edge of the
+    range is counted from the raw entries of that day only.
+    """
+    first_day = None
+    if start is not None:
+        first_day = start.date()
+        if start.time() != time.min:
+            first_day += timedelta(days=1)
+    last_day = None if end is None else end.date() - timedelta(days=1)
+
+    if first_day is not None and last_day is not None and first_day > last_day:
+        return dict(_raw_mood_counts(session, user_id, start, end, True))
+
+    stmt = select(JournalDailyRollup.mood, func.sum(JournalDailyRollup.count)).where(
+        JournalDailyRollup.user_id == user_id
+    )
+    if first_day is not None:
+        stmt = stmt.where(JournalDailyRollup.day >= first_day)
+    if last_day is not None:
+        stmt = stmt.where(JournalDailyRollup.day <= last_day)
+    counts = Counter(
+        {
+            mood: int(n)
+            for mood, n in session.exec(stmt.group_by(JournalDailyRollup.mood)).all()
+        }
+    )
+
+    if start is not None and start.time() != time.min:
+        counts += _raw_mood_counts(
+            session, user_id, start, datetime.combine(first_day, time.min), False
+        )
+    if end is not None:
+        edge = datetime.combine(last_day + timedelta(days=1), time.min)
+        counts += _raw_mood_counts(session, user_id, edge, end, True)
+    return dict(counts)
@@ -1,30 +1,42 @@
 # app/auth.py
-from passlib.context import CryptContext
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
 from jose import jwt, JWTError
 from sqlmodel import Session, select
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from app.logger import logger
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.logger import log_noisy, logger
 
 
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    LOG_AUTH_SAMPLE_RATE,
+    PRINCIPAL_CACHE_SIZE,
+)
 from app.models import User, UserCreate
-from app.database import engine
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.database import get_async_session, get_session
+from app.passwords import password_hasher
 
 # ← this must match your login path exactly:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-logger.info(f"OAuth2PasswordBearer configured with tokenUrl: /auth/login")
+logger.info("OAuth2PasswordBearer configured with tokenUrl: /auth/login")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return password_hasher.verify(plain, hashed)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -36,45 +48,207 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    logger.info(
-        f"get_current_user called with token: {token[:20] if token else 'None'}..."
-    )
-    credentials_exception = HTTPException(
+class PrincipalCache:
+    """Per-process LRU of authenticated users, keyed by a digest of the token.
+
+    An entry lives until its token's ``exp``, so a hit can skip both JWT
+    verification and the user query. Changes to a ``User`` row made through
+    the ORM evict that user (see the mapper events below); other processes
+    only see such changes once the token expires or their entry is evicted.
+    """
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()  # sync routes run in the threadpool
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[User]:
+        key = self._key(token)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, user = item
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def put(self, token: str, user: User, expires_at: float) -> None:
+        # Cache a detached copy so no request can see another one's session
+        principal = User(
+            id=user.id, email=user.email, hashed_password=user.hashed_password
+        )
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [k for k, (_, u) in self._entries.items() if u.id == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Not authenticated",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_claims(token: str) -> Tuple[str, Optional[int]]:
+    """(subject email, exp) of a valid token; 401 otherwise."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.info(f"Decoded payload: {payload}")
-        email: str = payload.get("sub")
-        if not email:
-            raise credentials_exception
-        with Session(engine) as session:
-            user = session.exec(select(User).where(User.email == email)).first()
-            logger.info("Found user: " + (user.email if user else "None"))
-            if not user:
-                raise credentials_exception
-            return user
     except JWTError as e:
-        logger.info("JWT Error: " + str(e))
-        raise credentials_exception
+        log_noisy("auth.invalid_token", logging.INFO, "JWT Error: %s", e)
+        raise _credentials_exception()
+    email: str = payload.get("sub")
+    if not email:
+        raise _credentials_exception()
+    return email, payload.get("exp")
+
+
+def _principal(token: str, user: Optional[User], email: str, exp) -> User:
+    if not user:
+        log_noisy(
+            "auth.unknown_subject", logging.INFO, "Token subject not found: %s", email
+        )
+        raise _credentials_exception()
+    if exp:
+        principal_cache.put(token, user, exp)
+    return user
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
+):
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+
+    email, exp = _token_claims(token)
+    user = session.exec(select(User).where(User.email == email)).first()
+    return _principal(token, user, email, exp)
+
+
+def get_principal(
+    user: User = Depends(get_current_user), session: Session = Depends(get_session)
+):
+    """``get_current_user`` for routes that never query the database.
+
+    Hands the request's connection back to the pool right after the token
+    lookup instead of holding it for the rest of a (possibly slow) request.
+    """
+    session.close()
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+):
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+
+    email, exp = _token_claims(token)
+    user = (await session.exec(select(User).where(User.email == email))).first()
+    return _principal(token, user, email, exp)
+
+
+def register_user(session: Session, user_data: UserCreate):
+    existing = session.exec(
+        select(User.id).where(User.email == user_data.email)
+    ).first()
+    if existing is not None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    hashed = hash_password(user_data.password)
+    db_user = User(email=user_data.email, hashed_password=hashed)
+    session.add(db_user)
+    session.commit()
+    session.refresh(db_user)
+    return db_user
+
+
+async def register_user_async(session: AsyncSession, user_data: UserCreate):
+    existing = (
+        await session.exec(select(User.id).where(User.email == user_data.email))
+    ).first()
+    if existing is not None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    hashed = await password_hasher.hash_async(user_data.password)
+    db_user = User(email=user_data.email, hashed_password=hashed)
+    session.add(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    return db_user
+
+
+def _log_login(user: User) -> None:
+    log_noisy(
+        "auth.login",
+        logging.INFO,
+        "User %s logged in",
+        user.id,
+        sample_rate=LOG_AUTH_SAMPLE_RATE,
+    )
 
 
-def register_user(user_data: UserCreate):
-    with Session(engine) as session:
-        hashed = hash_password(user_data.password)
-        db_user = User(email=user_data.email, hashed_password=hashed)
-        session.add(db_user)
+def authenticate_user(session: Session, email: str, password: str):
+    user = session.exec(select(User).where(User.email == email)).first()
+    if not user or not verify_password(password, user.hashed_password):
+        return None
+    if password_hasher.needs_rehash(user.hashed_password):
+        # Only now do we have the plaintext to re-hash at the current cost
+        user.hashed_password = hash_password(password)
+        session.add(user)
         session.commit()
-        session.refresh(db_user)
-        return db_user
-
-
-def authenticate_user(email: str, password: str):
-    with Session(engine) as session:
-        user = session.exec(select(User).where(User.email == email)).first()
-        if not user or not verify_password(password, user.hashed_password):
-            return None
-        return user
+        logger.info("Rehashed password of user %s", user.id)
+    _log_login(user)
+    return user
+
+
+async def authenticate_user_async(session: AsyncSession, email: str, password: str):
+    user = (await session.exec(select(User).where(User.email == email))).first()
+    if not user or not await password_hasher.verify_async(
+        password, user.hashed_password
+    ):
+        return None
+    if password_hasher.needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash_async(password)
+        session.add(user)
+        await session.commit()
+        logger.info("Rehashed password of user %s", user.id)
+    _log_login(user)
+    return user
@@ -0,0 +1,188 @@
+# app/batch.py
+"""Batch entry creation for clients syncing entries written offline.
+
+``POST /journals/batch`` validates each item on its own and inserts the valid
+ones in one transaction. Each new entry gets a reflection job that is already
+claimed by the request (``running``, first attempt). The route then asks the
+model for all reflections at once, at most ``JOURNAL_BATCH_CONCURRENCY`` at a
+time, and writes the answers back in a second transaction. So a batch takes
+about one model round trip, not one per entry.
+
+A failed reflection goes back to the queue with the usual backoff, and the
+background workers retry it. If the request dies before writing back, the
+claimed jobs go stale and are picked up the same way.
+
+The session work is handed to ``run(fn, *args)``, which calls
+``fn(session, *args)``: ``run_in_threadpool`` for the sync routes and
+``AsyncSession.run_sync`` for the async ones.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple, Union
+
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from app.ai.openai_utils import acomplete
+from app.ai.reflection_queue import (
+    CompletionFn,
+    build_reflection_prompt,
+    complete_job,
+    record_failure,
+)
+from app.analytics import rollup_entry_added
+from app.config import JOURNAL_BATCH_CONCURRENCY
+from app.etags import bump_data_version
+from app.models import JobStatus, JournalEntry, ReflectionJob, ReflectionStatus
+from app.schemas.journal_schemas import JournalEntryCreate
+from app.serialization import ENTRY_FIELDS
+from app.streaks import compute_streak
+
+Outcome = Union[str, BaseException]
+
+
+def validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+def insert_entries(
+    session: Session, user_id: int, entries: List[JournalEntryCreate]
+) -> List[Tuple[Dict[str, Any], ReflectionJob]]:
+    """Insert the entries with claimed reflection jobs and commit.
+
+    Returns each entry as a JournalEntryResponse-shaped dict with its job.
+    The jobs are detached, so they can be passed to ``record_reflections``
+    after this session is gone.
+    """
+    now = datetime.utcnow()
+    new_entries = [
+        JournalEntry(
+            title=entry.title,
+            content=entry.content,
+            mood=entry.mood,
+            user_id=user_id,
+            reflection_status=ReflectionStatus.PENDING.value,
+        )
+        for entry in entries
+    ]
+    session.add_all(new_entries)
+    session.flush()
+    jobs = [
+        ReflectionJob(
+            entry_id=entry.id,
+            status=JobStatus.RUNNING.value,
+            attempts=1,
+            locked_at=now,
+        )
+        for entry in new_entries
+    ]
+    session.add_all(jobs)
+    for entry in new_entries:
+        rollup_entry_added(session, entry)
+    compute_streak(session, user_id)
+    bump_data_version(session, user_id)
+    session.flush()
+
+    created = []
+    for entry, job in zip(new_entries, jobs):
+        item = {name: getattr(entry, name) for name in ENTRY_FIELDS}
+        item["snippet"] = None
+        session.expunge(job)
+        created.append((item, job))
+    session.commit()
+    return created
+
+
+async def reflect_all(
+    prompts: Sequence[str], complete: CompletionFn, concurrency: int
+) -> List[Outcome]:
+    """Run every prompt concurrently; failures come back as exceptions."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def reflect(prompt: str) -> str:
+        async with semaphore:
+            return await complete(prompt)
+
+    return await asyncio.gather(
+        *(reflect(prompt) for prompt in prompts), return_exceptions=True
+    )
+
+
+def record_reflections(
+    session: Session, jobs: List[ReflectionJob], outcomes: List[Outcome]
+) -> List[bool]:
+    """Write answers back and requeue failures in one transaction.
+
+    Returns, per failed job, whether it will be retried (True for successes).
+    """
+    retried = []
+    for job, outcome in zip(jobs, outcomes):
+        if isinstance(outcome, BaseException):
+            error = str(outcome) or type(outcome).__name__
+            retried.append(record_failure(session, job, error))
+        else:
+            complete_job(session, job, outcome)
+            retried.append(True)
+    session.commit()
+    return retried
+
+
+async def create_batch(
+    items: List[Dict[str, Any]],
+    user_id: int,
+    run: Callable[..., Awaitable[Any]],
+    complete: CompletionFn = None,
+    concurrency: int = JOURNAL_BATCH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Create the valid items, reflect on them and report every item."""
+    results, valid = [], []
+    for index, raw in enumerate(items):
+        try:
+            valid.append((index, JournalEntryCreate.model_validate(raw)))
+        except ValidationError as e:
+            results.append(
+                {
+                    "index": index,
+                    "status": "invalid",
+                    "entry": None,
+                    "error": validation_message(e),
+                }
+            )
+
+    reflected = 0
+    if valid:
+        created = await run(insert_entries, user_id, [entry for _, entry in valid])
+        prompts = [
+            build_reflection_prompt(item["title"], item["mood"], item["content"])
+            for item, _ in created
+        ]
+        outcomes = await reflect_all(prompts, complete or acomplete, concurrency)
+        retried = await run(record_reflections, [job for _, job in created], outcomes)
+
+        for (index, _), (item, _), outcome, retry in zip(
+            valid, created, outcomes, retried
+        ):
+            error = None
+            if isinstance(outcome, BaseException):
+                error = f"Reflection failed: {outcome or type(outcome).__name__}"
+                if retry:
+                    error += " (queued for retry)"
+                else:
+                    item["reflection_status"] = ReflectionStatus.FAILED.value
+            else:
+                reflected += 1
+                item["reflection"] = outcome
+                item["reflection_status"] = ReflectionStatus.DONE.value
+            results.append(
+                {"index": index, "status": "created", "entry": item, "error": error}
+            )
+
+    results.sort(key=lambda result: result["index"])
+    return {
+        "created": len(valid),
+        "invalid": len(items) - len(valid),
+        "reflected": reflected,
+        "items": results,
+    }
@@ -0,0 +1,214 @@
+# app/bulk.py
+"""Bulk journal transfer: streaming export and batched NDJSON import.
+
+Export walks the user's entries with ``yield_per`` (a server-side cursor on
+Postgres) and encodes one partition at a time, so memory stays flat however
+long the history is. The stream opens its own session: FastAPI closes the
+request's session before a streaming body is sent.
+
+Import reads the request body line by line and inserts valid rows with
+multi-row INSERTs, one transaction per batch. Each batch also queues (or
+defers) reflections and updates rollups, streak and data version, because
+Core inserts skip the ORM hooks the single-entry route relies on.
+"""
+import csv
+import io
+import time
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.analytics import bump_rollup
+from app.etags import bump_data_version
+from app.models import (
+    JobStatus,
+    JournalEntry,
+    ReflectionJob,
+    ReflectionStatus,
+    content_counts,
+)
+from app.schemas.journal_schemas import ImportReport, JournalEntryImport
+from app.serialization import ENTRY_COLUMNS, ENTRY_FIELDS
+from app.streaks import compute_streak
+
+EXPORT_CHUNK_ROWS = 500
+# Reported line errors; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+# A longer "line" is almost certainly not NDJSON
+MAX_LINE_BYTES = 1024 * 1024
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_statement(user_id: int):
+    return (
+        select(*ENTRY_COLUMNS)
+        .where(JournalEntry.user_id == user_id)
+        .order_by(JournalEntry.created_at, JournalEntry.id)
+        .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    )
+
+
+def encode_ndjson(rows: Iterable) -> bytes:
+    return b"".join(
+        orjson.dumps({name: row[name] for name in ENTRY_FIELDS}) + b"\n" for row in rows
+    )
+
+
+def encode_csv(rows: Iterable, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(ENTRY_FIELDS)
+    for row in rows:
+        writer.writerow(
+            row[name].isoformat() if isinstance(row[name], datetime) else row[name]
+            for name in ENTRY_FIELDS
+        )
+    return buffer.getvalue().encode()
+
+
+def export_entries(bind, user_id: int, fmt: str):
+    """Sync body iterator for StreamingResponse (runs in the threadpool)."""
+    with Session(bind) as session:
+        if fmt == "csv":
+            yield encode_csv([], header=True)
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        result = session.execute(export_statement(user_id)).mappings()
+        for partition in result.partitions():
+            yield encode(partition)
+
+
+async def export_entries_async(bind, user_id: int, fmt: str):
+    """``export_entries`` over an AsyncSession on the async engine."""
+    async with AsyncSession(bind) as session:
+        if fmt == "csv":
+            yield encode_csv([], header=True)
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        result = (await session.stream(export_statement(user_id))).mappings()
+        async for partition in result.partitions():
+            yield encode(partition)
+
+
+def insert_batch(
+    session: Session, user_id: int, entries: List[JournalEntryImport], defer: bool
+) -> int:
+    """Insert one batch of imported entries and commit it."""
+    now = datetime.utcnow()
+    rows = []
+    for entry in entries:
+        word_count, char_count = content_counts(entry.content)
+        if entry.reflection:
+            status = ReflectionStatus.DONE.value
+        elif defer:
+            # Left for `python -m app.commands.backfill_reflections`
+            status = ReflectionStatus.DEFERRED.value
+        else:
+            status = ReflectionStatus.PENDING.value
+        rows.append(
+            {
+                "title": entry.title,
+                "content": entry.content,
+                "mood": entry.mood,
+                "user_id": user_id,
+                "created_at": entry.created_at or now,
+                "updated_at": now,
+                "reflection": entry.reflection,
+                "reflection_status": status,
+                "word_count": word_count,
+                "char_count": char_count,
+            }
+        )
+
+    ids = session.scalars(
+        insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+        rows,
+    ).all()
+    jobs = [
+        {
+            "entry_id": entry_id,
+            "status": JobStatus.QUEUED.value,
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+        }
+        for entry_id, row in zip(ids, rows)
+        if row["reflection_status"] == ReflectionStatus.PENDING.value
+    ]
+    if jobs:
+        session.execute(insert(ReflectionJob), jobs)
+
+    per_day = Counter((row["created_at"].date(), row["mood"]) for row in rows)
+    for (day, mood), count in per_day.items():
+        bump_rollup(session, user_id, day, mood, count)
+    compute_streak(session, user_id)
+    bump_data_version(session, user_id)
+    session.commit()
+    return len(ids)
+
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a streamed body into lines without buffering all of it."""
+    pending = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+        if len(pending) > MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=413, detail=f"Line longer than {MAX_LINE_BYTES} bytes"
+            )
+    if pending:
+        yield pending
+
+
+async def import_ndjson(
+    chunks: AsyncIterator[bytes],
+    insert_rows: Callable[[List[JournalEntryImport]], Awaitable[int]],
+    batch_size: int,
+) -> ImportReport:
+    """Validate NDJSON lines and hand them to ``insert_rows`` in batches.
+
+    Invalid lines are skipped and reported; batches already inserted stay
+    committed if a later one fails.
+    """
+    started = time.perf_counter()
+    imported = failed = 0
+    errors, batch = [], []
+    line_number = 0
+    async for line in read_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append(JournalEntryImport.model_validate(orjson.loads(line)))
+        except (orjson.JSONDecodeError, ValidationError) as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                if isinstance(e, ValidationError):
+                    message = e.errors()[0]["msg"]
+                else:
+                    message = str(e)
+                errors.append({"line": line_number, "error": message})
+            continue
+        if len(batch) >= batch_size:
+            imported += await insert_rows(batch)
+            batch = []
+    if batch:
+        imported += await insert_rows(batch)
+
+    seconds = time.perf_counter() - started
+    return ImportReport(
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        seconds=round(seconds, 3),
+        rows_per_second=round(imported / seconds, 1) if seconds else 0.0,
+    )
@@ -0,0 +1,271 @@
+# app/commands/backfill_reflections.py
+"""Generate reflections for entries that never got one or whose call failed.
+
+Usage::
+
+    python -m app.commands.backfill_reflections --concurrency 8 --rpm 300
+    python -m app.commands.backfill_reflections --fake --fake-latency 0.05
+
+Rows are read in id order, ``--chunk-size`` at a time, and reflected with at
+most ``--concurrency`` requests in flight and no more than ``--rpm`` requests
+per minute overall. Each finished chunk is written back with one batched
+UPDATE and its last id is saved to the checkpoint file, so an interrupted run
+resumes where it stopped (``--restart`` ignores the checkpoint). A run that
+gets through every remaining row deletes the checkpoint, so the next one
+starts from the first id again and retries the rows that failed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import delete, or_, update
+from sqlmodel import Session, select
+
+from app.ai.reflection_queue import build_reflection_prompt
+from app.etags import bump_data_version
+from app.logger import logger
+from app.models import JobStatus, JournalEntry, ReflectionJob, ReflectionStatus
+
+CompletionFn = Callable[[str], Awaitable[str]]
+
+# What ask_gpt used to store in place of a reflection when the call failed
+ERROR_PREFIX = "Error from OpenAI:"
+
+
+@dataclass
+class BackfillReport:
+    last_id: int = 0
+    processed: int = 0
+    updated: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.processed / self.elapsed_seconds
+
+
+class RequestBudget:
+    """Spaces requests evenly so no more than ``per_minute`` start per minute."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+def fake_completion(latency: float = 0.05) -> CompletionFn:
+    """Offline stand-in for the model, for dry runs and tests."""
+
+    async def complete(prompt: str) -> str:
+        await asyncio.sleep(latency)
+        title = prompt.split("Title: ", 1)[-1].split("\n", 1)[0]
+        return f"A gentle reflection on '{title}'."
+
+    return complete
+
+
+def needs_backfill():
+    return (
+        or_(
+            JournalEntry.reflection.is_(None),
+            JournalEntry.reflection.startswith(ERROR_PREFIX),
+            JournalEntry.reflection_status == ReflectionStatus.FAILED.value,
+        ),
+        # Pending rows already have a job in the reflection queue
+        JournalEntry.reflection_status != ReflectionStatus.PENDING.value,
+    )
+
+
+def fetch_chunk(engine, after_id: int, size: int) -> List[tuple]:
+    with Session(engine) as session:
+        return session.exec(
+            select(
+                JournalEntry.id,
+                JournalEntry.title,
+                JournalEntry.mood,
+                JournalEntry.content,
+            )
+            .where(JournalEntry.id > after_id, *needs_backfill())
+            .order_by(JournalEntry.id)
+            .limit(size)
+        ).all()
+
+
+def write_chunk(engine, rows: List[dict]) -> None:
+    done = [
+        row["id"]
+        for row in rows
+        if row["reflection_status"] == ReflectionStatus.DONE.value
+    ]
+    with Session(engine) as session:
+        session.execute(update(JournalEntry), rows)
+        if done:
+            # The queue's given-up jobs for these entries are resolved now
+            session.execute(
+                delete(ReflectionJob).where(
+                    ReflectionJob.entry_id.in_(done),
+                    ReflectionJob.status == JobStatus.FAILED.value,
+                )
+            )
+        user_ids = session.exec(
+            select(JournalEntry.user_id)
+            .where(JournalEntry.id.in_([row["id"] for row in rows]))
+            .distinct()
+        ).all()
+        for user_id in user_ids:
+            bump_data_version(session, user_id)
+        session.commit()
+
+
+def load_checkpoint(path: Optional[str]) -> BackfillReport:
+    if not path or not os.path.exists(path):
+        return BackfillReport()
+    with open(path) as f:
+        data = json.load(f)
+    data.pop("rows_per_second", None)
+    return BackfillReport(**data)
+
+
+def save_checkpoint(path: Optional[str], report: BackfillReport) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({**asdict(report), "rows_per_second": report.rows_per_second}, f)
+    os.replace(tmp, path)
+
+
+def clear_checkpoint(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+async def backfill(
+    engine,
+    complete: CompletionFn,
+    chunk_size: int = 200,
+    concurrency: int = 8,
+    requests_per_minute: int = 300,
+    checkpoint_path: Optional[str] = None,
+    max_chunks: Optional[int] = None,
+) -> BackfillReport:
+    report = load_checkpoint(checkpoint_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    budget = RequestBudget(requests_per_minute)
+    started = time.perf_counter() - report.elapsed_seconds
+
+    async def reflect(row) -> dict:
+        entry_id, title, mood, content = row
+        async with semaphore:
+            await budget.wait()
+            try:
+                reflection = await complete(
+                    build_reflection_prompt(title, mood, content)
+                )
+            except Exception as e:
+                logger.warning("Backfill failed for entry %s: %s", entry_id, e)
+                return {
+                    "id": entry_id,
+                    "reflection": None,
+                    "reflection_status": ReflectionStatus.FAILED.value,
+                }
+        return {
+            "id": entry_id,
+            "reflection": reflection,
+            "reflection_status": ReflectionStatus.DONE.value,
+        }
+
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        rows = await asyncio.to_thread(fetch_chunk, engine, report.last_id, chunk_size)
+        if not rows:
+            # Drained: the next run starts over, retrying what failed this time
+            clear_checkpoint(checkpoint_path)
+            break
+        results = await asyncio.gather(*(reflect(row) for row in rows))
+        await asyncio.to_thread(write_chunk, engine, results)
+
+        failed = sum(
+            r["reflection_status"] == ReflectionStatus.FAILED.value for r in results
+        )
+        report.last_id = rows[-1][0]
+        report.processed += len(rows)
+        report.failed += failed
+        report.updated += len(rows) - failed
+        report.elapsed_seconds = time.perf_counter() - started
+        save_checkpoint(checkpoint_path, report)
+        chunks += 1
+        logger.info(
+            "Backfilled up to id %s: %d rows, %d failed, %.1f rows/s",
+            report.last_id,
+            report.processed,
+            report.failed,
+            report.rows_per_second,
+        )
+    return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=300, help="requests per minute")
+    parser.add_argument(
+        "--checkpoint", default=".backfill_reflections.json", help="progress file"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore an existing checkpoint"
+    )
+    parser.add_argument(
+        "--fake", action="store_true", help="use an offline fake model backend"
+    )
+    parser.add_argument("--fake-latency", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    from app.ai.openai_utils import acomplete, close_async_client
+    from app.database import engine
+
+    if args.restart:
+        clear_checkpoint(args.checkpoint)
+    complete = fake_completion(args.fake_latency) if args.fake else acomplete
+
+    async def run() -> BackfillReport:
+        try:
+            return await backfill(
+                engine,
+                complete,
+                chunk_size=args.chunk_size,
+                concurrency=args.concurrency,
+                requests_per_minute=args.rpm,
+                checkpoint_path=args.checkpoint,
+            )
+        finally:
+            await close_async_client()
+
+    report = asyncio.run(run())
+    print(
+        f"Processed {report.processed} entries ({report.updated} updated, "
+        f"{report.failed} failed) in {report.elapsed_seconds:.1f}s "
+        f"= {report.rows_per_second:.1f} entries/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
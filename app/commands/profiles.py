@@ -0,0 +1,140 @@
+# app/commands/profiles.py
+"""Summarise the request profiles written by the profiling middleware.
+
+Usage::
+
+    python -m app.commands.profiles
+    python -m app.commands.profiles --route /journals/mood-trends --top 15
+    python -m app.commands.profiles --route /auth/login --collapsed login.folded
+
+Without ``--route`` it prints one line per route: profiled requests,
+duration percentiles and sample counts. With ``--route`` it also lists the
+hottest frames of that route's merged samples. ``self`` counts samples where
+the frame was running; ``total`` counts samples where it was anywhere on the
+stack. ``--collapsed`` writes the merged stacks for flamegraph.pl or
+speedscope.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import PROFILE_DIR
+
+
+def load_dumps(directory: str, route: Optional[str] = None) -> List[dict]:
+    """Metadata of every complete dump, oldest first"""
+    dumps = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue  # pruned or half-written
+        if route is None or meta.get("route") == route:
+            meta["collapsed_path"] = path[: -len(".json")] + ".collapsed"
+            dumps.append(meta)
+    return dumps
+
+
+def read_stacks(dumps: Iterable[dict]) -> Counter:
+    stacks: Counter = Counter()
+    for meta in dumps:
+        try:
+            with open(meta["collapsed_path"]) as f:
+                for line in f:
+                    stack, _, n = line.rstrip("\n").rpartition(" ")
+                    if stack:
+                        stacks[stack] += int(n)
+        except (OSError, ValueError):
+            continue
+    return stacks
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(dumps: Iterable[dict]) -> List[dict]:
+    by_route: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+    for meta in dumps:
+        by_route[(meta["method"], meta["route"])].append(meta)
+    rows = []
+    for (method, route), metas in by_route.items():
+        durations = [meta["duration_ms"] for meta in metas]
+        rows.append(
+            {
+                "method": method,
+                "route": route,
+                "requests": len(metas),
+                "p50_ms": round(statistics.median(durations), 1),
+                "p95_ms": round(percentile(durations, 95), 1),
+                "max_ms": round(max(durations), 1),
+                "samples": sum(meta["samples"] for meta in metas),
+                "errors": sum(1 for meta in metas if meta["status"] >= 500),
+            }
+        )
+    rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return rows
+
+
+def hot_frames(stacks: Counter, top: int) -> List[Tuple[str, int, int]]:
+    """(frame, self samples, total samples), hottest self time first"""
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    for stack, n in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += n
+        for frame in set(frames):
+            total_counts[frame] += n
+    return [
+        (frame, n, total_counts[frame]) for frame, n in self_counts.most_common(top)
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dir", default=PROFILE_DIR, help="profile directory")
+    parser.add_argument("--route", help="route template, e.g. /journals/{entry_id}")
+    parser.add_argument("--top", type=int, default=20, help="hot frames to list")
+    parser.add_argument("--collapsed", help="write the route's merged stacks here")
+    args = parser.parse_args(argv)
+
+    dumps = load_dumps(args.dir, args.route)
+    if not dumps:
+        print(
+            f"No profiles in {args.dir}" + (f" for {args.route}" if args.route else "")
+        )
+        return
+
+    print(
+        f"{'method':<7} {'route':<40} {'reqs':>5} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'max ms':>8} {'samples':>8} {'5xx':>4}"
+    )
+    for row in summarize(dumps):
+        print(
+            f"{row['method']:<7} {row['route']:<40} {row['requests']:>5} "
+            f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['max_ms']:>8} "
+            f"{row['samples']:>8} {row['errors']:>4}"
+        )
+    if not args.route:
+        return
+
+    stacks = read_stacks(dumps)
+    total = sum(stacks.values()) or 1
+    print(f"\n{'self':>6} {'total':>6}  frame")
+    for frame, self_n, total_n in hot_frames(stacks, args.top):
+        print(f"{self_n / total:>6.1%} {total_n / total:>6.1%}  {frame}")
+    if args.collapsed:
+        with open(args.collapsed, "w") as f:
+            f.writelines(f"{stack} {n}\n" for stack, n in stacks.most_common())
+        print(f"\nWrote {len(stacks)} stacks to {args.collapsed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# app/commands/rebuild_rollups.py
+"""Recompute the daily mood rollups from the journal entries.
+
+Usage::
+
+    python -m app.commands.rebuild_rollups
+    python -m app.commands.rebuild_rollups --user-id 42
+
+The write routes keep ``journal_daily_rollup`` up to date on their own; run
+this after importing data behind the API's back or to repair drift. Each run
+replaces the affected rollup rows, recomputes those users' streaks and
+invalidates their ETags, in a single transaction.
+"""
+import argparse
+import time
+
+from sqlmodel import Session
+
+from app.analytics import rebuild_rollups
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--user-id", type=int, help="only rebuild this user")
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        rows = rebuild_rollups(session, user_id=args.user_id)
+        session.commit()
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt {rows} rollup rows in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # from datetime import timedelta
 
@@ -11,11 +12,105 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 DATABASE_URL = os.getenv(
     "DATABASE_URL", "sqlite:///journal.db"  # Fallback to SQLite for development
 )
+# Serve the journal and auth routes from an AsyncSession (aiosqlite / asyncpg)
+DB_ASYNC = os.getenv("DB_ASYNC", "false") == "true"
+# Connection pool (per engine, per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+
+# Files the app writes at run time (metrics snapshots, rate-limit counters).
+# Defaults to var/ in this checkout, so deployments sharing a host keep apart.
+DATA_DIR = os.getenv(
+    "DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "var"),
+)
 
 # Environment
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 DEBUG = ENVIRONMENT == "development"
 
+# Logging: records are written by a background thread, as JSON lines or text
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Per-logger overrides, e.g. "mindvault=DEBUG,sqlalchemy.engine=INFO"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "httpx=WARNING")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text" if DEBUG else "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # full = drop
+# Noisy events (bad tokens, 4xx): at most BURST lines per event per window
+LOG_THROTTLE_BURST = int(os.getenv("LOG_THROTTLE_BURST", "10"))
+LOG_THROTTLE_SECONDS = float(os.getenv("LOG_THROTTLE_SECONDS", "60"))
+# Fraction of successful logins that are logged
+LOG_AUTH_SAMPLE_RATE = float(os.getenv("LOG_AUTH_SAMPLE_RATE", "0.01"))
+
 # Server
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
+
+# Reflection workers
+REFLECTION_WORKERS = int(os.getenv("REFLECTION_WORKERS", "2"))
+REFLECTION_MAX_ATTEMPTS = int(os.getenv("REFLECTION_MAX_ATTEMPTS", "5"))
+REFLECTION_RETRY_BASE_SECONDS = float(os.getenv("REFLECTION_RETRY_BASE_SECONDS", "2"))
+REFLECTION_RETRY_MAX_SECONDS = float(os.getenv("REFLECTION_RETRY_MAX_SECONDS", "300"))
+REFLECTION_POLL_SECONDS = float(os.getenv("REFLECTION_POLL_SECONDS", "1"))
+REFLECTION_JOB_TIMEOUT_SECONDS = int(os.getenv("REFLECTION_JOB_TIMEOUT_SECONDS", "120"))
+
+# OpenAI
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+OPENAI_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "32"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+
+# Reflection cache
+REFLECTION_CACHE_SIZE = int(os.getenv("REFLECTION_CACHE_SIZE", "1024"))
+REFLECTION_CACHE_TTL_SECONDS = int(os.getenv("REFLECTION_CACHE_TTL_SECONDS", "86400"))
+REFLECTION_CACHE_PERSIST = os.getenv("REFLECTION_CACHE_PERSIST", "true") == "true"
+
+# Auth
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+# bcrypt cost; stored hashes with another cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes for hashing/verifying passwords (0 = inline on the request thread)
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+# Hash/verify jobs admitted at once per process before answering 503
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "16"))
+
+# Rate limiting: counters shared by the worker processes of this deployment
+# ("memory://" keeps them per process). The default file is under DATA_DIR, not
+# a host-wide path, so deployments on one host never share a budget.
+RATE_LIMIT_STORAGE_URI = os.getenv(
+    "RATE_LIMIT_STORAGE_URI", "sqlite:///" + os.path.join(DATA_DIR, "ratelimit.db")
+)
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+# Pagination
+JOURNAL_PAGE_SIZE = int(os.getenv("JOURNAL_PAGE_SIZE", "20"))
+JOURNAL_MAX_PAGE_SIZE = int(os.getenv("JOURNAL_MAX_PAGE_SIZE", "100"))
+
+# Bulk import: rows per multi-row INSERT and per transaction
+JOURNAL_IMPORT_BATCH_SIZE = int(os.getenv("JOURNAL_IMPORT_BATCH_SIZE", "500"))
+
+# Batch create (offline sync): entries per request and reflections in flight
+JOURNAL_BATCH_MAX_ENTRIES = int(os.getenv("JOURNAL_BATCH_MAX_ENTRIES", "50"))
+JOURNAL_BATCH_CONCURRENCY = int(os.getenv("JOURNAL_BATCH_CONCURRENCY", "32"))
+
+# Health: checks are refreshed in the background; probes read the snapshot
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+HEALTH_STALE_SECONDS = float(os.getenv("HEALTH_STALE_SECONDS", "30"))  # then degraded
+HEALTH_DB_TIMEOUT_SECONDS = float(os.getenv("HEALTH_DB_TIMEOUT_SECONDS", "2"))
+
+# Metrics: per-process snapshots in a directory shared by the workers ("" = off)
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(DATA_DIR, "metrics"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Profiling (off unless a sample rate or an admin token is set)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")  # X-Profile header value
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "mindvault-profiles")
+)
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", str(50 * 1024 * 1024)))
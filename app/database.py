@@ -1,6 +1,15 @@
-from sqlmodel import create_engine, SQLModel, Session
-from app.config import DATABASE_URL, DEBUG
+import functools
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import create_engine, SQLModel, Session, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import DATABASE_URL, DB_ASYNC, DEBUG
+from app.db_pool import PoolMetrics, instrument, pool_options
 from app.logger import logger
+from app.metrics import instrument_statements
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
 
 # Create engine with proper configuration
 if DATABASE_URL.startswith("postgresql"):
@@ -9,32 +18,127 @@ if DATABASE_URL.startswith("postgresql"):
         DATABASE_URL,
         echo=DEBUG,  # Only show SQL queries in debug mode
         pool_pre_ping=True,  # Verify connections before use
-        pool_recycle=300,  # Recycle connections every 5 minutes
+        **pool_options(DATABASE_URL),  # DB_POOL_* sizing, recycle, timeout
     )
 else:
     # SQLite configuration (fallback for development)
-    engine = create_engine(DATABASE_URL, echo=DEBUG)
+    engine = create_engine(DATABASE_URL, echo=DEBUG, **pool_options(DATABASE_URL))
+instrument(engine, pool_metrics)
+instrument_statements(engine)
+
+
+# Async driver for each sync URL scheme
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+_async_engine = None
+
+
+def async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its async counterpart"""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+")[0]
+    if dialect == "postgres":
+        dialect = "postgresql"
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def get_async_engine():
+    """Async engine, created on first use so the drivers are only needed then"""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = async_database_url(DATABASE_URL)
+        options = {"echo": DEBUG, **pool_options(url, async_driver=True)}
+        if DATABASE_URL.startswith("postgres"):
+            options.update(pool_pre_ping=True)
+        _async_engine = instrument(
+            create_async_engine(url, **options), async_pool_metrics
+        )
+        instrument_statements(_async_engine)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
 
 
 def create_db_and_tables():
     """Create database tables"""
+    import app.search  # noqa: F401  registers the full-text index DDL
 
     SQLModel.metadata.create_all(engine)
 
 
 def get_session():
-    """Get database session"""
+    """Request-scoped database session.
+
+    FastAPI caches dependencies per request, so ``get_current_user`` and the
+    handler receive this same Session and the request checks out at most one
+    pooled connection. Handlers commit their own unit of work; anything left
+    uncommitted is rolled back when the request ends.
+    """
     with Session(engine) as session:
         yield session
 
 
+def releases_session(endpoint):
+    """Close the request session as soon as a sync handler returns.
+
+    Otherwise its connection stays checked out while FastAPI validates the
+    response on another threadpool worker; under a burst every worker can end
+    up waiting for a connection held by a request waiting for a worker.
+    Results are fully loaded by then, so serialising them needs no database.
+    """
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            kwargs["session"].close()
+
+    return wrapper
+
+
+async def get_async_session():
+    """Get async database session"""
+    # Nothing is lazy-loaded after commit, so handlers can keep using results
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+def pool_stats() -> dict:
+    """Checkout/wait metrics of the sync pool (and the async one if in use)"""
+    stats = {"sync": pool_metrics.snapshot()}
+    if _async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot()
+    return stats
+
+
 # Health check function
 def check_db_connection():
     """Check if database connection is working"""
     try:
         with Session(engine) as session:
-            session.exec("SELECT 1")
+            session.exec(text("SELECT 1"))
         return True
     except Exception as e:
-        logger.info(f"Database connection failed: {e}")
+        logger.info("Database connection failed: %s", e)
         return False
+
+
+async def ping_database():
+    """``SELECT 1`` without blocking the event loop; raises on failure"""
+    if DB_ASYNC:
+        async with get_async_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    else:
+        await run_in_threadpool(_ping_sync)
+
+
+def _ping_sync():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
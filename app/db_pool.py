@@ -0,0 +1,140 @@
+# app/db_pool.py
+"""Connection pool sizing and checkout metrics.
+
+SQLAlchemy has no "checkout started" event, so the wait for a pooled
+connection is timed by wrapping ``QueuePool._do_get`` — the call that blocks
+when every connection is in use and overflow is exhausted.
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT
+
+# A checkout slower than this had to queue behind other requests
+SLOW_CHECKOUT_SECONDS = 0.01
+
+
+class PoolMetrics:
+    """Counters shared by every instrumented pool of one engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.slow_checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "connections_opened": self.connects,
+                "wait_ms_avg": (
+                    round(self.wait_seconds_total / self.checkouts * 1000, 3)
+                    if self.checkouts
+                    else 0.0
+                ),
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+        pool = self.pool
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        return stats
+
+
+class _TimedCheckout:
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() swaps in a fresh pool; keep reporting to the same counters
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, async_driver: bool = False) -> dict:
+    """create_engine() keyword arguments for a sized, instrumented pool.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    if url.startswith("sqlite") and (url.endswith("://") or ":memory:" in url):
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if async_driver else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def instrument(engine, metrics: PoolMetrics):
+    """Attach ``metrics`` to ``engine``'s pool (sync or async engine)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    if isinstance(pool, _TimedCheckout):
+        pool.metrics = metrics
+    metrics.pool = pool
+
+    @event.listens_for(sync_engine, "connect")
+    def _count_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    return engine
@@ -1,29 +1,63 @@
 # app/error_handlers.py
+import logging
+
 from fastapi import Request, HTTPException, FastAPI
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.status import (
     HTTP_422_UNPROCESSABLE_ENTITY,
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
-from app.logger import logger
+from app.etags import NotModified, not_modified_handler
+from app.logger import log_noisy, logger
 
 
 def http_exception_handler(request: Request, exc: HTTPException):
-    logger.warning(f"HTTPException: {exc.detail}")
-    return JSONResponse(status_code=exc.status_code, content={"error": exc.detail})
+    # Client errors arrive at request rate; only server errors are warnings
+    log_noisy(
+        f"http.{exc.status_code}",
+        logging.WARNING if exc.status_code >= 500 else logging.INFO,
+        "HTTP %s on %s %s: %s",
+        exc.status_code,
+        request.method,
+        request.url.path,
+        exc.detail,
+    )
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail},
+        headers=getattr(exc, "headers", None),
+    )
 
 
 def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.warning(f"Validation error: {exc.errors()}")
+    log_noisy(
+        "http.422",
+        logging.INFO,
+        "Validation error on %s %s: %s",
+        request.method,
+        request.url.path,
+        exc.errors(),
+    )
     return JSONResponse(
         status_code=HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"error": "Validation failed", "details": exc.errors()},
+        # A validator's own ValueError sits in "ctx"; encode it like FastAPI does
+        content={
+            "error": "Validation failed",
+            "details": jsonable_encoder(exc.errors()),
+        },
     )
 
 
 def unhandled_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}")
+    logger.error(
+        "Unhandled exception on %s %s: %s",
+        request.method,
+        request.url.path,
+        exc,
+        exc_info=exc,
+    )
     return JSONResponse(
         status_code=HTTP_500_INTERNAL_SERVER_ERROR,
         content={"error": "Something went wrong"},
@@ -35,5 +69,6 @@ def register_exception_handlers(app: FastAPI):
     from fastapi import HTTPException
 
     app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(NotModified, not_modified_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
     app.add_exception_handler(Exception, unhandled_exception_handler)
@@ -0,0 +1,144 @@
+# app/etags.py
+"""Per-user data versions and conditional GETs for the journal read routes.
+
+Everything that changes what a user's journal reads return (entry writes,
+finished or failed reflections, backfills) bumps ``journal_data_version``
+in the same transaction. A read route opts in with
+``dependencies=[Depends(conditional_get)]``. The dependency turns the
+version into a weak ETag and, if the client's ``If-None-Match`` still
+matches, raises ``NotModified``. That becomes a bodiless 304 before the
+handler runs any journal query. Otherwise the ETag is stashed on the request
+state, and ``ETagMiddleware`` adds it to the 200 response. This also works
+for routes that return a ready-made ``Response``.
+
+The tag also hashes the user, the path with its query string and the UTC
+date, because the streak and 7-day summaries change at midnight without
+any write.
+"""
+import hashlib
+from datetime import datetime
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import get_current_user, get_current_user_async
+from app.database import get_async_session, get_session
+from app.models import JournalDataVersion
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+# Responses may be stored, but must be revalidated with the ETag before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def bump_data_version(session: Session, user_id: int) -> None:
+    """Invalidate ``user_id``'s ETags; call inside the writing transaction."""
+    upsert = _UPSERTS.get(session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(JournalDataVersion).values(user_id=user_id, version=1)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={"version": JournalDataVersion.version + 1},
+            )
+        )
+        return
+    updated = session.execute(
+        update(JournalDataVersion)
+        .where(JournalDataVersion.user_id == user_id)
+        .values(version=JournalDataVersion.version + 1)
+    )
+    if not updated.rowcount:
+        session.add(JournalDataVersion(user_id=user_id, version=1))
+        session.flush()
+
+
+def data_version(session: Session, user_id: int) -> int:
+    version = session.execute(
+        select(JournalDataVersion.version).where(JournalDataVersion.user_id == user_id)
+    ).scalar()
+    return version or 0
+
+
+def make_etag(request: Request, user_id: int, version: int) -> str:
+    url = request.url
+    scope = f"{user_id}:{datetime.utcnow().date()}:{url.path}?{url.query}"
+    digest = hashlib.blake2b(scope.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list (or ``*``)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": exc.etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def _check(request: Request, etag: str) -> None:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        raise NotModified(etag)
+    request.state.etag = etag
+
+
+def conditional_get(
+    request: Request,
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+) -> None:
+    """Answer 304 if the client's copy of this read is still current."""
+    _check(request, make_etag(request, user.id, data_version(session, user.id)))
+
+
+async def conditional_get_async(
+    request: Request,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+) -> None:
+    """``conditional_get`` for the AsyncSession routes."""
+    version = await session.run_sync(data_version, user.id)
+    _check(request, make_etag(request, user.id, version))
+
+
+class ETagMiddleware:
+    """Add the ETag chosen by ``conditional_get`` to successful responses."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                if etag:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers["ETag"] = etag
+                    headers["Cache-Control"] = CACHE_CONTROL
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
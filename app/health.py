@@ -0,0 +1,167 @@
+# app/health.py
+"""Health checks refreshed in the background, so probes cost nothing.
+
+``HealthMonitor`` runs in the app lifespan and every
+``HEALTH_CHECK_INTERVAL_SECONDS`` it:
+
+* pings the database, giving up after ``HEALTH_DB_TIMEOUT_SECONDS``;
+* reads memory and disk usage in a thread;
+* reads the pool and password hasher stats.
+
+The results are kept as a snapshot. The ``/health`` probes only read that
+snapshot, with its age. A snapshot older than ``HEALTH_STALE_SECONDS``
+reports the service as degraded, because the monitor itself is stuck (a
+hung ping, or an event loop too busy to run it).
+
+Without a running monitor (scripts, tests that skip the lifespan) a probe
+refreshes a missing or stale snapshot itself.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+import psutil
+
+from app.config import (
+    DATABASE_URL,
+    HEALTH_CHECK_INTERVAL_SECONDS,
+    HEALTH_DB_TIMEOUT_SECONDS,
+    HEALTH_STALE_SECONDS,
+)
+from app.database import ping_database, pool_stats
+from app.logger import logger
+from app.passwords import password_hasher
+
+# Memory or disk usage above this percentage is reported as a warning
+USAGE_WARNING_PERCENT = 85
+
+
+async def check_database(timeout: float) -> dict:
+    try:
+        await asyncio.wait_for(ping_database(), timeout)
+        status, error = "healthy", None
+    except asyncio.TimeoutError:
+        status, error = "unhealthy", f"no answer within {timeout:g}s"
+    except Exception as e:
+        status, error = "unhealthy", str(e)
+    pools = pool_stats()
+    saturated = any(
+        "size" in pool and pool["checked_out"] >= pool["size"] + pool["max_overflow"]
+        for pool in pools.values()
+    )
+    return {
+        "status": status,
+        "error": error,
+        "type": "postgresql" if "postgresql" in DATABASE_URL else "sqlite",
+        "pool": pools,
+        "pool_saturated": saturated,
+    }
+
+
+def check_system() -> dict:
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage("/")
+    return {
+        "memory": {
+            "status": (
+                "healthy" if memory.percent < USAGE_WARNING_PERCENT else "warning"
+            ),
+            "usage_percent": memory.percent,
+            "available_mb": round(memory.available / 1024 / 1024, 2),
+        },
+        "disk": {
+            "status": "healthy" if disk.percent < USAGE_WARNING_PERCENT else "warning",
+            "usage_percent": disk.percent,
+            "free_gb": round(disk.free / 1024 / 1024 / 1024, 2),
+        },
+    }
+
+
+class HealthMonitor:
+    """Background task that keeps the latest health snapshot."""
+
+    def __init__(
+        self,
+        interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+        stale_after: float = HEALTH_STALE_SECONDS,
+        db_timeout: float = HEALTH_DB_TIMEOUT_SECONDS,
+    ):
+        self.interval = interval
+        self.stale_after = stale_after
+        self.db_timeout = db_timeout
+        self.checks: Optional[dict] = None
+        self.checked_at: Optional[datetime] = None
+        self._checked_monotonic = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> None:
+        database = await check_database(self.db_timeout)
+        system = await asyncio.to_thread(check_system)
+        self.checks = {
+            "database": database,
+            "password_hasher": password_hasher.stats(),
+            **system,
+        }
+        self.checked_at = datetime.utcnow()
+        self._checked_monotonic = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Health check failed: %s", e, exc_info=e)
+            await asyncio.sleep(self.interval)
+
+    def age(self) -> Optional[float]:
+        if self.checked_at is None:
+            return None
+        return time.monotonic() - self._checked_monotonic
+
+    async def report(self) -> dict:
+        """The latest snapshot with its age and the overall status."""
+        age = self.age()
+        if not self.running and (age is None or age > self.stale_after):
+            await self.refresh()
+            age = self.age()
+        if self.checks is None:
+            return {
+                "status": "starting",
+                "timestamp": datetime.utcnow().isoformat(),
+                "checked_at": None,
+                "age_seconds": None,
+                "stale": False,
+                "checks": {},
+            }
+
+        stale = age > self.stale_after
+        database = self.checks["database"]
+        degraded = (
+            stale or database["status"] != "healthy" or database["pool_saturated"]
+        )
+        return {
+            "status": "degraded" if degraded else "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "checked_at": self.checked_at.isoformat(),
+            "age_seconds": round(age, 3),
+            "stale": stale,
+            "checks": self.checks,
+        }
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,258 @@
+# app/journals.py
+"""Journal operations shared by the sync and async route modules.
+
+Every function takes an open ``Session`` as its first argument. The sync
+routes pass the request session from ``get_session``; the async routes hand them
+to ``AsyncSession.run_sync``, which runs them on the event loop against the
+async driver. Either way the query logic lives here exactly once.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.ai.reflection_queue import enqueue_reflection, reflection_workers
+from app.analytics import (
+    daily_mood_counts,
+    journal_stats_query,
+    rollup_entry_added,
+    rollup_entry_removed,
+)
+from app.config import REFLECTION_POLL_SECONDS
+from app.etags import bump_data_version
+from app.models import JournalEntry, JournalEntryUpdate, ReflectionStatus
+from app.pagination import decode_cursor, keyset_after, split_page
+from app.schemas.journal_schemas import JournalEntryCreate, ReflectionStatusResponse
+from app.search import apply_search, fts_backend, render_snippet
+from app.serialization import ENTRY_COLUMNS, entry_dict, optional_column
+from app.streaks import streak_entry_added, streak_entry_removed
+
+# Newest first, id breaks ties between entries saved in the same instant
+RECENT_KEYS = [(JournalEntry.created_at, True), (JournalEntry.id, True)]
+
+
+def create_entry(
+    session: Session, user_id: int, entry: JournalEntryCreate
+) -> JournalEntry:
+    # 📦 Save journal; the reflection is filled in by the background workers
+    new_entry = JournalEntry(
+        title=entry.title,
+        content=entry.content,
+        mood=entry.mood,
+        user_id=user_id,
+    )
+    session.add(new_entry)
+    session.flush()
+    enqueue_reflection(session, new_entry)
+    rollup_entry_added(session, new_entry)
+    streak_entry_added(session, user_id, new_entry.created_at)
+    bump_data_version(session, user_id)
+    session.commit()
+    session.refresh(new_entry)
+    return new_entry
+
+
+def list_entries(
+    session: Session,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    paginate: bool = True,
+):
+    """Entries as JournalEntryResponse-shaped dicts (see app.serialization)"""
+    statement = (
+        select(*ENTRY_COLUMNS)
+        .where(JournalEntry.user_id == user_id)
+        .order_by(JournalEntry.created_at.desc(), JournalEntry.id.desc())
+    )
+    if not paginate:
+        return [entry_dict(row) for row in session.execute(statement).mappings()]
+
+    if cursor:
+        statement = statement.where(
+            keyset_after(RECENT_KEYS, decode_cursor(cursor, "recent", [datetime, int]))
+        )
+    rows = session.execute(statement.limit(limit + 1)).mappings().all()
+    rows, next_cursor = split_page(
+        rows, limit, "recent", lambda row: (row["created_at"], row["id"])
+    )
+    return {"items": [entry_dict(row) for row in rows], "next_cursor": next_cursor}
+
+
+def filter_entries(
+    session: Session,
+    user_id: int,
+    mood: Optional[str] = None,
+    search: Optional[str] = None,
+    sort: str = "relevance",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    paginate: bool = True,
+    offset: int = 0,
+):
+    statement = select(*ENTRY_COLUMNS).where(JournalEntry.user_id == user_id)
+    rank = snippet = None
+    if mood:
+        statement = statement.where(JournalEntry.mood == mood)
+    if search:
+        statement, rank, snippet = apply_search(
+            statement,
+            search,
+            fts_backend(session.get_bind()),
+            user_id,
+            ranked=sort == "relevance",
+        )
+    if start_date:
+        statement = statement.where(JournalEntry.created_at >= start_date)
+    if end_date:
+        statement = statement.where(JournalEntry.created_at <= end_date)
+
+    # Absent snippet/rank columns come back as None
+    statement = statement.add_columns(
+        optional_column(snippet, "snippet"), optional_column(rank, "rank")
+    )
+    if rank is None:
+        kind, keys, types = "recent", RECENT_KEYS, [datetime, int]
+    else:
+        kind, keys = "relevance", [(rank, False)] + RECENT_KEYS
+        types = [float, datetime, int]
+    statement = statement.order_by(
+        *(column.desc() if descending else column for column, descending in keys)
+    )
+
+    if not paginate:
+        rows = session.execute(statement.offset(offset).limit(limit)).mappings().all()
+        next_cursor = None
+    else:
+        if cursor:
+            statement = statement.where(
+                keyset_after(keys, decode_cursor(cursor, kind, types))
+            )
+        rows, next_cursor = split_page(
+            session.execute(statement.limit(limit + 1)).mappings().all(),
+            limit,
+            kind,
+            lambda row: (
+                ([row["rank"]] if rank is not None else [])
+                + [row["created_at"], row["id"]]
+            ),
+        )
+
+    if not rows:
+        raise HTTPException(
+            status_code=404, detail="No entries match the given filters"
+        )
+    items = [entry_dict(row, render_snippet(row["snippet"])) for row in rows]
+    if not paginate:
+        return items
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def mood_trends(session: Session, user_id: int) -> list:
+    mood_trends = defaultdict(dict)
+    for day, mood, count in daily_mood_counts(session, user_id):
+        if mood:
+            mood_trends[day.isoformat()][mood] = count
+
+    return [
+        {"date": day, "moods": counts} for day, counts in sorted(mood_trends.items())
+    ]
+
+
+def journal_stats(session: Session, user_id: int) -> dict:
+    stats = session.execute(journal_stats_query(user_id)).one()
+
+    if not stats.total_entries:
+        return {"message": "No journal entries found."}
+
+    return {
+        "total_entries": stats.total_entries,
+        "first_entry": stats.first_entry,
+        "latest_entry": stats.latest_entry,
+        "total_words": stats.total_words,
+        "total_characters": stats.total_characters,
+        "average_words_per_entry": round(stats.total_words / stats.total_entries, 2),
+        "most_common_mood": stats.most_common_mood,
+    }
+
+
+def seven_day_summary(session: Session, user_id: int, today: date) -> dict:
+    last_week = [today - timedelta(days=i) for i in range(6, -1, -1)]
+    rows = daily_mood_counts(session, user_id, since=last_week[0])
+
+    summary = {d.isoformat(): {"count": 0, "moods": {}} for d in last_week}
+    for day, mood, count in rows:
+        grp = summary.get(day.isoformat())
+        if grp is None:  # entries dated in the future
+            continue
+        grp["count"] += count
+        grp["moods"][mood or "unspecified"] = (
+            grp["moods"].get(mood or "unspecified", 0) + count
+        )
+
+    return {"last_7_days": summary}
+
+
+def get_owned_entry(session: Session, entry_id: int, user_id: int) -> JournalEntry:
+    entry = session.get(JournalEntry, entry_id)
+    if not entry or entry.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return entry
+
+
+def update_entry(
+    session: Session, entry_id: int, user_id: int, updated: JournalEntryUpdate
+) -> JournalEntry:
+    entry = get_owned_entry(session, entry_id, user_id)
+    previous_mood = entry.mood
+    for field, value in updated.model_dump(exclude_unset=True).items():
+        setattr(entry, field, value)
+    entry.updated_at = datetime.utcnow()
+    if entry.mood != previous_mood:
+        rollup_entry_removed(session, entry, mood=previous_mood)
+        rollup_entry_added(session, entry)
+    session.add(entry)
+    bump_data_version(session, user_id)
+    session.commit()
+    session.refresh(entry)
+    return entry
+
+
+def delete_entry(session: Session, entry_id: int, user_id: int) -> None:
+    entry = get_owned_entry(session, entry_id, user_id)
+    rollup_entry_removed(session, entry)
+    streak_entry_removed(session, user_id, entry.created_at)
+    session.delete(entry)
+    bump_data_version(session, user_id)
+    session.commit()
+
+
+async def wait_for_reflection(
+    load_entry: Callable[[], Awaitable[JournalEntry]], entry_id: int, timeout: float
+) -> ReflectionStatusResponse:
+    """Return the reflection state, optionally long-polling until it is ready.
+
+    ``load_entry`` re-reads the (owned) entry; the sync routes run it in the
+    threadpool, the async routes on an ``AsyncSession``.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        entry = await load_entry()
+        remaining = deadline - loop.time()
+        if entry.reflection_status != ReflectionStatus.PENDING.value or remaining <= 0:
+            return ReflectionStatusResponse(
+                entry_id=entry.id,
+                reflection_status=entry.reflection_status,
+                reflection=entry.reflection,
+            )
+        # Woken early when a worker in this process finishes the entry;
+        # otherwise re-check the database every poll interval.
+        await reflection_workers.wait_for(
+            entry_id, min(remaining, REFLECTION_POLL_SECONDS)
+        )
@@ -1,4 +1,39 @@
+import hashlib
+
+from fastapi import Request
+from jose import JWTError, jwt
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+import app.rate_limit_storage  # noqa: F401  registers the sqlite:// scheme
+from app.auth import principal_cache
+from app.config import ALGORITHM, RATE_LIMIT_STORAGE_URI, SECRET_KEY
+
+
+def _subject_key(subject: str) -> str:
+    # Keep e-mail addresses out of the shared counter file
+    return "user:" + hashlib.blake2b(subject.encode(), digest_size=8).hexdigest()
+
+
+def rate_limit_key(request: Request) -> str:
+    """Per user for requests with a valid bearer token, per client IP otherwise"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        cached = principal_cache.get(token)
+        if cached is not None:
+            return _subject_key(cached.email)
+        try:
+            subject = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return _subject_key(subject)
+    return f"ip:{get_remote_address(request)}"
+
+
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    # Keep limiting (per process) if the shared store becomes unavailable
+    in_memory_fallback_enabled=True,
+)
@@ -1,9 +1,235 @@
 # app/logger.py
+"""Logging that stays off the request path.
+
+Loggers only put records on a bounded queue. A ``QueueListener`` thread
+formats them (JSON lines, or text with ``LOG_FORMAT=text``) and writes them
+to stderr. When the queue is full a record is dropped and counted rather
+than blocking a request. The next record that fits reports how many were
+lost.
+
+Log with ``%``-style arguments, ``logger.info("user %s", user_id)``, so
+nothing is formatted for disabled levels. The root level is ``LOG_LEVEL``
+and ``LOG_LEVELS`` sets single loggers (``"mindvault=DEBUG,httpx=WARNING"``).
+Values passed as ``extra={...}`` become fields of the JSON line.
+
+``log_noisy`` is for events that can arrive at request rate: bad tokens,
+4xx responses, successful logins. It optionally samples them. It then lets
+at most ``LOG_THROTTLE_BURST`` lines per event key through per
+``LOG_THROTTLE_SECONDS``, and the first line of the next window says how
+many were suppressed.
+"""
+import atexit
+import copy
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
+import orjson
+
+from app.config import (
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_QUEUE_SIZE,
+    LOG_THROTTLE_BURST,
+    LOG_THROTTLE_SECONDS,
 )
 
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_STANDARD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()
+    | {"message", "asctime", "taskName"}
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, extras, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = record.stack_info
+        return orjson.dumps(payload, default=str).decode()
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue without blocking; the listener thread does the formatting."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        # Any thread may log; the count and its notice must not race
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only what cannot wait: the arguments may change after this call
+        # returns, and a traceback cannot be rendered once its frames are gone
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._dropped_lock:
+            try:
+                if self.dropped:
+                    lost = logging.makeLogRecord(
+                        {
+                            "name": "mindvault",
+                            "levelno": logging.WARNING,
+                            "levelname": "WARNING",
+                            "msg": f"Log queue full, dropped {self.dropped} records",
+                        }
+                    )
+                    self.queue.put_nowait(lost)
+                    self.dropped = 0
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """``"a=DEBUG, b.c=warning"`` -> {"a": "DEBUG", "b.c": "WARNING"}"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_handler: Optional[QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    levels: str = LOG_LEVELS,
+    fmt: str = LOG_FORMAT,
+    stream=None,
+    queue_size: int = LOG_QUEUE_SIZE,
+) -> None:
+    """(Re)install the queue handler on the root logger and start the writer."""
+    global _handler, _listener
+    stop_logging()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(
+        JSONFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    log_queue: queue.Queue = queue.Queue(queue_size)
+    _handler = QueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_handler)
+    for name, logger_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+
+def stop_logging() -> None:
+    """Write out everything still queued and stop the writer thread."""
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _after_fork() -> None:
+    # The writer thread did not survive the fork; start the child's own
+    global _listener
+    _listener = None
+    configure_logging()
+
+
+class LogThrottle:
+    """At most ``burst`` events per key in each ``window`` seconds."""
+
+    def __init__(self, burst: int, window: float):
+        self.burst = burst
+        self.window = window
+        # key -> [window start, events let through, events suppressed]
+        self._windows: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> Tuple[bool, int]:
+        """(log this event?, events suppressed in the previous window)"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                self._windows[key] = [now, 1, 0]
+                return True, state[2] if state else 0
+            if state[1] < self.burst:
+                state[1] += 1
+                return True, 0
+            state[2] += 1
+            return False, 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+
+throttle = LogThrottle(LOG_THROTTLE_BURST, LOG_THROTTLE_SECONDS)
+
+
+def log_noisy(
+    key: str,
+    level: int,
+    msg: str,
+    *args,
+    sample_rate: float = 1.0,
+    log: Optional[logging.Logger] = None,
+) -> None:
+    """Log a high-frequency event, sampled and throttled per ``key``."""
+    log = log or logger
+    if not log.isEnabledFor(level):
+        return
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    allowed, suppressed = throttle.allow(key)
+    if not allowed:
+        return
+    extra = {"event": key}
+    if suppressed:
+        extra["suppressed"] = suppressed
+        msg += " (%d similar suppressed)"
+        args += (suppressed,)
+    log.log(level, msg, *args, extra=extra, stacklevel=2)
+
+
+configure_logging()
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_after_fork)
+
 logger = logging.getLogger("mindvault")
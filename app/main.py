@@ -1,18 +1,57 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.database import create_db_and_tables  # Add this import
-from app.routes.auth_routes import router as auth_router
+from app.compression import CompressionMiddleware
+from app.config import (
+    COMPRESSION_MIN_BYTES,
+    DB_ASYNC,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_TOKEN,
+)
+from app.etags import ETagMiddleware
+from app.health import health_monitor
+from app.metrics import MetricsMiddleware, snapshot_writer
+from app.profiling import ProfilingMiddleware
+from app.database import create_db_and_tables, dispose_async_engine
 from app.routes.user_routes import router as user_router
-from app.routes.journal_routes import router as journal_router
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.middleware import SlowAPIMiddleware
 from app.limiter import limiter
 from slowapi.errors import RateLimitExceeded
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.requests import Request
 from app.routes.ai_routes import router as ai_router
 from app.error_handlers import register_exception_handlers
 from app.routes.health_routes import router as health_router
+from app.ai.reflection_queue import reflection_workers
+from app.ai.openai_utils import close_async_client
+from app.passwords import password_hasher
+
+# ✅ Journal and auth routes run on an AsyncSession when DB_ASYNC=true
+if DB_ASYNC:
+    from app.routes.async_auth_routes import router as auth_router
+    from app.routes.async_journal_routes import router as journal_router
+else:
+    from app.routes.auth_routes import router as auth_router
+    from app.routes.journal_routes import router as journal_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ Background workers that fill in journal reflections
+    reflection_workers.start()
+    # ✅ Publish this worker's metrics for /metrics in the other workers
+    snapshot_writer.start()
+    # ✅ Health probes read checks refreshed here instead of running them
+    health_monitor.start()
+    yield
+    await health_monitor.stop()
+    await reflection_workers.stop()
+    await snapshot_writer.stop()
+    await close_async_client()
+    await dispose_async_engine()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="MindVault API",
@@ -23,6 +62,8 @@ app = FastAPI(
         {"name": "Users", "description": "User profile"},
         {"name": "Journal", "description": "Journal entries & insights"},
     ],
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ✅ Create database tables on startup
@@ -34,15 +75,27 @@ app.add_middleware(
     allow_origins=[
         "http://localhost:3000",
         "https://mindvault-frontend.vercel.app",  # Your exact Vercel URL
-        "*"  # Temporary wildcard to ensure it works
+        "*",  # Temporary wildcard to ensure it works
     ],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# ✅ gzip/brotli for large bodies, negotiated from Accept-Encoding
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+# ✅ ETags chosen by the conditional_get dependency go on the 200 responses
+app.add_middleware(ETagMiddleware)
+
+# ✅ Opt-in request profiling; not installed at all unless configured. Added
+# before SlowAPIMiddleware so it runs in the same task as the handler
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
 register_exception_handlers(app)
 
+
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
@@ -50,6 +103,7 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
         content={"detail": "Rate limit exceeded. Please try again later."},
     )
 
+
 # ✅ Secure custom OpenAPI with bearer token support
 def custom_openapi():
     if app.openapi_schema:
@@ -69,6 +123,7 @@ def custom_openapi():
     app.openapi_schema = schema
     return schema
 
+
 app.openapi = custom_openapi
 
 # ✅ Add routers
@@ -80,4 +135,7 @@ app.include_router(health_router)
 
 # ✅ Add rate limiting middleware AFTER CORS
 app.add_middleware(SlowAPIMiddleware)
-app.state.limiter = limiter
\ No newline at end of file
+app.state.limiter = limiter
+
+# ✅ Outermost: request latency and status counts for /metrics
+app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,389 @@
+# app/metrics.py
+"""Prometheus metrics: request latency, SQL timings and OpenAI calls.
+
+Each process records into an in-memory ``MetricsRegistry``. An observation
+is a lock and two dict updates, so a couple of microseconds. Uvicorn workers
+are separate processes, so each process also writes its totals to
+``METRICS_DIR/<pid>-<start>.json`` every ``METRICS_FLUSH_SECONDS`` and when
+it stops. ``GET /metrics`` adds up its own live totals and every other
+snapshot in the directory, then renders the Prometheus text format.
+
+``METRICS_DIR`` defaults to ``DATA_DIR/metrics``, so each deployment sums
+only its own workers. After each flush, the snapshots of processes that
+have exited are folded into ``retired.json`` and deleted. The summed
+counters never go backwards when a worker restarts, and a scrape reads
+one file per live worker plus one.
+
+Requests are labelled with the route template (``/journals/{entry_id}``),
+not the raw path, so label cardinality stays bounded.
+"""
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import psutil
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import METRICS_DIR, METRICS_FLUSH_SECONDS
+from app.logger import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+AI_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+
+# name: (type, help, label names, buckets)
+FAMILIES = {
+    "http_requests_total": (
+        "counter",
+        "HTTP responses by route template, method and status code.",
+        ("method", "route", "status"),
+        None,
+    ),
+    "http_request_duration_seconds": (
+        "histogram",
+        "Time from receiving a request to sending the last response byte.",
+        ("method", "route"),
+        LATENCY_BUCKETS,
+    ),
+    "db_statement_duration_seconds": (
+        "histogram",
+        "SQL statement execution time by statement type.",
+        ("operation",),
+        SQL_BUCKETS,
+    ),
+    "db_statement_errors_total": (
+        "counter",
+        "SQL statements that raised, by statement type.",
+        ("operation",),
+        None,
+    ),
+    "openai_request_duration_seconds": (
+        "histogram",
+        "Upstream chat completion latency (cache hits excluded) by outcome.",
+        ("kind", "outcome"),
+        AI_BUCKETS,
+    ),
+}
+
+SQL_OPERATIONS = {"select", "insert", "update", "delete", "with", "pragma"}
+
+# Totals of exited processes, folded together
+RETIRED_FILE = "retired.json"
+# flock()ed: shared while /metrics reads snapshots, exclusive while folding
+LOCK_FILE = ".lock"
+
+Key = Tuple[str, Tuple[str, ...]]
+
+
+def _as_snapshot(counters: Dict[Key, float], histograms: Dict[Key, list]) -> dict:
+    return {
+        "counters": [[n, list(l), v] for (n, l), v in counters.items()],
+        "histograms": [[n, list(l), list(s)] for (n, l), s in histograms.items()],
+    }
+
+
+def _write_json(path: str, data: dict) -> None:
+    # Write then rename, so readers never see half a file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _exited(filename: str) -> bool:
+    """Whether the process that wrote ``<pid>-<start ns>.json`` is gone"""
+    pid, sep, started = filename[: -len(".json")].partition("-")
+    if not (sep and pid.isdigit() and started.isdigit()):
+        return False
+    try:
+        process = psutil.Process(int(pid))
+        if process.status() == psutil.STATUS_ZOMBIE:
+            return True
+        # A reused pid belongs to a process started after the snapshot's
+        return process.create_time() > int(started) / 1e9 + 1
+    except psutil.NoSuchProcess:
+        return True
+    except psutil.Error:
+        return False
+
+
+class MetricsRegistry:
+    """Counters and histograms of one process."""
+
+    def __init__(self, directory: Optional[str] = METRICS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.reset()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._filename = f"{os.getpid()}-{time.time_ns()}.json"
+            self.counters: Dict[Key, float] = {}
+            # Per-bucket (not cumulative) counts, the +Inf bucket, then the sum
+            self.histograms: Dict[Key, List[float]] = {}
+
+    def inc(self, name: str, labels: Tuple[str, ...], value: float = 1) -> None:
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Tuple[str, ...], value: float) -> None:
+        buckets = FAMILIES[name][3]
+        key = (name, labels)
+        with self._lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return _as_snapshot(self.counters, self.histograms)
+
+    def write(self) -> None:
+        """Publish this process's totals for the other workers' /metrics."""
+        if not self.directory:
+            return
+        snapshot = self.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json(os.path.join(self.directory, self._filename), snapshot)
+
+    @contextmanager
+    def _locked(self, operation: int):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as f:
+            fcntl.flock(f, operation)
+            yield
+
+    def _read(self, path: str) -> Optional[dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable metrics snapshot %s: %s", path, e)
+            return None
+
+    def compact(self) -> int:
+        """Fold the snapshots of exited processes into ``retired.json``.
+
+        Returns how many snapshot files were removed.
+        """
+        if not self.directory:
+            return 0
+        with self._locked(fcntl.LOCK_EX):
+            dead = [
+                path
+                for path in glob.glob(os.path.join(self.directory, "*.json"))
+                if _exited(os.path.basename(path))
+            ]
+            if not dead:
+                return 0
+            retired = os.path.join(self.directory, RETIRED_FILE)
+            paths = [retired, *dead] if os.path.exists(retired) else dead
+            snapshots = [s for s in map(self._read, paths) if s is not None]
+            _write_json(retired, _as_snapshot(*merge(snapshots)))
+            for path in dead:
+                os.remove(path)
+        return len(dead)
+
+    def collect(self) -> Iterable[dict]:
+        """This process's live snapshot plus every other process's file."""
+        yield self.snapshot()
+        if not self.directory:
+            return
+        # Not while compact() moves totals between files
+        with self._locked(fcntl.LOCK_SH):
+            paths = glob.glob(os.path.join(self.directory, "*.json"))
+            snapshots = [
+                self._read(path)
+                for path in paths
+                if os.path.basename(path) != self._filename
+            ]
+        yield from (s for s in snapshots if s is not None)
+
+    def render(self) -> str:
+        return render(self.collect())
+
+
+def merge(snapshots: Iterable[dict]) -> Tuple[Dict[Key, float], Dict[Key, list]]:
+    counters: Dict[Key, float] = {}
+    histograms: Dict[Key, list] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get("counters", ()):
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in snapshot.get("histograms", ()):
+            key = (name, tuple(labels))
+            total = histograms.get(key)
+            if total is None or len(total) != len(series):
+                histograms[key] = list(series)
+            else:
+                histograms[key] = [a + b for a, b in zip(total, series)]
+    return counters, histograms
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    return ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(snapshots: Iterable[dict]) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    counters, histograms = merge(snapshots)
+    lines = []
+    for name, (kind, help_text, label_names, buckets) in FAMILIES.items():
+        series = counters if kind == "counter" else histograms
+        keys = sorted(key for key in series if key[0] == name)
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key in keys:
+            labels = _labels(label_names, key[1])
+            if kind == "counter":
+                lines.append(f"{name}{{{labels}}} {_number(series[key])}")
+                continue
+            *counts, total = series[key]
+            cumulative = 0
+            for bound, count in zip((*buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                sep = "," if labels else ""
+                lines.append(
+                    f'{name}_bucket{{{labels}{sep}le="{le}"}} {_number(cumulative)}'
+                )
+            lines.append(f"{name}_sum{{{labels}}} {_number(total)}")
+            lines.append(f"{name}_count{{{labels}}} {_number(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+# A forked worker must not report the parent's totals again
+os.register_at_fork(after_in_child=metrics._after_fork)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    metrics.inc("http_requests_total", (method, route, str(status)))
+    metrics.observe("http_request_duration_seconds", (method, route), seconds)
+
+
+def observe_openai(kind: str, outcome: str, seconds: float) -> None:
+    metrics.observe("openai_request_duration_seconds", (kind, outcome), seconds)
+
+
+class MetricsMiddleware:
+    """Time every HTTP request and count its status, per route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            observe_request(
+                scope["method"], route, status, time.perf_counter() - started
+            )
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip(" (\n").split(None, 1)
+    operation = words[0].lower() if words else ""
+    return operation if operation in SQL_OPERATIONS else "other"
+
+
+def instrument_statements(engine, registry: MetricsRegistry = None):
+    """Time every statement ``engine`` (sync or async) sends to the database."""
+    registry = registry or metrics
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        registry.observe(
+            "db_statement_duration_seconds",
+            (_operation(statement),),
+            time.perf_counter() - context._metrics_started,
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        statement = exception_context.statement or ""
+        registry.inc("db_statement_errors_total", (_operation(statement),))
+
+    return engine
+
+
+class SnapshotWriter:
+    """Background task that publishes this process's totals periodically."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = metrics,
+        interval: float = METRICS_FLUSH_SECONDS,
+    ):
+        self.registry = registry
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.registry.directory and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="metrics-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self._write)
+
+    def _write(self) -> None:
+        try:
+            self.registry.write()
+            self.registry.compact()
+        except OSError as e:
+            logger.warning("Could not write metrics snapshot: %s", e)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self._write)
+
+
+snapshot_writer = SnapshotWriter()
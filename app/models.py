@@ -1,12 +1,28 @@
 # models.py
+from pydantic import model_validator
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, event
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
+from enum import Enum
+
+
+class ReflectionStatus(str, Enum):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    DEFERRED = "deferred"  # bulk import without a queued job; see backfill
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
 
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    email: str
+    email: str = Field(index=True, unique=True)
     hashed_password: str
 
 
@@ -20,6 +36,90 @@ class JournalEntry(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     reflection: Optional[str] = Field(default=None)
+    reflection_status: str = Field(default=ReflectionStatus.PENDING.value)
+
+    # Derived from content on every ORM write; see _set_content_counts
+    word_count: int = Field(default=0)
+    char_count: int = Field(default=0)
+
+
+def content_counts(content: str) -> tuple:
+    """(word_count, char_count) for an entry body."""
+    return len(content.split()), len(content)
+
+
+@event.listens_for(JournalEntry, "before_insert")
+@event.listens_for(JournalEntry, "before_update")
+def _set_content_counts(mapper, connection, entry: JournalEntry) -> None:
+    entry.word_count, entry.char_count = content_counts(entry.content or "")
+
+
+# Every /journals* route filters by user and orders by newest first; id is
+# the keyset pagination tie-breaker, so it is indexed in the same direction.
+Index(
+    "ix_journalentry_user_id_created_at",
+    JournalEntry.user_id,
+    JournalEntry.created_at.desc(),
+    JournalEntry.id.desc(),
+)
+
+
+class JournalDailyRollup(SQLModel, table=True):
+    """Entries per user, UTC day and mood, kept in step with journalentry."""
+
+    __tablename__ = "journal_daily_rollup"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    mood: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+
+class UserStreak(SQLModel, table=True):
+    """Cached writing streak, maintained by the journal write routes."""
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    last_entry_day: Optional[date] = Field(default=None)
+    current: int = Field(default=0)  # consecutive days ending at last_entry_day
+    longest: int = Field(default=0)
+
+
+class JournalDataVersion(SQLModel, table=True):
+    """Counter bumped by every write to a user's journal data (see app.etags)."""
+
+    __tablename__ = "journal_data_version"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    version: int = Field(default=0)
+
+
+class ReflectionJob(SQLModel, table=True):
+    """Durable queue row: one pending AI reflection for a journal entry."""
+
+    __table_args__ = (
+        Index("ix_reflectionjob_status_available_at", "status", "available_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entry_id: int = Field(foreign_key="journalentry.id", ondelete="CASCADE", index=True)
+    status: str = Field(default=JobStatus.QUEUED.value)
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_at: Optional[datetime] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ReflectionCacheEntry(SQLModel, table=True):
+    """Persistent tier of the AI completion cache, keyed by a prompt hash."""
+
+    key: str = Field(primary_key=True, max_length=64)
+    model: str
+    response: str
+    total_tokens: int = Field(default=0)
+    latency_ms: float = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
 
 
 class UserCreate(SQLModel):
@@ -33,7 +133,20 @@ class UserRead(SQLModel):
 
 
 class JournalEntryUpdate(SQLModel):
+    """Only the fields sent are changed; updated_at is set by the server."""
+
     title: Optional[str] = None
     content: Optional[str] = None
     mood: Optional[str] = None
-    updated_at: Optional[datetime] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_nulls(cls, data):
+        # Leaving a field out keeps it; null cannot, the columns are NOT NULL
+        if isinstance(data, dict):
+            nulls = [
+                name for name in cls.model_fields if name in data and data[name] is None
+            ]
+            if nulls:
+                raise ValueError(f"{', '.join(nulls)} cannot be null")
+        return data
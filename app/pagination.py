@@ -0,0 +1,67 @@
+# app/pagination.py
+"""Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort key of the last row
+of the previous page. The next page is fetched with a ``WHERE (key) < (last)``
+predicate instead of ``OFFSET``, so every page is an index range scan of the
+same cost no matter how deep the client has paged.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(kind: str, values: Sequence[Any]) -> str:
+    payload = [kind] + [
+        value.isoformat() if isinstance(value, datetime) else value for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, types: Sequence[type]) -> list:
+    """Decode a cursor produced by ``encode_cursor`` for the same ``kind``.
+
+    Raises a 400 for anything malformed, tampered with, or issued for a
+    different sort order than the current request uses.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload[0] != kind or len(payload) != len(types) + 1:
+            raise ValueError("cursor does not match this query")
+        return [
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for type_, value in zip(types, payload[1:])
+        ]
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_after(keys: Sequence[Tuple[Any, bool]], values: Sequence[Any]):
+    """Rows strictly after ``values`` in ``ORDER BY keys``.
+
+    ``keys`` is a list of ``(expression, descending)`` pairs matching the
+    query's ORDER BY. Expanded as ``k1 < v1 OR (k1 = v1 AND k2 < v2) ...``
+    rather than a row-value comparison so mixed directions work and every
+    backend can still use the leading column as an index range bound.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*(keys[j][0] == values[j] for j in range(i)), beyond))
+    return or_(*clauses)
+
+
+def split_page(
+    rows: list, limit: int, kind: str, key: Callable[[Any], Sequence[Any]]
+) -> Tuple[list, Optional[str]]:
+    """Trim a ``limit + 1`` fetch to one page and build its ``next_cursor``."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(kind, key(rows[-1]))
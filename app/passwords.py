@@ -0,0 +1,154 @@
+# app/passwords.py
+"""bcrypt hashing and verification on a dedicated process pool.
+
+A bcrypt call is ~250 ms of CPU at the default cost and holds the GIL in
+passlib's wrapper, so running it on the request threadpool stalls every other
+route during a login burst. ``PasswordHasher`` sends the work to a small
+process pool instead and admits at most ``max_pending`` jobs at a time;
+callers beyond that get ``PasswordHasherBusy`` (a 503) rather than an
+ever-growing queue. With ``workers=0`` everything runs inline.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import BCRYPT_ROUNDS, PASSWORD_MAX_PENDING, PASSWORD_WORKERS
+from app.logger import log_noisy
+
+# Seconds a rejected client is told to wait before retrying
+RETRY_AFTER_SECONDS = 1
+
+
+def make_context(rounds: int) -> CryptContext:
+    # min/max rounds only feed needs_update(): any other cost gets rehashed
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+# One context per worker process, built on first use
+_contexts = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = make_context(rounds)
+    return context
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify(password: str, hashed: str, rounds: int) -> bool:
+    return _context(rounds).verify(password, hashed)
+
+
+class PasswordHasherBusy(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress. Please try again shortly.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_WORKERS,
+        max_pending: int = PASSWORD_MAX_PENDING,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.rejected = 0
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when ``hashed`` was made with a different cost or scheme"""
+        return _context(self.rounds).needs_update(hashed)
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run(_verify, password, hashed, self.rounds)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(_hash, password, self.rounds)
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await self._run_async(_verify, password, hashed, self.rounds)
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        # Blocks this (threadpool) thread, but without holding the GIL
+        return self._submit(fn, *args).result()
+
+    async def _run_async(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            log_noisy(
+                "passwords.saturated",
+                logging.WARNING,
+                "Password hasher saturated, rejecting request",
+            )
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs threads and an event loop
+                # can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def stats(self) -> dict:
+        # BoundedSemaphore has no public counter; _value is the free slots
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "pending": self.max_pending - self._slots._value,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
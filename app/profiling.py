@@ -0,0 +1,313 @@
+# app/profiling.py
+"""Opt-in stack-sampling profiler for live workers.
+
+``ProfilingMiddleware`` is only installed when ``PROFILE_SAMPLE_RATE`` > 0 or
+``PROFILE_TOKEN`` is set, so a disabled profiler costs nothing. When
+installed, it profiles a random ``PROFILE_SAMPLE_RATE`` fraction of requests.
+It also profiles any request whose ``X-Profile`` header equals
+``PROFILE_TOKEN``; that response carries an ``X-Profile-Id`` header.
+
+A single sampler thread wakes every ``PROFILE_INTERVAL_MS`` while a profiled
+request is in flight and reads every thread's stack with
+``sys._current_frames()``. A sample is counted for a request when:
+
+* the event loop thread has this middleware's frame for that request on
+  its stack, i.e. it is running the request's task (async handlers,
+  middleware, async dependencies), or
+* a threadpool thread has the route's handler on its stack (sync handlers).
+  Sync dependencies run in a separate threadpool call and are not attributed.
+
+Sampling installs no tracing hooks, so a profiled request runs at close to
+full speed. Each one is written as a pair of files in ``PROFILE_DIR``:
+
+* ``<id>.collapsed``: "frame;frame;frame count" lines, ready for
+  flamegraph.pl or speedscope.
+* ``<id>.json``: route, method, path, status, user key, duration and
+  sample counts.
+
+The oldest pairs are deleted once the directory grows past
+``PROFILE_MAX_BYTES``. Use ``python -m app.commands.profiles`` to summarise
+the dumps by route.
+"""
+import asyncio
+import hmac
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import count
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    PROFILE_DIR,
+    PROFILE_INTERVAL_MS,
+    PROFILE_MAX_BYTES,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_TOKEN,
+)
+from app.limiter import rate_limit_key
+from app.logger import logger
+
+PROFILE_HEADER = b"x-profile"
+# Deepest frames kept per sample; deeper stacks are cut at the root end
+MAX_STACK_DEPTH = 128
+
+
+def frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}"
+
+
+def collapse(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _handler_codes(endpoint) -> frozenset:
+    """Code objects of a route handler and the functions it wraps"""
+    codes = set()
+    try:
+        for fn in (endpoint, inspect.unwrap(endpoint)):
+            code = getattr(fn, "__code__", None)
+            if code is not None:
+                codes.add(code)
+    except ValueError:
+        pass
+    return frozenset(codes)
+
+
+def _on_stack(frame, codes: frozenset) -> bool:
+    while frame is not None:
+        if frame.f_code in codes:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _frame_on_stack(frame, target) -> bool:
+    while frame is not None:
+        if frame is target:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class RequestProfile:
+    """Samples attributed to one in-flight request."""
+
+    def __init__(self, scope: Scope, frame):
+        self.scope = scope
+        # The middleware's own frame: a suspended coroutine is off the stack,
+        # so it is on the loop thread's stack exactly while the task runs
+        self.frame = frame
+        self.loop_thread = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.loop_samples = 0
+        self.thread_samples = 0
+        self._codes: Optional[frozenset] = None
+
+    def handler_codes(self) -> frozenset:
+        # The route (and its endpoint) is only known once the router ran
+        if self._codes is None:
+            endpoint = self.scope.get("endpoint")
+            if endpoint is None:
+                return frozenset()
+            self._codes = _handler_codes(endpoint)
+        return self._codes
+
+    def sample(self, frames: Dict[int, object]) -> None:
+        loop_frame = frames.get(self.loop_thread)
+        if loop_frame is not None and _frame_on_stack(loop_frame, self.frame):
+            self.stacks[collapse(loop_frame)] += 1
+            self.loop_samples += 1
+        codes = self.handler_codes()
+        if not codes:
+            return
+        for ident, frame in frames.items():
+            if ident != self.loop_thread and _on_stack(frame, codes):
+                self.stacks[collapse(frame)] += 1
+                self.thread_samples += 1
+
+
+class Sampler:
+    """One daemon thread sampling stacks while any profiled request runs."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active[id(profile)] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, profile: RequestProfile) -> None:
+        # Waits for a pass in progress, so the profile is final afterwards
+        with self._lock:
+            self._active.pop(id(profile), None)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wakeup.clear()
+                else:
+                    frames = sys._current_frames()
+                    frames.pop(me, None)
+                    for profile in self._active.values():
+                        profile.sample(frames)
+                    del frames
+            if idle:
+                self._wakeup.wait()
+            else:
+                time.sleep(self.interval)
+
+
+def prune(directory: str, max_bytes: int) -> None:
+    """Delete the oldest dumps until the directory fits in ``max_bytes``.
+
+    A dump's ``.collapsed`` and ``.json`` files are removed together, so the
+    listing never shows stacks without metadata or the other way round.
+    """
+    dumps: Dict[str, list] = {}
+    total = 0
+    for entry in os.scandir(directory):
+        if entry.is_file():
+            stat = entry.stat()
+            total += stat.st_size
+            dump = dumps.setdefault(entry.name.split(".", 1)[0], [0.0, 0, []])
+            dump[0] = max(dump[0], stat.st_mtime)
+            dump[1] += stat.st_size
+            dump[2].append(entry.name)
+    for _, size, names in sorted(dumps.values(), key=lambda dump: dump[0]):
+        if total <= max_bytes:
+            break
+        for name in names:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+def write_dump(
+    directory: str, profile_id: str, meta: dict, stacks: Counter, max_bytes: int
+) -> None:
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+    with open(f"{base}.collapsed", "w") as f:
+        f.writelines(f"{stack} {n}\n" for stack, n in stacks.most_common())
+    # Metadata last: readers treat a dump as complete once its .json exists
+    with open(f"{base}.json.tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(f"{base}.json.tmp", f"{base}.json")
+    prune(directory, max_bytes)
+
+
+class ProfilingMiddleware:
+    """Profile sampled or admin-requested requests; see the module docstring."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        token: str = PROFILE_TOKEN,
+        directory: str = PROFILE_DIR,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+        max_bytes: int = PROFILE_MAX_BYTES,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token.encode()
+        self.directory = directory
+        self.interval = interval_ms / 1000
+        self.max_bytes = max_bytes
+        self.sampler = Sampler(self.interval)
+        self._ids = count()
+
+    def _requested(self, scope: Scope) -> bool:
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        if not requested and random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = datetime.utcnow()
+        profile_id = f"{started_at:%Y%m%dT%H%M%S}-{os.getpid()}-{next(self._ids)}"
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if requested:
+                    MutableHeaders(raw=message["headers"])["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profile = RequestProfile(scope, sys._getframe())
+        started = time.perf_counter()
+        self.sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.sampler.remove(profile)
+            duration = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            meta = {
+                "id": profile_id,
+                "route": route,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "user": rate_limit_key(Request(scope)),
+                "requested": requested,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(duration * 1000, 3),
+                "interval_ms": self.interval * 1000,
+                "samples": sum(profile.stacks.values()),
+                "loop_samples": profile.loop_samples,
+                "thread_samples": profile.thread_samples,
+            }
+            try:
+                await asyncio.to_thread(
+                    write_dump,
+                    self.directory,
+                    profile_id,
+                    meta,
+                    profile.stacks,
+                    self.max_bytes,
+                )
+            except OSError as e:
+                logger.warning("Could not write profile %s: %s", profile_id, e)
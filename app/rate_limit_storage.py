@@ -0,0 +1,150 @@
+# app/rate_limit_storage.py
+"""SQLite (WAL) storage for ``limits``, shared by every worker on a host.
+
+slowapi keeps its counters in process memory by default, so with N uvicorn
+workers a ``5/minute`` limit really allows 5×N. Registering this class under
+the ``sqlite`` scheme lets the limiter use ``sqlite:///path/to/file.db``
+instead: every process reads and bumps the same fixed-window counters, one
+row per key, with expired rows swept out periodically.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at);
+"""
+
+# A window that has expired restarts at ``amount`` instead of adding to it.
+# SET expressions all see the old row, so both CASEs test the old expiry.
+INCR = """
+INSERT INTO rate_limits (key, count, expires_at) VALUES (:key, :amount, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    count = CASE WHEN expires_at <= :now THEN :amount ELSE count + :amount END,
+    expires_at = CASE WHEN expires_at <= :now THEN :expires_at ELSE expires_at END
+RETURNING count
+"""
+
+
+def _enable_wal(conn: sqlite3.Connection, timeout: float = 5) -> None:
+    """Switch the file to WAL, retrying while other workers hold it.
+
+    Changing the journal mode needs an exclusive lock and SQLite can report
+    "database is locked" without consulting the busy timeout, so workers
+    starting together retry here instead of failing in ``__init__``.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            (mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+            if mode.lower() != "wal":
+                conn.execute("PRAGMA journal_mode=WAL")
+            return
+        except sqlite3.OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+
+class SQLiteStorage(Storage):
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        sweep_seconds: float = 60,
+        **options,
+    ):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # Same layout as SQLAlchemy URLs: sqlite:///relative.db, sqlite:////abs.db
+        self.path = uri.split("://", 1)[1][1:]
+        if not self.path:
+            raise ValueError("SQLite rate-limit storage needs a file path")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.sweep_seconds = float(sweep_seconds)
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        self._connection().executescript(SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened in forked children
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=5000")
+            _enable_wal(conn)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connection()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_seconds
+            self.sweep(now)
+        (count,) = conn.execute(
+            INCR,
+            {"key": key, "amount": amount, "expires_at": now + expiry, "now": now},
+        ).fetchone()
+        return count
+
+    def get(self, key: str) -> int:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = (
+            self._connection()
+            .execute(
+                "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?",
+                (key, now),
+            )
+            .fetchone()
+        )
+        return row[0] if row else now
+
+    def sweep(self, now: float = None) -> int:
+        """Delete expired windows; returns how many were removed"""
+        return (
+            self._connection()
+            .execute(
+                "DELETE FROM rate_limits WHERE expires_at <= ?",
+                (time.time() if now is None else now,),
+            )
+            .rowcount
+        )
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
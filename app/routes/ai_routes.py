@@ -1,46 +1,77 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from pydantic import BaseModel
 from typing import Annotated
 
-from app.ai.openai_utils import ask_gpt as generate_ai_response
+from app.ai.openai_utils import ask_gpt as generate_ai_response, astream
+from app.ai.reflection_cache import reflection_cache
+from app.ai.streaming import EventSourceResponse, sse_completion
 from app.schemas.openai_schemas import (
     JournalReflectionRequest,
     JournalReflectionResponse,
 )
-from app.auth import get_current_user  # make sure this import works for JWT
+from app.auth import get_principal  # make sure this import works for JWT
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
 
+def wants_stream(request: Request, stream: bool) -> bool:
+    """Streaming is opt-in: ``?stream=true`` or ``Accept: text/event-stream``"""
+    return stream or "text/event-stream" in request.headers.get("accept", "")
+
+
 # Existing generic GPT prompt route
 class AIRequest(BaseModel):
     prompt: str
 
 
 @router.post("/respond")
-async def ai_respond(request: AIRequest):
+async def ai_respond(
+    request: AIRequest,
+    http_request: Request,
+    stream: bool = Query(False, description="Stream tokens as server-sent events"),
+):
+    if wants_stream(http_request, stream):
+        return EventSourceResponse(
+            sse_completion(astream(request.prompt), lambda text: {"response": text})
+        )
     try:
-        response = generate_ai_response(request.prompt)
+        response = await generate_ai_response(request.prompt)
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache-stats")
+async def cache_stats(user: Annotated[dict, Depends(get_principal)]):
+    """Hit/miss counters and estimated savings of the reflection cache"""
+    return reflection_cache.stats()
+
+
 # New AI Reflection route
 @router.post("/reflect", response_model=JournalReflectionResponse)
 async def reflect_on_journal(
-    data: JournalReflectionRequest, user: Annotated[dict, Depends(get_current_user)]
+    data: JournalReflectionRequest,
+    user: Annotated[dict, Depends(get_principal)],
+    http_request: Request,
+    stream: bool = Query(False, description="Stream tokens as server-sent events"),
 ):
-    try:
-        prompt = (
-            f"You are a warm and emotionally intelligent journaling guide. A user just wrote:\n\n"
-            f'"{data.entry}"\n\n'
-            f"Mood: {data.mood}\n\n"
-            f"Give a short, thoughtful reflection or follow-up question to help them reflect further. "
-            f"Be gentle, supportive, and human."
+    prompt = (
+        f"You are a warm and emotionally intelligent journaling guide. A user just wrote:\n\n"
+        f'"{data.entry}"\n\n'
+        f"Mood: {data.mood}\n\n"
+        f"Give a short, thoughtful reflection or follow-up question to help them reflect further. "
+        f"Be gentle, supportive, and human."
+    )
+    if wants_stream(http_request, stream):
+        # The closing "done" event carries the usual JournalReflectionResponse
+        return EventSourceResponse(
+            sse_completion(
+                astream(prompt),
+                lambda text: JournalReflectionResponse(reflection=text).model_dump(),
+            )
         )
-
-        response = generate_ai_response(prompt)
+    try:
+        response = await generate_ai_response(prompt)
         return JournalReflectionResponse(reflection=response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Reflection failed: {str(e)}")
@@ -0,0 +1,37 @@
+# app/async_auth_routes.py
+"""AsyncSession twin of auth_routes, mounted when DB_ASYNC is enabled."""
+from fastapi import APIRouter, HTTPException, Depends, status, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.limiter import limiter
+
+from app.models import UserCreate, UserRead
+from app.auth import register_user_async, authenticate_user_async, create_access_token
+from app.database import get_async_session
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+
+@router.post("/register", response_model=UserRead)
+async def register(
+    user: UserCreate, session: AsyncSession = Depends(get_async_session)
+):
+    return await register_user_async(session, user)
+
+
+@router.post("/login")
+@limiter.limit("5/minute")
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(get_async_session),
+):
+    user = await authenticate_user_async(
+        session, form_data.username, form_data.password
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
+        )
+    token = create_access_token(data={"sub": user.email})
+    return {"access_token": token, "token_type": "bearer"}
@@ -0,0 +1,274 @@
+# app/async_journal_routes.py
+"""AsyncSession twin of journal_routes, mounted when DB_ASYNC is enabled.
+
+The handlers run the shared ``app.journals`` functions through
+``AsyncSession.run_sync``: the same queries, issued on the event loop over
+aiosqlite/asyncpg instead of from threadpool workers.
+"""
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Literal, Optional, Union
+from datetime import datetime
+from app.schemas.journal_schemas import (
+    BatchCreateResponse,
+    ImportReport,
+    JournalBatchCreate,
+    JournalEntryCreate,
+    JournalEntryResponse,
+    JournalPage,
+    ReflectionStatusResponse,
+)
+from app.limiter import limiter
+from app.analytics import mood_counts
+from app.ai.reflection_queue import reflection_workers
+from app.config import (
+    JOURNAL_IMPORT_BATCH_SIZE,
+    JOURNAL_MAX_PAGE_SIZE,
+    JOURNAL_PAGE_SIZE,
+)
+
+from app.models import JournalEntryUpdate
+from app import bulk, journals
+from app.batch import create_batch
+from app.streaks import read_streak
+from app.database import get_async_session
+from app.auth import get_current_user_async
+from app.etags import conditional_get_async
+
+router = APIRouter(tags=["Journal"])
+
+
+@router.post("/journals")
+@limiter.shared_limit("5/minute", scope="journal-writes")
+async def create_journal(
+    entry: JournalEntryCreate,
+    request: Request,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    new_entry = await session.run_sync(journals.create_entry, user.id, entry)
+    reflection_workers.notify()
+    return {"message": "Entry saved, reflection queued", "entry": new_entry}
+
+
+@router.post("/journals/batch", response_model=BatchCreateResponse)
+@limiter.shared_limit("5/minute", scope="journal-writes")
+async def create_journals_batch(
+    batch: JournalBatchCreate,
+    request: Request,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Create several entries at once, e.g. when syncing offline entries.
+
+    Counts as one write for rate limiting. Reflections are generated
+    concurrently; an item whose reflection failed is still created, with the
+    reflection queued for retry.
+    """
+    return await create_batch(batch.entries, user.id, session.run_sync)
+
+
+@router.get(
+    "/journals",
+    response_model=Union[JournalPage, List[JournalEntryResponse]],
+    dependencies=[Depends(conditional_get_async)],
+)
+async def get_journals(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+    limit: int = Query(JOURNAL_PAGE_SIZE, ge=1, le=JOURNAL_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    paginate: bool = Query(
+        True, description="Set to false for the legacy list of every entry"
+    ),
+):
+    return ORJSONResponse(
+        await session.run_sync(journals.list_entries, user.id, limit, cursor, paginate)
+    )
+
+
+# ✅ PUT ALL SPECIFIC ROUTES BEFORE PARAMETERIZED ROUTES
+@router.get(
+    "/journals/filter",
+    response_model=Union[JournalPage, List[JournalEntryResponse]],
+    dependencies=[Depends(conditional_get_async)],
+)
+async def filter_journals(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+    mood: Optional[str] = Query(None, description="Filter by mood"),
+    search: Optional[str] = Query(
+        None, description="Full-text search in title/content (prefix matching)"
+    ),
+    sort: Literal["relevance", "recent"] = Query(
+        "relevance", description="Order of search results"
+    ),
+    start_date: Optional[datetime] = Query(None, description="Start date (ISO)"),
+    end_date: Optional[datetime] = Query(None, description="End date (ISO)"),
+    limit: int = Query(JOURNAL_PAGE_SIZE, ge=1, le=JOURNAL_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    paginate: bool = Query(
+        True, description="Set to false for the legacy offset-paginated list"
+    ),
+    offset: int = Query(
+        0, ge=0, deprecated=True, description="Only used with paginate=false"
+    ),
+):
+    return ORJSONResponse(
+        await session.run_sync(
+            journals.filter_entries,
+            user.id,
+            mood=mood,
+            search=search,
+            sort=sort,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            cursor=cursor,
+            paginate=paginate,
+            offset=offset,
+        )
+    )
+
+
+@router.get("/journals/mood-summary", dependencies=[Depends(conditional_get_async)])
+async def get_mood_summary(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+):
+    summary = await session.run_sync(mood_counts, user.id, start_date, end_date)
+    return ORJSONResponse({"summary": summary})
+
+
+@router.get("/journals/mood-trends", dependencies=[Depends(conditional_get_async)])
+async def get_mood_trends(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return ORJSONResponse(await session.run_sync(journals.mood_trends, user.id))
+
+
+@router.get("/journals/streak", dependencies=[Depends(conditional_get_async)])
+async def get_journal_streak(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return ORJSONResponse(
+        await session.run_sync(read_streak, user.id, datetime.utcnow().date())
+    )
+
+
+@router.get("/journals/stats", dependencies=[Depends(conditional_get_async)])
+async def get_journal_stats(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return ORJSONResponse(await session.run_sync(journals.journal_stats, user.id))
+
+
+@router.get("/journals/7-day-summary", dependencies=[Depends(conditional_get_async)])
+async def seven_day_summary(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return ORJSONResponse(
+        await session.run_sync(
+            journals.seven_day_summary, user.id, datetime.utcnow().date()
+        )
+    )
+
+
+@router.get("/journals/export")
+async def export_journals(
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+):
+    """Every entry, oldest first, streamed as NDJSON or CSV."""
+    return StreamingResponse(
+        bulk.export_entries_async(session.bind, user.id, format),
+        media_type=bulk.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="journals.{format}"'},
+    )
+
+
+@router.post("/journals/import", response_model=ImportReport)
+@limiter.limit("5/minute")
+async def import_journals(
+    request: Request,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+    defer_reflections: bool = Query(
+        False, description="Skip queueing reflections; backfill them later"
+    ),
+):
+    """Import an NDJSON body (one entry per line) in batched transactions."""
+    report = await bulk.import_ndjson(
+        request.stream(),
+        lambda batch: session.run_sync(
+            bulk.insert_batch, user.id, batch, defer_reflections
+        ),
+        JOURNAL_IMPORT_BATCH_SIZE,
+    )
+    if report.imported:
+        reflection_workers.notify()
+    return report
+
+
+# ✅ PUT PARAMETERIZED ROUTES LAST
+@router.get(
+    "/journals/{entry_id}",
+    response_model=JournalEntryResponse,
+    dependencies=[Depends(conditional_get_async)],
+)
+async def get_journal(
+    entry_id: int,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await session.run_sync(journals.get_owned_entry, entry_id, user.id)
+
+
+@router.get("/journals/{entry_id}/reflection", response_model=ReflectionStatusResponse)
+async def wait_for_reflection(
+    entry_id: int,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+    timeout: float = Query(
+        0, ge=0, le=30, description="Seconds to wait for a pending reflection"
+    ),
+):
+    """Return the reflection state, optionally long-polling until it is ready."""
+
+    async def load_entry():
+        try:
+            return await session.run_sync(journals.get_owned_entry, entry_id, user.id)
+        finally:
+            # Release the connection between polls and forget the cached row
+            await session.close()
+
+    return await journals.wait_for_reflection(load_entry, entry_id, timeout)
+
+
+@router.put("/journals/{entry_id}")
+async def update_journal(
+    entry_id: int,
+    updated: JournalEntryUpdate,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    entry = await session.run_sync(journals.update_entry, entry_id, user.id, updated)
+    return {"message": f"Entry {entry_id} updated", "entry": entry}
+
+
+@router.delete("/journals/{entry_id}")
+async def delete_journal(
+    entry_id: int,
+    user=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    await session.run_sync(journals.delete_entry, entry_id, user.id)
+    return {"message": f"Entry {entry_id} deleted"}
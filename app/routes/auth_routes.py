@@ -1,23 +1,31 @@
 # app/auth_routes.py
 from fastapi import APIRouter, HTTPException, Depends, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel import Session
 from app.limiter import limiter
 
 from app.models import UserCreate, UserRead
 from app.auth import register_user, authenticate_user, create_access_token
+from app.database import get_session, releases_session
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/register", response_model=UserRead)
-def register(user: UserCreate):
-    return register_user(user)
+@releases_session
+def register(user: UserCreate, session: Session = Depends(get_session)):
+    return register_user(session, user)
 
 
 @router.post("/login")
 @limiter.limit("5/minute")
-def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+@releases_session
+def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: Session = Depends(get_session),
+):
+    user = authenticate_user(session, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
@@ -1,11 +1,11 @@
 # app/routes/health_routes.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, text
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 import psutil
 import os
-from app.database import get_session
-from app.config import DATABASE_URL
+from app.health import health_monitor
+from app.metrics import metrics
 
 router = APIRouter(tags=["Health"])
 
@@ -22,45 +22,18 @@ async def health_check():
 
 
 @router.get("/health/detailed")
-async def detailed_health_check(session: Session = Depends(get_session)):
-    """Detailed health check with database and system info"""
-
-    # Check database connection
-    try:
-        # Test database connection
-        result = session.exec(text("SELECT 1")).first()
-        db_status = "healthy" if result else "unhealthy"
-        db_error = None
-    except Exception as e:
-        db_status = "unhealthy"
-        db_error = str(e)
-
-    # System metrics
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage("/")
-
+async def detailed_health_check():
+    """Detailed health check: the monitor's latest database and system checks"""
+    report = await health_monitor.report()
     health_data = {
-        "status": "healthy" if db_status == "healthy" else "degraded",
-        "timestamp": datetime.utcnow().isoformat(),
+        "status": report["status"],
+        "timestamp": report["timestamp"],
         "service": "MindVault API",
         "version": "1.0.0",
-        "checks": {
-            "database": {
-                "status": db_status,
-                "error": db_error,
-                "type": "postgresql" if "postgresql" in DATABASE_URL else "sqlite",
-            },
-            "memory": {
-                "status": "healthy" if memory.percent < 85 else "warning",
-                "usage_percent": memory.percent,
-                "available_mb": round(memory.available / 1024 / 1024, 2),
-            },
-            "disk": {
-                "status": "healthy" if disk.percent < 85 else "warning",
-                "usage_percent": disk.percent,
-                "free_gb": round(disk.free / 1024 / 1024 / 1024, 2),
-            },
-        },
+        "checked_at": report["checked_at"],
+        "age_seconds": report["age_seconds"],
+        "stale": report["stale"],
+        "checks": report["checks"],
         "environment": {
             "python_version": f"{os.sys.version_info.major}.{os.sys.version_info.minor}.{os.sys.version_info.micro}",
             "platform": os.name,
@@ -69,23 +42,36 @@ async def detailed_health_check(session: Session = Depends(get_session)):
     }
 
     # Return 503 if any critical checks fail
-    if db_status == "unhealthy":
+    database = report["checks"].get("database")
+    if database is None or database["status"] == "unhealthy":
         raise HTTPException(status_code=503, detail=health_data)
 
     return health_data
 
 
 @router.get("/health/ready")
-async def readiness_check(session: Session = Depends(get_session)):
+async def readiness_check():
     """Kubernetes readiness probe - checks if app is ready to serve traffic"""
-    try:
-        # Test database connection
-        session.exec(text("SELECT 1"))
-        return {"status": "ready", "timestamp": datetime.utcnow().isoformat()}
-    except Exception as e:
+    report = await health_monitor.report()
+    database = report["checks"].get("database")
+    if database is None or database["status"] == "unhealthy" or report["stale"]:
         raise HTTPException(
-            status_code=503, detail={"status": "not ready", "error": str(e)}
+            status_code=503,
+            detail={
+                "status": "not ready",
+                "error": (
+                    database["error"]
+                    if database and database["error"]
+                    else f"health checks are {report['status']}"
+                ),
+                "age_seconds": report["age_seconds"],
+            },
         )
+    return {
+        "status": "ready",
+        "timestamp": report["timestamp"],
+        "age_seconds": report["age_seconds"],
+    }
 
 
 @router.get("/health/live")
@@ -96,3 +82,11 @@ async def liveness_check():
         "timestamp": datetime.utcnow().isoformat(),
         "uptime_seconds": psutil.Process().create_time(),
     }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus scrape endpoint, summed over every worker process"""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
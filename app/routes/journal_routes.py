@@ -1,270 +1,282 @@
 # app/journal_routes.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
-from typing import List, Optional
-from datetime import datetime, timedelta
-from sqlalchemy import func
-from collections import Counter, defaultdict
-from app.schemas.journal_schemas import JournalEntryCreate, JournalEntryResponse
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from typing import List, Literal, Optional, Union
+from datetime import datetime
+from app.schemas.journal_schemas import (
+    BatchCreateResponse,
+    ImportReport,
+    JournalBatchCreate,
+    JournalEntryCreate,
+    JournalEntryResponse,
+    JournalPage,
+    ReflectionStatusResponse,
+)
 from fastapi import Request
 from app.limiter import limiter
-from app.ai.openai_utils import ask_gpt as generate_ai_response
+from app.analytics import mood_counts
+from app.ai.reflection_queue import reflection_workers
+from app.config import (
+    JOURNAL_IMPORT_BATCH_SIZE,
+    JOURNAL_MAX_PAGE_SIZE,
+    JOURNAL_PAGE_SIZE,
+)
 
 from app.models import JournalEntry, JournalEntryUpdate
-from app.database import engine
+from app import bulk, journals
+from app.batch import create_batch
+from app.streaks import read_streak
+from app.database import get_session, releases_session
 from app.auth import get_current_user
+from app.etags import conditional_get
 
 router = APIRouter(tags=["Journal"])
 
 
 @router.post("/journals")
-@limiter.limit("5/minute")
+@limiter.shared_limit("5/minute", scope="journal-writes")
+@releases_session
 def create_journal(
     entry: JournalEntryCreate,
     request: Request,
     user=Depends(get_current_user),
+    session: Session = Depends(get_session),
 ):
-    with Session(engine) as session:
-        # 🧠 Generate reflection using GPT
-        try:
-            prompt = f"Reflect on the following journal entry:\n\nTitle: {entry.title}\nMood: {entry.mood}\nContent:\n{entry.content}"
-            reflection = generate_ai_response(prompt)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"AI reflection failed: {e}")
-
-        # 📦 Save journal + reflection
-        new_entry = JournalEntry(
-            title=entry.title,
-            content=entry.content,
-            mood=entry.mood,
-            reflection=reflection,
-            user_id=user.id,
-        )
-        session.add(new_entry)
-        session.commit()
-        session.refresh(new_entry)
-        return {"message": "Entry saved with reflection", "entry": new_entry}
-
-
-@router.get("/journals", response_model=List[JournalEntryResponse])
-def get_journals(user=Depends(get_current_user)):
-    with Session(engine) as session:
-        statement = (
-            select(JournalEntry)
-            .where(JournalEntry.user_id == user.id)
-            .order_by(JournalEntry.created_at.desc())
-        )
-        return session.exec(statement).all()
+    new_entry = journals.create_entry(session, user.id, entry)
+    reflection_workers.notify()
+    return {"message": "Entry saved, reflection queued", "entry": new_entry}
+
+
+@router.post("/journals/batch", response_model=BatchCreateResponse)
+@limiter.shared_limit("5/minute", scope="journal-writes")
+async def create_journals_batch(
+    batch: JournalBatchCreate,
+    request: Request,
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """Create several entries at once, e.g. when syncing offline entries.
+
+    Counts as one write for rate limiting. Reflections are generated
+    concurrently; an item whose reflection failed is still created, with the
+    reflection queued for retry.
+    """
+    return await create_batch(
+        batch.entries,
+        user.id,
+        lambda fn, *args: run_in_threadpool(fn, session, *args),
+    )
+
+
+@router.get(
+    "/journals",
+    response_model=Union[JournalPage, List[JournalEntryResponse]],
+    dependencies=[Depends(conditional_get)],
+)
+@releases_session
+def get_journals(
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+    limit: int = Query(JOURNAL_PAGE_SIZE, ge=1, le=JOURNAL_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    paginate: bool = Query(
+        True, description="Set to false for the legacy list of every entry"
+    ),
+):
+    return ORJSONResponse(
+        journals.list_entries(session, user.id, limit, cursor, paginate)
+    )
 
 
 # ✅ PUT ALL SPECIFIC ROUTES BEFORE PARAMETERIZED ROUTES
-@router.get("/journals/filter", response_model=List[JournalEntryResponse])
+@router.get(
+    "/journals/filter",
+    response_model=Union[JournalPage, List[JournalEntryResponse]],
+    dependencies=[Depends(conditional_get)],
+)
+@releases_session
 def filter_journals(
     user=Depends(get_current_user),
+    session: Session = Depends(get_session),
     mood: Optional[str] = Query(None, description="Filter by mood"),
-    search: Optional[str] = Query(None, description="Search in title/content"),
+    search: Optional[str] = Query(
+        None, description="Full-text search in title/content (prefix matching)"
+    ),
+    sort: Literal["relevance", "recent"] = Query(
+        "relevance", description="Order of search results"
+    ),
     start_date: Optional[datetime] = Query(None, description="Start date (ISO)"),
     end_date: Optional[datetime] = Query(None, description="End date (ISO)"),
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(JOURNAL_PAGE_SIZE, ge=1, le=JOURNAL_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    paginate: bool = Query(
+        True, description="Set to false for the legacy offset-paginated list"
+    ),
+    offset: int = Query(
+        0, ge=0, deprecated=True, description="Only used with paginate=false"
+    ),
 ):
-    with Session(engine) as session:
-        statement = select(JournalEntry).where(JournalEntry.user_id == user.id)
-        if mood:
-            statement = statement.where(JournalEntry.mood == mood)
-        if search:
-            pattern = f"%{search.lower()}%"
-            statement = statement.where(
-                JournalEntry.title.ilike(pattern) | JournalEntry.content.ilike(pattern)
-            )
-        if start_date:
-            statement = statement.where(JournalEntry.created_at >= start_date)
-        if end_date:
-            statement = statement.where(JournalEntry.created_at <= end_date)
-
-        statement = statement.order_by(JournalEntry.created_at.desc())
-        statement = statement.offset(offset).limit(limit)
-        results = session.exec(statement).all()
-
-        if not results:
-            raise HTTPException(
-                status_code=404, detail="No entries match the given filters"
-            )
-        return results
-
-
-@router.get("/journals/mood-summary")
+    return ORJSONResponse(
+        journals.filter_entries(
+            session,
+            user.id,
+            mood=mood,
+            search=search,
+            sort=sort,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            cursor=cursor,
+            paginate=paginate,
+            offset=offset,
+        )
+    )
+
+
+@router.get("/journals/mood-summary", dependencies=[Depends(conditional_get)])
+@releases_session
 def get_mood_summary(
     user=Depends(get_current_user),
+    session: Session = Depends(get_session),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
 ):
-    with Session(engine) as session:
-        stmt = (
-            select(JournalEntry.mood, func.count(JournalEntry.id))
-            .where(JournalEntry.user_id == user.id)
-            .group_by(JournalEntry.mood)
-        )
-        if start_date:
-            stmt = stmt.where(JournalEntry.created_at >= start_date)
-        if end_date:
-            stmt = stmt.where(JournalEntry.created_at <= end_date)
-
-        results = session.exec(stmt).all()
-        return {"summary": {mood: count for mood, count in results}}
-
-
-@router.get("/journals/mood-trends")
-def get_mood_trends(user=Depends(get_current_user)):
-    with Session(engine) as session:
-        entries = session.exec(
-            select(JournalEntry)
-            .where(JournalEntry.user_id == user.id)
-            .order_by(JournalEntry.created_at)
-        ).all()
-
-    mood_trends = defaultdict(lambda: defaultdict(int))
-    for e in entries:
-        if e.mood:
-            day = e.created_at.date().isoformat()
-            mood_trends[day][e.mood] += 1
-
-    return [
-        {"date": day, "moods": counts} for day, counts in sorted(mood_trends.items())
-    ]
-
-
-@router.get("/journals/streak")
-def get_journal_streak(user=Depends(get_current_user)):
-    with Session(engine) as session:
-        dates = sorted(
-            {
-                ent.created_at.date()
-                for ent in session.exec(
-                    select(JournalEntry.created_at).where(
-                        JournalEntry.user_id == user.id
-                    )
-                ).all()
-            }
-        )
+    return ORJSONResponse(
+        {"summary": mood_counts(session, user.id, start_date, end_date)}
+    )
 
-    if not dates:
-        return {"current_streak": 0, "longest_streak": 0}
-    
-    # Handle single entry case
-    if len(dates) == 1:
-        today = datetime.utcnow().date()
-        # Check if the single entry is from today or yesterday
-        days_ago = (today - dates[0]).days
-        if days_ago <= 1:  # Today or yesterday
-            return {"current_streak": 1, "longest_streak": 1}
-        else:
-            return {"current_streak": 0, "longest_streak": 1}
-
-    # Handle multiple entries
-    longest = current = 1
-    today = datetime.utcnow().date()
-    
-    for i in range(1, len(dates)):
-        prev_date = dates[i-1]
-        curr_date = dates[i]
-        
-        if (curr_date - prev_date).days == 1:
-            current += 1
-            longest = max(longest, current)
-        else:
-            current = 1
-    
-    # Check if current streak is still active
-    if (today - dates[-1]).days > 1:
-        current = 0
-
-    return {"current_streak": current, "longest_streak": longest}
-
-
-@router.get("/journals/stats")
-def get_journal_stats(user=Depends(get_current_user)):
-    with Session(engine) as session:
-        entries = session.exec(
-            select(JournalEntry).where(JournalEntry.user_id == user.id)
-        ).all()
-
-    if not entries:
-        return {"message": "No journal entries found."}
-
-    total = len(entries)
-    words = sum(len(e.content.split()) for e in entries)
-    moods = [e.mood for e in entries if e.mood]
-    most_common = Counter(moods).most_common(1)
-    return {
-        "total_entries": total,
-        "first_entry": min(e.created_at for e in entries),
-        "latest_entry": max(e.created_at for e in entries),
-        "total_words": words,
-        "average_words_per_entry": round(words / total, 2),
-        "most_common_mood": most_common[0][0] if most_common else None,
-    }
-
-
-@router.get("/journals/7-day-summary")
-def seven_day_summary(user=Depends(get_current_user)):
-    today = datetime.utcnow().date()
-    last_week = [today - timedelta(days=i) for i in range(6, -1, -1)]
-    with Session(engine) as session:
-        entries = session.exec(
-            select(JournalEntry).where(
-                JournalEntry.user_id == user.id,
-                JournalEntry.created_at >= today - timedelta(days=6),
-            )
-        ).all()
-
-    summary = {d.isoformat(): {"count": 0, "moods": {}} for d in last_week}
-    for e in entries:
-        d = e.created_at.date().isoformat()
-        grp = summary[d]
-        grp["count"] += 1
-        grp["moods"][e.mood or "unspecified"] = (
-            grp["moods"].get(e.mood or "unspecified", 0) + 1
-        )
 
-    return {"last_7_days": summary}
+@router.get("/journals/mood-trends", dependencies=[Depends(conditional_get)])
+@releases_session
+def get_mood_trends(
+    user=Depends(get_current_user), session: Session = Depends(get_session)
+):
+    return ORJSONResponse(journals.mood_trends(session, user.id))
+
+
+@router.get("/journals/streak", dependencies=[Depends(conditional_get)])
+@releases_session
+def get_journal_streak(
+    user=Depends(get_current_user), session: Session = Depends(get_session)
+):
+    return ORJSONResponse(read_streak(session, user.id, datetime.utcnow().date()))
+
+
+@router.get("/journals/stats", dependencies=[Depends(conditional_get)])
+@releases_session
+def get_journal_stats(
+    user=Depends(get_current_user), session: Session = Depends(get_session)
+):
+    return ORJSONResponse(journals.journal_stats(session, user.id))
+
+
+@router.get("/journals/7-day-summary", dependencies=[Depends(conditional_get)])
+@releases_session
+def seven_day_summary(
+    user=Depends(get_current_user), session: Session = Depends(get_session)
+):
+    return ORJSONResponse(
+        journals.seven_day_summary(session, user.id, datetime.utcnow().date())
+    )
+
+
+@router.get("/journals/export")
+@releases_session
+def export_journals(
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+):
+    """Every entry, oldest first, streamed as NDJSON or CSV."""
+    # The stream gets its own session on the same engine as the request's
+    return StreamingResponse(
+        bulk.export_entries(session.get_bind(), user.id, format),
+        media_type=bulk.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="journals.{format}"'},
+    )
+
+
+@router.post("/journals/import", response_model=ImportReport)
+@limiter.limit("5/minute")
+async def import_journals(
+    request: Request,
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+    defer_reflections: bool = Query(
+        False, description="Skip queueing reflections; backfill them later"
+    ),
+):
+    """Import an NDJSON body (one entry per line) in batched transactions."""
+    report = await bulk.import_ndjson(
+        request.stream(),
+        lambda batch: run_in_threadpool(
+            bulk.insert_batch, session, user.id, batch, defer_reflections
+        ),
+        JOURNAL_IMPORT_BATCH_SIZE,
+    )
+    if report.imported:
+        reflection_workers.notify()
+    return report
 
 
 # ✅ PUT PARAMETERIZED ROUTES LAST
-@router.get("/journals/{entry_id}", response_model=JournalEntryResponse)
-def get_journal(entry_id: int, user=Depends(get_current_user)):
-    with Session(engine) as session:
-        entry = session.get(JournalEntry, entry_id)
-        if not entry or entry.user_id != user.id:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        return entry
+@router.get(
+    "/journals/{entry_id}",
+    response_model=JournalEntryResponse,
+    dependencies=[Depends(conditional_get)],
+)
+@releases_session
+def get_journal(
+    entry_id: int,
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    return journals.get_owned_entry(session, entry_id, user.id)
+
+
+@router.get("/journals/{entry_id}/reflection", response_model=ReflectionStatusResponse)
+async def wait_for_reflection(
+    entry_id: int,
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+    timeout: float = Query(
+        0, ge=0, le=30, description="Seconds to wait for a pending reflection"
+    ),
+):
+    """Return the reflection state, optionally long-polling until it is ready."""
+
+    def load_entry() -> JournalEntry:
+        try:
+            return journals.get_owned_entry(session, entry_id, user.id)
+        finally:
+            # Release the connection between polls and forget the cached row
+            session.close()
+
+    return await journals.wait_for_reflection(
+        lambda: run_in_threadpool(load_entry), entry_id, timeout
+    )
 
 
 @router.put("/journals/{entry_id}")
+@releases_session
 def update_journal(
     entry_id: int,
     updated: JournalEntryUpdate,
     user=Depends(get_current_user),
+    session: Session = Depends(get_session),
 ):
-    with Session(engine) as session:
-        entry = session.get(JournalEntry, entry_id)
-        if not entry or entry.user_id != user.id:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        entry.title = updated.title
-        entry.content = updated.content
-        entry.mood = updated.mood
-        session.add(entry)
-        session.commit()
-        session.refresh(entry)
-        return {"message": f"Entry {entry_id} updated", "entry": entry}
+    entry = journals.update_entry(session, entry_id, user.id, updated)
+    return {"message": f"Entry {entry_id} updated", "entry": entry}
 
 
 @router.delete("/journals/{entry_id}")
-def delete_journal(entry_id: int, user=Depends(get_current_user)):
-    with Session(engine) as session:
-        entry = session.get(JournalEntry, entry_id)
-        if not entry or entry.user_id != user.id:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        session.delete(entry)
-        session.commit()
-        return {"message": f"Entry {entry_id} deleted"}
\ No newline at end of file
+@releases_session
+def delete_journal(
+    entry_id: int,
+    user=Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    journals.delete_entry(session, entry_id, user.id)
+    return {"message": f"Entry {entry_id} deleted"}
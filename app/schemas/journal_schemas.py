@@ -1,6 +1,8 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime, timezone
+
+from app.config import JOURNAL_BATCH_MAX_ENTRIES
 
 
 class JournalEntryCreate(BaseModel):
@@ -16,14 +18,80 @@ class JournalEntryUpdate(BaseModel):
     reflection: Optional[str] = None  # 🧠 new optional field
 
 
+class JournalEntryImport(BaseModel):
+    """One NDJSON line of POST /journals/import (extra keys are ignored)"""
+
+    title: str
+    content: str
+    mood: str
+    created_at: Optional[datetime] = None
+    reflection: Optional[str] = None
+
+    @field_validator("created_at")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Stored timestamps are naive UTC (datetime.utcnow)
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class JournalEntryResponse(BaseModel):
     id: int
     title: str
     content: str
     mood: str
     reflection: Optional[str] = None
+    reflection_status: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    snippet: Optional[str] = None  # highlighted match, only set for searches
 
     class Config:
         from_attributes = True
+
+
+class JournalPage(BaseModel):
+    items: List[JournalEntryResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportLineError]  # the first few; ``failed`` counts them all
+    seconds: float
+    rows_per_second: float
+
+
+class JournalBatchCreate(BaseModel):
+    # Items are validated one by one, so a bad entry fails alone
+    entries: List[Dict[str, Any]] = Field(
+        min_length=1, max_length=JOURNAL_BATCH_MAX_ENTRIES
+    )
+
+
+class BatchItemResult(BaseModel):
+    index: int  # position in ``entries``
+    status: Literal["created", "invalid"]
+    entry: Optional[JournalEntryResponse] = None
+    # Validation error, or why the reflection is still queued
+    error: Optional[str] = None
+
+
+class BatchCreateResponse(BaseModel):
+    created: int
+    invalid: int
+    reflected: int  # created entries whose reflection is already filled in
+    items: List[BatchItemResult]
+
+
+class ReflectionStatusResponse(BaseModel):
+    entry_id: int
+    reflection_status: str
+    reflection: Optional[str] = None
@@ -0,0 +1,173 @@
+# app/search.py
+"""Full-text search over journal entries.
+
+PostgreSQL gets a generated ``search_vector`` tsvector column with a GIN
+index; SQLite gets an FTS5 table (``journalentry_fts``) that triggers keep in
+sync with ``journalentry``. Both are created alongside the table by
+``create_all`` and by the matching Alembic revision. Other databases, or a
+SQLite build without FTS5, fall back to the old ILIKE scan.
+"""
+import html
+import re
+from typing import Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import DDL, column, event, func, inspect, literal_column, select, table
+from sqlalchemy.engine import Engine
+
+from app.logger import logger
+from app.models import JournalEntry
+
+FTS_TABLE = "journalentry_fts"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# The database marks matches with private-use characters; render_snippet
+# escapes the entry text and only then turns them into the HTML markers.
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, user_id, content='journalentry', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON journalentry BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, content, user_id) "
+    "VALUES (new.id, new.title, new.content, new.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON journalentry BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, user_id) "
+    "VALUES ('delete', old.id, old.title, old.content, old.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    "AFTER UPDATE OF title, content ON journalentry BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, user_id) "
+    "VALUES ('delete', old.id, old.title, old.content, old.user_id); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, content, user_id) "
+    "VALUES (new.id, new.title, new.content, new.user_id); END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE journalentry ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_journalentry_search_vector "
+    "ON journalentry USING GIN (search_vector)",
+]
+
+
+@event.listens_for(JournalEntry.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}
+    for statement in statements.get(connection.dialect.name, []):
+        try:
+            with connection.begin_nested():
+                connection.execute(DDL(statement))
+        except Exception as e:
+            logger.warning("Full-text search unavailable, using ILIKE: %s", e)
+            return
+
+
+event.listen(
+    JournalEntry.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+_fts_tables: "WeakKeyDictionary[Engine, bool]" = WeakKeyDictionary()
+
+
+def fts_backend(bind) -> Optional[str]:
+    """Return "sqlite", "postgresql" or None (no full-text index available)."""
+    engine = bind.engine
+    if engine not in _fts_tables:
+        dialect = engine.dialect.name
+        if dialect == "sqlite":
+            available = inspect(engine).has_table(FTS_TABLE)
+        elif dialect == "postgresql":
+            columns = inspect(engine).get_columns("journalentry")
+            available = any(c["name"] == "search_vector" for c in columns)
+        else:
+            available = False
+        _fts_tables[engine] = available
+    return engine.dialect.name if _fts_tables[engine] else None
+
+
+def search_terms(search: str):
+    return re.findall(r"\w+", search.lower())
+
+
+def ilike_filter(search: str):
+    pattern = f"%{search.lower()}%"
+    return JournalEntry.title.ilike(pattern) | JournalEntry.content.ilike(pattern)
+
+
+def apply_search(
+    statement,
+    search: str,
+    backend: Optional[str],
+    user_id: Optional[int] = None,
+    ranked: bool = True,
+) -> Tuple:
+    """Restrict ``statement`` to entries matching ``search``.
+
+    Every word is prefix-matched and all words must match. On SQLite the
+    owner's id is part of the MATCH so FTS5 only walks that user's postings
+    instead of every user's matches. Returns the new statement plus a rank
+    expression (lower sorts first; None unless ``ranked``) and a snippet
+    expression to pass through ``render_snippet``. Both are None on the ILIKE
+    fallback.
+    """
+    terms = search_terms(search)
+    if backend is None or not terms:
+        return statement.where(ilike_filter(search)), None, None
+
+    if backend == "sqlite":
+        fts = table(FTS_TABLE, column("rowid"))
+        fts_ref = literal_column(FTS_TABLE)
+        query = "{title content} : (%s)" % " ".join(f'"{term}"*' for term in terms)
+        if user_id is not None:
+            query = f'user_id : "{int(user_id)}" AND {query}'
+        match = fts_ref.op("MATCH")(query)
+        snippet = func.snippet(fts_ref, 1, _MATCH_START, _MATCH_END, "…", 16)
+        if ranked:
+            # bm25 is "lower is better"; weight title hits above content hits
+            rank = func.bm25(fts_ref, 10.0, 1.0, 0.0)
+            statement = statement.join(fts, fts.c.rowid == JournalEntry.id).where(match)
+            return statement, rank, snippet
+        # Newest-first: resolve the matches once instead of letting SQLite
+        # walk the created_at index and probe FTS for every entry, and only
+        # build snippets for the rows that are returned.
+        matches = select(fts.c.rowid).where(match)
+        snippet = (
+            select(snippet)
+            .select_from(fts)
+            .where(match, fts.c.rowid == JournalEntry.id)
+            .scalar_subquery()
+        )
+        return statement.where(JournalEntry.id.in_(matches)), None, snippet
+
+    vector = literal_column("journalentry.search_vector")
+    query = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+    statement = statement.where(vector.op("@@")(query))
+    rank = -func.ts_rank_cd(vector, query) if ranked else None
+    snippet = func.ts_headline(
+        "english",
+        JournalEntry.content,
+        query,
+        f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, "
+        "MaxFragments=1, MaxWords=24, MinWords=8",
+    )
+    return statement, rank, snippet
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a raw snippet and wrap its matches in ``<mark>`` tags.
+
+    Entry text is user content, so it is escaped before the markers go in;
+    the result is safe to render as HTML.
+    """
+    if snippet is None:
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(_MATCH_START, HIGHLIGHT_START).replace(
+        _MATCH_END, HIGHLIGHT_END
+    )
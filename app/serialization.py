@@ -0,0 +1,39 @@
+# app/serialization.py
+"""Row-to-bytes path for the journal list and analytics routes.
+
+Returning ORM objects makes FastAPI validate every entry against the
+``response_model``, run the result through ``jsonable_encoder`` and only then
+render it: three passes per row. The list routes instead select just the
+response columns, keep each row as a plain dict and return an
+``ORJSONResponse``, which FastAPI sends as-is. orjson encodes datetimes
+natively, in the same ISO format pydantic produces. ``response_model`` stays
+on the routes for the OpenAPI schema.
+"""
+from sqlalchemy import null
+
+from app.models import JournalEntry
+
+# JournalEntryResponse's fields, in its order (snippet is added per query)
+ENTRY_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "mood",
+    "reflection",
+    "reflection_status",
+    "created_at",
+    "updated_at",
+)
+ENTRY_COLUMNS = [getattr(JournalEntry, name) for name in ENTRY_FIELDS]
+
+
+def entry_dict(row, snippet=None) -> dict:
+    """JournalEntryResponse-shaped dict from a row selected with ENTRY_COLUMNS"""
+    item = {name: row[name] for name in ENTRY_FIELDS}
+    item["snippet"] = snippet
+    return item
+
+
+def optional_column(expression, name: str):
+    """``expression`` labelled ``name``, or a NULL placeholder when absent"""
+    return (expression if expression is not None else null()).label(name)
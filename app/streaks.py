@@ -0,0 +1,162 @@
+# app/streaks.py
+"""Writing streaks: a gaps-and-islands query plus a cached per-user state row.
+
+``UserStreak`` remembers the last day a user wrote, the length of the run of
+consecutive days ending there and the longest run ever, so reading a streak
+is a primary-key lookup. New entries extend or restart the run in place; only
+changes that can split or merge runs in the past (a backdated entry on a new
+day, or deleting the last entry of a day) trigger a full recompute.
+"""
+from datetime import date, datetime
+from typing import Dict
+
+from sqlalchemy import Integer, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import Session, select
+
+from app.models import JournalDailyRollup, UserStreak
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+class day_number(FunctionElement):
+    """Whole days since a fixed epoch, so consecutive dates differ by one."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(day_number)
+def _day_number_default(element, compiler, **kw):
+    return "CAST(julianday(%s) AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_number, "postgresql")
+def _day_number_postgresql(element, compiler, **kw):
+    return "(%s - DATE '1970-01-01')" % compiler.process(element.clauses, **kw)
+
+
+def _locked_state(session: Session, user_id: int) -> UserStreak:
+    """Return the user's state row locked ``FOR UPDATE``, creating it if needed.
+
+    The row is created with ``ON CONFLICT DO NOTHING`` first so two concurrent
+    first writes both end up locking the same row instead of racing to insert.
+    """
+    upsert = _UPSERTS.get(session.get_bind().dialect.name)
+    if upsert is not None:
+        session.execute(
+            upsert(UserStreak)
+            .values(user_id=user_id, current=0, longest=0)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+    state = session.get(
+        UserStreak, user_id, with_for_update=True, populate_existing=True
+    )
+    if state is None:
+        state = UserStreak(user_id=user_id)
+        session.add(state)
+    return state
+
+
+def compute_streak(session: Session, user_id: int) -> UserStreak:
+    """Recompute a user's streak state from the rollup days.
+
+    Days minus their row number is constant within a run of consecutive days
+    (the classic gaps-and-islands trick), so grouping by that difference
+    yields one row per run.
+    """
+    days = (
+        select(JournalDailyRollup.day.label("day"))
+        .where(JournalDailyRollup.user_id == user_id)
+        .distinct()
+        .cte("days")
+    )
+    islands = select(
+        days.c.day,
+        (day_number(days.c.day) - func.row_number().over(order_by=days.c.day)).label(
+            "grp"
+        ),
+    ).cte("islands")
+    runs = (
+        select(
+            func.max(islands.c.day).label("last_day"),
+            func.count().label("length"),
+        )
+        .group_by(islands.c.grp)
+        .cte("runs")
+    )
+    row = session.execute(
+        select(
+            runs.c.last_day,
+            runs.c.length,
+            select(func.max(runs.c.length)).scalar_subquery().label("longest"),
+        )
+        .order_by(runs.c.last_day.desc())
+        .limit(1)
+    ).first()
+
+    state = _locked_state(session, user_id)
+    if row is None:
+        state.last_entry_day, state.current, state.longest = None, 0, 0
+    else:
+        state.last_entry_day = row.last_day
+        state.current, state.longest = row.length, row.longest
+    session.add(state)
+    return state
+
+
+def _day_total(session: Session, user_id: int, day: date) -> int:
+    return session.exec(
+        select(func.coalesce(func.sum(JournalDailyRollup.count), 0)).where(
+            JournalDailyRollup.user_id == user_id,
+            JournalDailyRollup.day == day,
+        )
+    ).one()
+
+
+def streak_entry_added(session: Session, user_id: int, created_at: datetime) -> None:
+    """Fold a new entry into the streak; call after the rollup is bumped."""
+    day = created_at.date()
+    state = _locked_state(session, user_id)
+    if state.last_entry_day is None:
+        compute_streak(session, user_id)
+        return
+    if _day_total(session, user_id, day) > 1:
+        return  # the user already wrote that day
+    gap = (day - state.last_entry_day).days
+    if gap == 1:
+        state.current += 1
+    elif gap > 1:
+        state.current = 1
+    else:
+        # A backdated entry on a new day can bridge two earlier runs
+        compute_streak(session, user_id)
+        return
+    state.last_entry_day = day
+    state.longest = max(state.longest, state.current)
+    session.add(state)
+
+
+def streak_entry_removed(session: Session, user_id: int, created_at: datetime) -> None:
+    """Update the streak after a delete; call after the rollup is decremented."""
+    if _day_total(session, user_id, created_at.date()) == 0:
+        compute_streak(session, user_id)
+
+
+def read_streak(session: Session, user_id: int, today: date) -> Dict[str, int]:
+    """Current and longest streak from the cached state (O(1))."""
+    state = session.get(UserStreak, user_id)
+    if state is None:
+        # Users who wrote before streak state existed get it on first read
+        state = compute_streak(session, user_id)
+        session.commit()
+    if state.last_entry_day is None:
+        return {"current_streak": 0, "longest_streak": 0}
+    active = (today - state.last_entry_day).days <= 1
+    return {
+        "current_streak": state.current if active else 0,
+        "longest_streak": state.longest,
+    }
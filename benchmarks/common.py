@@ -0,0 +1,165 @@
+"""Helpers shared by the benchmark scripts.
+
+* ``percentiles`` / ``print_table``: the same p50/p95/p99 maths and
+  fixed-width table output everywhere.
+* ``write_results``: JSON with the run's environment (commit, Python, CPUs,
+  arguments). ``python -m benchmarks.compare`` diffs two of these files.
+* ``offline_environment`` / ``stub_openai``: run against a throwaway
+  database with no network access; every OpenAI call is answered by a fake
+  client after a configurable delay.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Sequence
+
+
+def percentiles(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 of a list of durations, in milliseconds"""
+    if len(seconds) < 2:
+        value = round(seconds[0] * 1000, 2) if seconds else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    q = statistics.quantiles(seconds, n=100, method="inclusive")
+    return {
+        "p50_ms": round(q[49] * 1000, 2),
+        "p95_ms": round(q[94] * 1000, 2),
+        "p99_ms": round(q[98] * 1000, 2),
+    }
+
+
+def print_table(results: List[dict], columns: Iterable[str]) -> None:
+    columns = list(columns)
+    widths = {
+        c: max([len(c)] + [len(str(r.get(c, ""))) for r in results]) for c in columns
+    }
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in results:
+        cells = []
+        for c in columns:
+            value = r.get(c, "")
+            text = str(value)
+            cells.append(
+                text.rjust(widths[c])
+                if isinstance(value, (int, float))
+                else text.ljust(widths[c])
+            )
+        print("  ".join(cells))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(
+    path: str, benchmark: str, args, results: List[dict], key: Sequence[str]
+) -> None:
+    """``key`` names the fields that identify a row, for ``compare``"""
+    payload = {
+        "benchmark": benchmark,
+        "key": list(key),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "environment": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": os.getenv("DATABASE_URL", "sqlite (temporary)").split("@")[-1],
+        },
+        "args": {k: v for k, v in vars(args).items() if k != "json"},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"Wrote {path}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def offline_environment(database_url: str) -> None:
+    """Settings for an in-process app run; call before importing ``app.main``"""
+    os.environ.update(
+        DATABASE_URL=database_url,
+        ENVIRONMENT="production",  # no SQL echo
+        RATE_LIMIT_STORAGE_URI="memory://",
+        METRICS_DIR="",
+    )
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+
+class _FakeStream:
+    def __init__(self, text: str, delay: float):
+        self.words = text.split(" ")
+        self.delay = delay
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        await asyncio.sleep(self.delay)
+        for i, word in enumerate(self.words):
+            delta = SimpleNamespace(content=word if i == 0 else " " + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=42))
+
+    async def close(self):
+        pass
+
+
+class FakeCompletions:
+    """Stands in for ``client.chat.completions`` with a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def create(self, model, messages, temperature, stream=False, **kwargs):
+        self.calls += 1
+        text = f"A short reflection on: {messages[-1]['content'][-60:]}"
+        if stream:
+            return _FakeStream(text, self.latency)
+        await asyncio.sleep(self.latency)
+        message = SimpleNamespace(content=text)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(total_tokens=42),
+        )
+
+
+class FakeClient:
+    def __init__(self, latency: float):
+        self.chat = SimpleNamespace(completions=FakeCompletions(latency))
+
+    async def close(self):
+        pass
+
+
+def stub_openai(latency: float = 0.05) -> FakeCompletions:
+    """Answer every OpenAI call (ask_gpt, acomplete, astream) offline.
+
+    Only the client is replaced: the concurrency semaphore, timings and
+    metrics in ``openai_utils`` still run as they would in production.
+    """
+    from app.ai import openai_utils
+
+    client = FakeClient(latency)
+    openai_utils.AsyncOpenAI = lambda **kwargs: client
+    return client.chat.completions
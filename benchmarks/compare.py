@@ -0,0 +1,138 @@
+"""Diff two benchmark result files and flag regressions.
+
+Usage::
+
+    python -m benchmarks.load --json before.json
+    # ...change something...
+    python -m benchmarks.load --json after.json
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Rows are matched on the ``key`` fields recorded by ``write_results``
+(endpoint, case, mode and concurrency, ...) and every other numeric field
+present in both is compared. Fields are higher-is-better
+when their name mentions a rate (``rps``, ``per_s``, ``speedup``) and
+lower-is-better for times (``ms``, ``us``) and ``errors``. Any other number
+(counts, sizes) is shown but never flagged. The exit status is 1 when any metric got
+worse by more than ``--threshold`` percent, so the command can gate CI.
+
+The plain lists written by older versions of the benchmarks are accepted
+too; their rows are matched on their text fields.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.common import print_table
+
+HIGHER_IS_BETTER = ("rps", "per_s", "speedup")
+LOWER_IS_BETTER = ("ms", "us", "errors")
+
+
+def load(path: str) -> Tuple[dict, List[dict]]:
+    with open(path) as f:
+        payload = json.load(f)
+    if isinstance(payload, list):
+        return {}, payload
+    return payload, payload["results"]
+
+
+def key_fields(row: dict) -> List[str]:
+    return [k for k, v in row.items() if isinstance(v, (str, bool)) or v is None]
+
+
+def row_key(row: dict, key: Sequence[str]) -> Tuple:
+    return tuple((k, row.get(k)) for k in key)
+
+
+def direction(field: str) -> Optional[int]:
+    """+1 when bigger is better, -1 when smaller is better, None if neutral"""
+    parts = field.lower().split("_")
+    name = field.lower()
+    if any(marker in name for marker in HIGHER_IS_BETTER):
+        return 1
+    if any(marker in parts for marker in LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def compare(
+    before: List[dict],
+    after: List[dict],
+    threshold: float,
+    key: Optional[Sequence[str]] = None,
+) -> List[dict]:
+    by_key: Dict[Tuple, dict] = {
+        row_key(row, key or key_fields(row)): row for row in before
+    }
+    changes = []
+    for row in after:
+        fields = key or key_fields(row)
+        old = by_key.get(row_key(row, fields))
+        if old is None:
+            continue
+        label = " ".join(str(row.get(k)) for k in fields)
+        for field, new_value in row.items():
+            old_value = old.get(field)
+            if field in fields:
+                continue
+            if not isinstance(new_value, (int, float)) or isinstance(new_value, bool):
+                continue
+            if not isinstance(old_value, (int, float)) or old_value == new_value:
+                continue
+            change = (
+                (new_value - old_value) / abs(old_value) * 100 if old_value else None
+            )
+            sense = direction(field)
+            regressed = (
+                sense is not None and change is not None and -sense * change > threshold
+            )
+            changes.append(
+                {
+                    "row": label,
+                    "metric": field,
+                    "before": old_value,
+                    "after": new_value,
+                    "change": "n/a" if change is None else f"{change:+.1f}%",
+                    "regressed": regressed,
+                }
+            )
+    return changes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="percent worse to flag"
+    )
+    args = parser.parse_args(argv)
+
+    before_meta, before = load(args.before)
+    after_meta, after = load(args.after)
+    for name, meta in (("before", before_meta), ("after", after_meta)):
+        env = meta.get("environment")
+        if env:
+            print(
+                f"{name:<6} {meta['benchmark']} @ {env['commit']} "
+                f"({meta['created_at']}, python {env['python']}, {env['cpus']} CPUs)"
+            )
+
+    key = after_meta.get("key") or before_meta.get("key")
+    changes = compare(before, after, args.threshold, key)
+    if not changes:
+        print("No comparable metrics changed.")
+        return 0
+    rows = [dict(c, flag="REGRESSION" if c["regressed"] else "") for c in changes]
+    print_table(rows, ["row", "metric", "before", "after", "change", "flag"])
+    regressions = sum(1 for c in changes if c["regressed"])
+    if regressions:
+        print(f"\n{regressions} metric(s) regressed by more than {args.threshold}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
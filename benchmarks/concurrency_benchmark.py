@@ -0,0 +1,173 @@
+"""Requests/sec of the sync (threadpool) vs async (AsyncSession) route modes.
+
+Usage::
+
+    python -m benchmarks.concurrency_benchmark --concurrency 50 100 250 500
+    DATABASE_URL=postgresql://... python -m benchmarks.concurrency_benchmark
+
+Each mode gets its own uvicorn subprocess (``DB_ASYNC=false`` / ``true``)
+over an identically seeded database (one ``benchmarks.datagen`` user). ``--concurrency`` clients then loop over
+a mix of read endpoints for ``--duration`` seconds each and the throughput
+and latency percentiles are reported. With the default SQLite URL a fresh
+temporary file is created per mode; a Postgres URL is reused as-is (the seed
+user is created once).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import httpx
+from sqlmodel import create_engine
+
+from app.auth import create_access_token
+from benchmarks.common import free_port, percentiles, write_results
+from benchmarks.datagen import seed as seed_users
+
+EMAIL = "bench0@example.com"
+PATHS = [
+    "/journals?limit=20",
+    "/journals/stats",
+    "/journals/mood-trends",
+    "/journals/streak",
+]
+
+
+def seed(url: str, entries: int) -> None:
+    engine = create_engine(url)
+    seed_users(engine, 1, entries)
+    engine.dispose()
+
+
+def start_server(url: str, db_async: bool, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        DB_ASYNC="true" if db_async else "false",
+        ENVIRONMENT="production",
+        REFLECTION_WORKERS="0",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+        + ["--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def drive(base_url: str, headers: dict, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=60
+    ) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user_loop(n: int) -> None:
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    res = await client.get(PATHS[i % len(PATHS)])
+                    ok = res.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+                i += 1
+
+        await asyncio.gather(*(user_loop(n) for n in range(concurrency)))
+    return latencies, errors
+
+
+def run(url, concurrencies, duration, entries):
+    results = []
+    token = create_access_token({"sub": EMAIL}, expires_delta=timedelta(hours=2))
+    headers = {"Authorization": f"Bearer {token}"}
+    for mode in ("sync", "async"):
+        tmp = None
+        mode_url = url
+        if url is None:
+            tmp = tempfile.TemporaryDirectory()
+            mode_url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+        seed(mode_url, entries)
+        port = free_port()
+        server = start_server(mode_url, mode == "async", port)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            asyncio.run(drive(base_url, headers, 10, 1.0))  # warm up
+            for concurrency in concurrencies:
+                latencies, errors = asyncio.run(
+                    drive(base_url, headers, concurrency, duration)
+                )
+                results.append(
+                    {
+                        "mode": mode,
+                        "concurrency": concurrency,
+                        "requests": len(latencies),
+                        "errors": errors,
+                        "rps": round(len(latencies) / duration, 1),
+                        **percentiles(latencies),
+                    }
+                )
+        finally:
+            server.terminate()
+            server.wait()
+            if tmp is not None:
+                tmp.cleanup()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[50, 100, 250, 500]
+    )
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request
+
+    url = os.getenv("DATABASE_URL")
+    if url and url.startswith("sqlite"):
+        url = None  # never load-test the developer's own SQLite file
+    results = run(url, args.concurrency, args.duration, args.entries)
+    print(
+        f"{'mode':<6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'errors':>6}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<6} {r['concurrency']:>7} {r['rps']:>8} {r['p50_ms']:>8} "
+            f"{r['p99_ms']:>8} {r['errors']:>6}"
+        )
+    if args.json:
+        write_results(
+            args.json,
+            "concurrency_benchmark",
+            args,
+            results,
+            key=["mode", "concurrency"],
+        )
+
+
+if __name__ == "__main__":
+    main()
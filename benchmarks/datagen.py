@@ -0,0 +1,165 @@
+"""Seed a database with N users × M realistic journal entries.
+
+Usage::
+
+    python -m benchmarks.datagen --users 20 --entries 500 --database-url sqlite:///bench.db
+
+The same ``--seed`` always produces the same data. Each user writes on
+roughly two days out of three, with occasional multi-entry days and
+breaks, going back from today. Moods follow a skewed distribution, and
+entry lengths are log-normal (mostly short, a long tail of long entries)
+over a Zipf vocabulary. Rollups, streaks and word counts are filled in the
+way the app would, so the analytics routes see consistent data. Every user
+has the password ``PASSWORD``, hashed once.
+"""
+
+import argparse
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import app.search  # noqa: F401  registers the FTS DDL
+from app.analytics import rebuild_rollups
+from app.config import BCRYPT_ROUNDS
+from app.models import JournalEntry, User, content_counts
+from app.passwords import make_context
+from app.streaks import compute_streak
+
+PASSWORD = "bench-password"
+
+COMMON = (
+    "morning evening coffee walk run meditation anxious calm family work "
+    "meeting deadline project friend dinner book movie rain sunshine garden "
+    "sleep dream gratitude stress hike beach music painting cooking travel"
+).split()
+_SYLLABLES = "ka lo mi ren tu sa vel dor an quis bel tor".split()
+# Real journals have a long tail: a few words everywhere, most words rare.
+# Words are drawn with Zipf weights over COMMON plus ~1700 made-up words.
+VOCABULARY = COMMON + [
+    a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES
+]
+CUM_WEIGHTS = list(
+    itertools.accumulate(1.0 / rank for rank in range(1, len(VOCABULARY) + 1))
+)
+MOODS = ["calm", "happy", "tired", "grateful", "anxious", "sad", "excited"]
+MOOD_WEIGHTS = [22, 20, 15, 12, 12, 9, 10]
+# Entries written on one day: nothing, one, or a few
+ENTRIES_PER_DAY = [0, 1, 2, 3]
+DAY_WEIGHTS = [35, 45, 15, 5]
+
+
+@dataclass
+class SeededUser:
+    id: int
+    email: str
+    entries: int
+
+
+def words(rng: random.Random, k: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=k))
+
+
+def entry_length(rng: random.Random) -> int:
+    """Words in an entry: median ~90, occasionally well over 500."""
+    return max(5, min(1500, int(rng.lognormvariate(math.log(90), 0.7))))
+
+
+def user_entries(
+    rng: random.Random, user_id: int, count: int, today: datetime
+) -> Iterator[dict]:
+    day = 0
+    written = 0
+    while written < count:
+        on_day = rng.choices(ENTRIES_PER_DAY, weights=DAY_WEIGHTS)[0]
+        midnight = (today - timedelta(days=day)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        hours = sorted(rng.uniform(6, 23.9) for _ in range(on_day))
+        for hour in hours[: count - written]:
+            created_at = min(midnight + timedelta(hours=hour), today)
+            content = words(rng, entry_length(rng))
+            word_count, char_count = content_counts(content)
+            yield {
+                "title": words(rng, rng.randint(2, 6)).capitalize(),
+                "content": content,
+                "mood": rng.choices(MOODS, weights=MOOD_WEIGHTS)[0],
+                "user_id": user_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "reflection": "Notice what gave you energy today.",
+                "reflection_status": "done",
+                "word_count": word_count,
+                "char_count": char_count,
+            }
+            written += 1
+        day += 1
+
+
+def seed(
+    engine,
+    users: int,
+    entries: int,
+    seed: int = 42,
+    email_prefix: str = "bench",
+    password_rounds: int = BCRYPT_ROUNDS,
+    batch: int = 5000,
+) -> List[SeededUser]:
+    """Create the schema, then ``users`` users with ``entries`` entries each.
+
+    Users that already exist (same e-mail) are returned as they are, so a
+    shared database can be seeded once and reused.
+    """
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(seed)
+    today = datetime.utcnow()
+    hashed = make_context(password_rounds).hash(PASSWORD)
+    seeded = []
+    with Session(engine) as session:
+        for n in range(users):
+            email = f"{email_prefix}{n}@example.com"
+            user = session.exec(select(User).where(User.email == email)).first()
+            if user is not None:
+                seeded.append(SeededUser(user.id, email, entries))
+                continue
+            user = User(email=email, hashed_password=hashed)
+            session.add(user)
+            session.flush()
+            rows = list(user_entries(rng, user.id, entries, today))
+            for i in range(0, len(rows), batch):
+                session.execute(insert(JournalEntry), rows[i : i + batch])
+            rebuild_rollups(session, user.id)
+            compute_streak(session, user.id)
+            session.commit()
+            seeded.append(SeededUser(user.id, email, len(rows)))
+    return seeded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=500, help="per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    users = seed(engine, args.users, args.entries, args.seed)
+    elapsed = time.perf_counter() - started
+    total = sum(user.entries for user in users)
+    print(
+        f"Seeded {len(users)} users and {total} entries into {args.database_url} "
+        f"in {elapsed:.1f}s (password: {PASSWORD})"
+    )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Closed-loop HTTP load test of a realistic request mix, fully offline.
+
+Usage::
+
+    python -m benchmarks.load --users 20 --entries 500 --concurrency 20
+    python -m benchmarks.load --duration 30 --json load.json
+    python -m benchmarks.compare before.json load.json
+
+A throwaway SQLite database is seeded with ``benchmarks.datagen`` and the
+app is driven in-process through ``httpx.ASGITransport`` with its lifespan
+running, so the reflection workers are live. Every OpenAI call is answered
+by ``common.stub_openai`` after ``--openai-latency`` seconds. Rate limits
+are switched off; at the default 5/minute they would turn the test into a
+429 benchmark.
+
+``--concurrency`` virtual users each loop for ``--duration`` seconds. Every
+iteration picks an endpoint from ``ENDPOINTS`` by weight, as one of the
+seeded users with their own token. Mostly dashboard reads, some searches and
+AI reflections, the occasional new entry and login. The first ``--warmup``
+seconds are discarded. Per-endpoint requests, errors, req/s and
+p50/p95/p99 latency are reported, plus a total row.
+
+With ``--url`` the same mix is sent to a running server instead. Its
+database (``--database-url`` or ``DATABASE_URL``) is seeded the same way,
+reusing users that already exist. Run with the server's ``SECRET_KEY`` so
+the tokens minted here are accepted.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import (
+    offline_environment,
+    percentiles,
+    print_table,
+    stub_openai,
+    write_results,
+)
+
+COLUMNS = ["endpoint", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"]
+
+
+@dataclass
+class VirtualUser:
+    email: str
+    headers: Dict[str, str]
+
+
+@dataclass
+class Endpoint:
+    name: str
+    weight: int
+    # (rng, user) -> (method, url, extra httpx.request kwargs)
+    build: Callable[[random.Random, VirtualUser], Tuple[str, str, dict]]
+
+
+def _get(url: str):
+    return lambda rng, user: ("GET", url, {})
+
+
+def _search(rng, user):
+    from benchmarks.datagen import COMMON
+
+    return "GET", "/journals/filter", {"params": {"search": rng.choice(COMMON)}}
+
+
+def _create(rng, user):
+    from benchmarks.datagen import MOODS, entry_length, words
+
+    body = {
+        "title": words(rng, 4).capitalize(),
+        "content": words(rng, entry_length(rng)),
+        "mood": rng.choice(MOODS),
+    }
+    return "POST", "/journals", {"json": body}
+
+
+def _reflect(rng, user):
+    from benchmarks.datagen import MOODS, words
+
+    body = {"entry": words(rng, 40), "mood": rng.choice(MOODS)}
+    return "POST", "/api/ai/reflect", {"json": body}
+
+
+def _login(rng, user):
+    from benchmarks.datagen import PASSWORD
+
+    form = {"username": user.email, "password": PASSWORD}
+    return "POST", "/auth/login", {"data": form}
+
+
+ENDPOINTS = [
+    Endpoint("GET /users/me", 10, _get("/users/me")),
+    Endpoint("GET /journals", 20, _get("/journals?limit=20")),
+    Endpoint("GET /journals/stats", 10, _get("/journals/stats")),
+    Endpoint("GET /journals/mood-trends", 8, _get("/journals/mood-trends")),
+    Endpoint("GET /journals/streak", 10, _get("/journals/streak")),
+    Endpoint("GET /journals/7-day-summary", 8, _get("/journals/7-day-summary")),
+    Endpoint("GET /journals/filter?search", 6, _search),
+    Endpoint("POST /api/ai/reflect", 3, _reflect),
+    Endpoint("POST /journals", 3, _create),
+    Endpoint("POST /auth/login", 1, _login),
+]
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    user: VirtualUser,
+    rng: random.Random,
+    deadline: float,
+    samples: Dict[str, List[Tuple[float, bool]]],
+) -> None:
+    weights = [endpoint.weight for endpoint in ENDPOINTS]
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(ENDPOINTS, weights=weights)[0]
+        method, url, kwargs = endpoint.build(rng, user)
+        started = time.perf_counter()
+        try:
+            res = await client.request(method, url, headers=user.headers, **kwargs)
+            ok = res.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples[endpoint.name].append((time.perf_counter() - started, ok))
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    users: List[VirtualUser],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, List[Tuple[float, bool]]]:
+    samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(
+            virtual_user(
+                client,
+                users[n % len(users)],
+                random.Random(seed + n),
+                deadline,
+                samples,
+            )
+            for n in range(concurrency)
+        )
+    )
+    return samples
+
+
+def summarize(samples: Dict[str, List[Tuple[float, bool]]], duration: float):
+    def row(name, pairs):
+        ok = [seconds for seconds, success in pairs if success]
+        return {
+            "endpoint": name,
+            "requests": len(pairs),
+            "errors": len(pairs) - len(ok),
+            "rps": round(len(pairs) / duration, 1),
+            **percentiles(ok),
+        }
+
+    results = [
+        row(endpoint.name, samples[endpoint.name])
+        for endpoint in ENDPOINTS
+        if samples.get(endpoint.name)
+    ]
+    everything = [pair for pairs in samples.values() for pair in pairs]
+    results.append(row("total", everything))
+    return results
+
+
+async def run(args, users: List[VirtualUser]):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60)
+        lifespan = None
+    else:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        )
+        lifespan = app.router.lifespan_context(app)
+
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            if args.warmup:
+                await drive(client, users, args.concurrency, args.warmup, -args.seed)
+            samples = await drive(
+                client, users, args.concurrency, args.duration, args.seed
+            )
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+    return summarize(samples, args.duration)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=500, help="per user")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--openai-latency", type=float, default=0.3)
+    parser.add_argument("--url", help="load-test this running server instead")
+    parser.add_argument("--database-url", help="the server's database, with --url")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request
+
+    tmp: Optional[tempfile.TemporaryDirectory] = None
+    if args.url:
+        database_url = args.database_url or os.getenv("DATABASE_URL")
+        if not database_url:
+            parser.error("--url needs --database-url or DATABASE_URL to seed")
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    offline_environment(database_url)
+
+    # app.config reads the environment on import
+    from datetime import timedelta
+
+    from sqlmodel import create_engine
+
+    from app.auth import create_access_token
+    from app.limiter import limiter
+    from benchmarks.datagen import seed
+
+    try:
+        engine = create_engine(database_url)
+        started = time.perf_counter()
+        seeded = seed(engine, args.users, args.entries, args.seed)
+        engine.dispose()
+        print(
+            f"{len(seeded)} users x {args.entries} entries seeded in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+        hours = timedelta(seconds=args.warmup + args.duration + 3600)
+        users = [
+            VirtualUser(
+                user.email,
+                {
+                    "Authorization": "Bearer "
+                    + create_access_token({"sub": user.email}, expires_delta=hours)
+                },
+            )
+            for user in seeded
+        ]
+        if not args.url:
+            stub_openai(args.openai_latency)
+            limiter.enabled = False
+        results = asyncio.run(run(args, users))
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    print_table(results, COLUMNS)
+    if args.json:
+        write_results(args.json, "load", args, results, key=["endpoint"])
+
+
+if __name__ == "__main__":
+    main()
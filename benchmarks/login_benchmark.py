@@ -0,0 +1,110 @@
+"""Password verifications/sec: inline on request threads vs the process pool.
+
+Usage::
+
+    python -m benchmarks.login_benchmark --logins 64 --workers 1 2 4
+
+Each mode verifies ``--logins`` passwords from ``--concurrency`` request
+threads, the way sync login handlers do. ``inline`` runs bcrypt on those
+threads (``PASSWORD_WORKERS=0``); ``pool`` hands it to a ``PasswordHasher``
+with the given number of worker processes. Throughput is also reported per
+core used, and a probe thread that wakes every 5 ms measures how late it is
+scheduled meanwhile — a stand-in for how other routes fare during the burst.
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import BCRYPT_ROUNDS
+from benchmarks.common import write_results
+from app.passwords import PasswordHasher, make_context
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.005
+
+
+def probe(stop: threading.Event, lateness: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        time.sleep(PROBE_INTERVAL)
+        lateness.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+def run_mode(hasher, hashed, logins, concurrency):
+    hasher.verify(PASSWORD, hashed)  # warm up (starts the worker processes)
+    stop, lateness = threading.Event(), []
+    prober = threading.Thread(target=probe, args=(stop, lateness))
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as threads:
+        results = list(
+            threads.map(lambda _: hasher.verify(PASSWORD, hashed), range(logins))
+        )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    assert all(results)
+    q = statistics.quantiles(lateness, n=100) if len(lateness) > 1 else [0] * 99
+    return elapsed, q
+
+
+def run(logins, concurrency, workers, rounds):
+    hashed = make_context(rounds).hash(PASSWORD)
+    cpus = os.cpu_count() or 1
+    results = []
+    for mode, count in [("inline", 0)] + [("pool", n) for n in workers]:
+        # Everyone queues in pool mode; admission control is not under test
+        hasher = PasswordHasher(workers=count, max_pending=logins, rounds=rounds)
+        try:
+            elapsed, q = run_mode(hasher, hashed, logins, concurrency)
+        finally:
+            hasher.shutdown()
+        cores = min(count, cpus) if count else cpus
+        results.append(
+            {
+                "mode": mode,
+                "workers": count,
+                "rounds": rounds,
+                "logins_per_s": round(logins / elapsed, 2),
+                "per_core": round(logins / elapsed / cores, 2),
+                "probe_p50_ms": round(q[49] * 1000, 2),
+                "probe_p99_ms": round(q[98] * 1000, 2),
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1]
+    )
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.logins, args.concurrency, sorted(set(args.workers)), args.rounds)
+    print(f"{os.cpu_count()} CPU(s), bcrypt cost {args.rounds}")
+    print(
+        f"{'mode':<7} {'workers':>7} {'logins/s':>9} {'per core':>9} "
+        f"{'probe p50':>10} {'probe p99':>10}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<7} {r['workers']:>7} {r['logins_per_s']:>9} "
+            f"{r['per_core']:>9} {r['probe_p50_ms']:>10} {r['probe_p99_ms']:>10}"
+        )
+    if args.json:
+        write_results(
+            args.json, "login_benchmark", args, results, key=["mode", "workers"]
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Micro-benchmarks of the streak, analytics and auth building blocks.
+
+Usage::
+
+    python -m benchmarks.micro --entries 2000
+    python -m benchmarks.micro --only streak --json micro.json
+
+A throwaway SQLite database is seeded with ``benchmarks.datagen`` and each
+case from ``build_cases`` is called in-process on one seeded user, outside any
+route, so the numbers isolate the query plus its Python post-processing.
+Every case is run ``--number`` times per round for ``--rounds`` rounds. The
+median per-call time of the rounds and the matching calls/s are reported.
+
+Write cases roll their session back after each call, so every call sees
+the same state; the rollback is part of the timing.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+from benchmarks.common import offline_environment, print_table, write_results
+
+COLUMNS = ["case", "us_per_call", "best_us", "calls_per_s"]
+
+
+def build_cases(session, user_id: int, token: str) -> Dict[str, Callable]:
+    """name -> fn(session); imported late, after the environment is set"""
+    from app import analytics, journals, streaks
+    from app.auth import get_current_user, principal_cache
+    from app.models import UserStreak
+
+    today = date.today()
+    now = datetime.utcnow()
+    # The common case: the first entry of the day after the last one
+    last_day = session.get(UserStreak, user_id).last_entry_day
+    next_entry = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+
+    def streak_entry_added(session):
+        streaks.streak_entry_added(session, user_id, next_entry)
+        session.rollback()
+
+    def get_current_user_uncached(session):
+        principal_cache.clear()
+        get_current_user(token=token, session=session)
+
+    return {
+        "streak.compute_streak": lambda s: (
+            streaks.compute_streak(s, user_id),
+            s.rollback(),
+        ),
+        "streak.read_streak": lambda s: streaks.read_streak(s, user_id, today),
+        "streak.streak_entry_added": streak_entry_added,
+        "stats.journal_stats": lambda s: journals.journal_stats(s, user_id),
+        "stats.mood_counts_30_days": lambda s: analytics.mood_counts(
+            s, user_id, now - timedelta(days=30), now
+        ),
+        "trend.mood_trends": lambda s: journals.mood_trends(s, user_id),
+        "trend.seven_day_summary": lambda s: journals.seven_day_summary(
+            s, user_id, today
+        ),
+        "auth.get_current_user_uncached": get_current_user_uncached,
+        "auth.get_current_user_cached": lambda s: get_current_user(
+            token=token, session=s
+        ),
+    }
+
+
+def time_case(fn: Callable, session, number: int, rounds: int) -> dict:
+    fn(session)  # warm caches and the statement cache
+    per_call: List[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn(session)
+        per_call.append((time.perf_counter() - started) / number)
+    median = statistics.median(per_call)
+    return {
+        "us_per_call": round(median * 1e6, 1),
+        "best_us": round(min(per_call) * 1e6, 1),
+        "calls_per_s": round(1 / median, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--entries", type=int, default=2000, help="per user")
+    parser.add_argument("--number", type=int, default=200, help="calls per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--only", help="run the cases whose name contains this")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory()
+    database_url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    offline_environment(database_url)
+
+    # app.config reads the environment on import
+    from sqlmodel import Session, create_engine
+
+    from app.auth import create_access_token
+    from benchmarks.datagen import seed
+
+    results = []
+    try:
+        engine = create_engine(database_url)
+        user = seed(engine, args.users, args.entries, args.seed)[0]
+        token = create_access_token({"sub": user.email})
+        with Session(engine) as session:
+            cases = build_cases(session, user.id, token)
+            for name, fn in cases.items():
+                if args.only and args.only not in name:
+                    continue
+                timing = time_case(fn, session, args.number, args.rounds)
+                results.append({"case": name, **timing})
+        engine.dispose()
+    finally:
+        tmp.cleanup()
+
+    print_table(results, COLUMNS)
+    if args.json:
+        write_results(args.json, "micro", args, results, key=["case"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare full-text search against the old ILIKE scan on SQLite.
+
+Usage::
+
+    python -m benchmarks.search_benchmark --sizes 10000 100000
+
+For each size a throwaway SQLite database is filled with that many entries
+for one user (plus the same again spread over other users), and the
+/journals/filter search statement is timed with the ILIKE fallback and with
+full-text search, both ranked by relevance (the default) and by recency.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import app.search  # noqa: F401  registers the FTS DDL
+from app.models import JournalEntry, User
+from app.search import apply_search, fts_backend
+from benchmarks.common import write_results
+from benchmarks.datagen import VOCABULARY, words
+
+MOODS = ["happy", "sad", "calm", "anxious", "grateful", "tired"]
+QUERIES = {
+    "common word": "meditation",
+    "rare word": VOCABULARY[-1],
+    "prefix": VOCABULARY[900][:5],
+    "two words": f"coffee {VOCABULARY[200]}",
+    "no match": "zeppelin",
+}
+
+
+def _entries(user_id, count, rng):
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        yield {
+            "title": words(rng, 3).capitalize(),
+            "content": words(rng, rng.randint(40, 200)),
+            "mood": rng.choice(MOODS),
+            "user_id": user_id,
+            "created_at": start + timedelta(minutes=37 * i),
+            "updated_at": start + timedelta(minutes=37 * i),
+            "reflection_status": "done",
+        }
+
+
+def seed(engine, per_user, rng, batch=5000):
+    with Session(engine) as session:
+        users = [
+            User(email=f"bench{i}@example.com", hashed_password="x") for i in range(5)
+        ]
+        session.add_all(users)
+        session.commit()
+        counts = [per_user] + [per_user // 4] * 4
+        for user, count in zip(users, counts):
+            rows = list(_entries(user.id, count, rng))
+            for i in range(0, len(rows), batch):
+                session.execute(insert(JournalEntry), rows[i : i + batch])
+            session.commit()
+        return users[0].id
+
+
+def time_query(engine, user_id, query, backend, repeat, ranked=True):
+    timings = []
+    with Session(engine) as session:
+        for _ in range(repeat):
+            statement = select(JournalEntry).where(JournalEntry.user_id == user_id)
+            statement, rank, snippet = apply_search(
+                statement, query, backend, user_id, ranked=ranked
+            )
+            if snippet is not None:
+                statement = statement.add_columns(snippet)
+            if rank is not None:
+                statement = statement.order_by(rank)
+            statement = statement.order_by(JournalEntry.created_at.desc()).limit(10)
+            started = time.perf_counter()
+            session.execute(statement).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(sizes, repeat):
+    rng = random.Random(42)
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            SQLModel.metadata.create_all(engine)
+            started = time.perf_counter()
+            user_id = seed(engine, size, rng)
+            seeded = time.perf_counter() - started
+            backend = fts_backend(engine)
+            for label, query in QUERIES.items():
+                ilike_ms = time_query(engine, user_id, query, None, repeat)
+                fts_ms = time_query(engine, user_id, query, backend, repeat)
+                recent_ms = time_query(
+                    engine, user_id, query, backend, repeat, ranked=False
+                )
+                results.append(
+                    {
+                        "entries_per_user": size,
+                        "query": label,
+                        "ilike_ms": round(ilike_ms, 3),
+                        "fts_ms": round(fts_ms, 3),
+                        "fts_recent_ms": round(recent_ms, 3),
+                        "speedup": round(ilike_ms / fts_ms, 1) if fts_ms else None,
+                    }
+                )
+            print(f"seeded {size} entries/user in {seeded:.1f}s")
+            engine.dispose()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat)
+    print(
+        f"{'entries':>9} {'query':<14} {'ilike ms':>10} {'fts ms':>10} "
+        f"{'fts recent':>10} {'x':>7}"
+    )
+    for r in results:
+        print(
+            f"{r['entries_per_user']:>9} {r['query']:<14} {r['ilike_ms']:>10} "
+            f"{r['fts_ms']:>10} {r['fts_recent_ms']:>10} {r['speedup']:>7}"
+        )
+    if args.json:
+        write_results(
+            args.json,
+            "search_benchmark",
+            args,
+            results,
+            key=["entries_per_user", "query"],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Serialization time and bytes on the wire for a 1k-entry journal listing.
+
+Usage::
+
+    python -m benchmarks.serialization_benchmark --entries 1000 --repeat 20
+
+``before`` is what ``GET /journals?paginate=false`` used to do: load ORM
+entities, validate them against ``List[JournalEntryResponse]``, dump them in
+JSON mode and render with the stdlib ``json`` module. ``after`` is the
+current row-to-bytes path: select the response columns as dicts and encode
+them with orjson. Both bodies are then compressed the way the
+``CompressionMiddleware`` would.
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import brotli
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models import JournalEntry, User
+from app.schemas.journal_schemas import JournalEntryResponse
+from app.serialization import ENTRY_COLUMNS, entry_dict
+from benchmarks.common import write_results
+
+ENTRIES = TypeAdapter(List[JournalEntryResponse])
+
+
+def seed(engine, entries: int) -> int:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(email="bench@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        now = datetime.utcnow()
+        session.execute(
+            insert(JournalEntry),
+            [
+                {
+                    "title": f"Entry {i}",
+                    "content": "Walked by the river and thought about work. " * 5,
+                    "mood": ("calm", "happy", "tired")[i % 3],
+                    "reflection": "Consider what made the walk feel restful.",
+                    "reflection_status": "done",
+                    "user_id": user.id,
+                    "created_at": now - timedelta(hours=6 * i),
+                    "updated_at": now,
+                }
+                for i in range(entries)
+            ],
+        )
+        session.commit()
+        return user.id
+
+
+def before(session: Session, user_id: int) -> bytes:
+    rows = session.exec(
+        select(JournalEntry)
+        .where(JournalEntry.user_id == user_id)
+        .order_by(JournalEntry.created_at.desc())
+    ).all()
+    content = ENTRIES.dump_python(ENTRIES.validate_python(rows), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def after(session: Session, user_id: int) -> bytes:
+    rows = session.execute(
+        select(*ENTRY_COLUMNS)
+        .where(JournalEntry.user_id == user_id)
+        .order_by(JournalEntry.created_at.desc())
+    ).mappings()
+    return orjson.dumps([entry_dict(row) for row in rows])
+
+
+def timed(fn, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(times)
+
+
+def run(entries: int, repeat: int):
+    engine = create_engine("sqlite://")
+    user_id = seed(engine, entries)
+    results = []
+    with Session(engine) as session:
+        for name, fn in (("before", before), ("after", after)):
+            session.expunge_all()
+            body, ms = timed(lambda: fn(session, user_id), repeat)
+            gz, gz_ms = timed(lambda: gzip.compress(body, compresslevel=6), repeat)
+            br, br_ms = timed(lambda: brotli.compress(body, quality=4), repeat)
+            results.append(
+                {
+                    "path": name,
+                    "entries": entries,
+                    "build_ms": round(ms, 2),
+                    "bytes": len(body),
+                    "gzip_bytes": len(gz),
+                    "gzip_ms": round(gz_ms, 2),
+                    "br_bytes": len(br),
+                    "br_ms": round(br_ms, 2),
+                }
+            )
+    engine.dispose()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.entries, args.repeat)
+    print(
+        f"{'path':<7} {'build ms':>9} {'bytes':>8} {'gzip':>8} {'gzip ms':>8} "
+        f"{'br':>8} {'br ms':>7}"
+    )
+    for r in results:
+        print(
+            f"{r['path']:<7} {r['build_ms']:>9} {r['bytes']:>8} {r['gzip_bytes']:>8} "
+            f"{r['gzip_ms']:>8} {r['br_bytes']:>8} {r['br_ms']:>7}"
+        )
+    if args.json:
+        write_results(args.json, "serialization_benchmark", args, results, key=["path"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,33 @@
 # tests/conftest.py
+import os
+import tempfile
+import uuid
+
+# ✅ Rate-limit counters in a throwaway file, not the checkout's var/
+os.environ.setdefault(
+    "RATE_LIMIT_STORAGE_URI",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(), "ratelimit.db"),
+)
+# ✅ Metrics snapshots of this test run only
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp())
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy.pool import StaticPool
 from app.logger import logger
 from app.main import app
 from app.database import get_session  # your real dependency
+from app.ai import openai_utils
+from app.ai.reflection_cache import ReflectionCache
+from app.limiter import limiter
 
 # ✅ In-memory test DB engine
 TEST_DATABASE_URL = "sqlite://"
 test_engine = create_engine(
-    TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,  # one shared connection, so worker threads see the data
 )
 
 
@@ -20,6 +38,20 @@ def setup_and_reset_db():
     SQLModel.metadata.create_all(test_engine)
 
 
+# ✅ Each test starts with fresh rate-limit counters
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    limiter.reset()
+
+
+# ✅ Keep AI cache entries out of the real database
+@pytest.fixture(autouse=True)
+def reflection_cache(monkeypatch):
+    cache = ReflectionCache(engine=test_engine)
+    monkeypatch.setattr(openai_utils, "reflection_cache", cache)
+    return cache
+
+
 # ✅ Provide test session
 @pytest.fixture()
 def session():
@@ -27,11 +59,12 @@ def session():
         yield session
 
 
-# ✅ Override the app’s get_session to use test session
+# ✅ Override the app’s get_session: one test-DB session per request
 @pytest.fixture()
 def client(session):
     def override_get_session():
-        yield session
+        with Session(test_engine) as request_session:
+            yield request_session
 
     app.dependency_overrides[get_session] = override_get_session
 
@@ -41,3 +74,16 @@ def client(session):
         logger.info(r.path)
 
     return TestClient(app)
+
+
+@pytest.fixture()
+def auth_headers(client):
+    """Call to register and log in a new user; returns its bearer header."""
+
+    def register_and_login(email=None):
+        email = email or f"testuser_{uuid.uuid4().hex[:6]}@example.com"
+        client.post("/auth/register", json={"email": email, "password": "pw"})
+        res = client.post("/auth/login", data={"username": email, "password": "pw"})
+        return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    return register_and_login
@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.ai import openai_utils
+from app.ai.streaming import sse_completion
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, messages, temperature, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        message = SimpleNamespace(content=f"  echo: {messages[-1]['content']}  ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _fake_client(monkeypatch, completions, concurrency=32):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    semaphores = {}
+
+    def get_semaphore():
+        loop = asyncio.get_running_loop()
+        return semaphores.setdefault(loop, asyncio.Semaphore(concurrency))
+
+    monkeypatch.setattr(openai_utils, "get_async_client", lambda: client)
+    monkeypatch.setattr(openai_utils, "get_semaphore", get_semaphore)
+
+
+def test_acomplete_bounds_concurrency(monkeypatch):
+    completions = FakeCompletions(delay=0.02)
+    _fake_client(monkeypatch, completions, concurrency=2)
+
+    async def run():
+        return await asyncio.gather(
+            *(openai_utils.acomplete(f"prompt {i}") for i in range(6))
+        )
+
+    results = asyncio.run(run())
+    assert results[3] == "echo: prompt 3"
+    assert completions.max_in_flight == 2
+
+
+def test_ask_gpt_reports_errors_as_text(monkeypatch):
+    def broken():
+        raise RuntimeError("no key")
+
+    monkeypatch.setattr(openai_utils, "get_async_client", broken)
+    result = asyncio.run(openai_utils.ask_gpt("hello"))
+    assert result == "Error from OpenAI: no key"
+
+
+def test_respond_route_uses_async_client(client, monkeypatch):
+    _fake_client(monkeypatch, FakeCompletions())
+    res = client.post("/api/ai/respond", json={"prompt": "hi"})
+    assert res.status_code == 200
+    assert res.json() == {"response": "echo: hi"}
+
+
+class FakeStream:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for piece in self.pieces:
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeStreamingCompletions:
+    def __init__(self, pieces):
+        self.stream = FakeStream(pieces)
+
+    async def create(self, model, messages, temperature, stream=False, **kwargs):
+        assert stream
+        return self.stream
+
+
+def test_respond_streams_server_sent_events(client, monkeypatch):
+    completions = FakeStreamingCompletions([" Take", " a", " breath."])
+    _fake_client(monkeypatch, completions)
+
+    res = client.post("/api/ai/respond?stream=true", json={"prompt": "hi"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in res.text.split("\n\n") if block]
+    assert events[0] == 'event: token\ndata: {"delta": "Take"}'
+    assert events[-1] == 'event: done\ndata: {"response": "Take a breath."}'
+    assert completions.stream.closed
+
+
+def test_closing_the_event_stream_closes_upstream(monkeypatch):
+    completions = FakeStreamingCompletions(["one", " two", " three"])
+    _fake_client(monkeypatch, completions)
+
+    async def run():
+        events = sse_completion(
+            openai_utils.astream("prompt"), lambda text: {"response": text}
+        )
+        first = await events.__anext__()
+        await events.aclose()  # what EventSourceResponse does on disconnect
+        return first
+
+    assert "one" in asyncio.run(run())
+    assert completions.stream.closed
@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from app.analytics import mood_counts, rebuild_rollups, rollup_entry_added
+from tests.conftest import test_engine
+from app.models import JournalDailyRollup, JournalEntry
+
+
+def _rollup(user_id):
+    with Session(test_engine) as session:
+        return sorted(
+            (row.day.isoformat(), row.mood, row.count)
+            for row in session.exec(
+                select(JournalDailyRollup).where(JournalDailyRollup.user_id == user_id)
+            )
+        )
+
+
+def test_rollup_follows_create_update_delete(client, auth_headers):
+    headers = auth_headers()
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    ids = [
+        client.post(
+            "/journals",
+            json={"title": "t", "content": "c", "mood": mood},
+            headers=headers,
+        ).json()["entry"]["id"]
+        for mood in ("calm", "calm", "sad")
+    ]
+    today = datetime.utcnow().date().isoformat()
+    assert _rollup(user_id) == [(today, "calm", 2), (today, "sad", 1)]
+
+    client.put(f"/journals/{ids[0]}", json={"mood": "happy"}, headers=headers)
+    client.delete(f"/journals/{ids[2]}", headers=headers)
+    expected = [(today, "calm", 1), (today, "happy", 1)]
+    assert _rollup(user_id) == expected
+    assert client.get(f"/journals/{ids[0]}", headers=headers).json()["title"] == "t"
+
+    res = client.get("/journals/mood-trends", headers=headers).json()
+    assert res == [{"date": today, "moods": {"calm": 1, "happy": 1}}]
+    res = client.get("/journals/7-day-summary", headers=headers).json()
+    assert res["last_7_days"][today] == {"count": 2, "moods": {"calm": 1, "happy": 1}}
+
+    with Session(test_engine) as session:
+        rebuild_rollups(session, user_id=user_id)
+        session.commit()
+    assert _rollup(user_id) == expected
+
+
+def test_mood_summary_counts_partial_days_from_raw_entries(client, auth_headers):
+    headers = auth_headers()
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    with Session(test_engine) as session:
+        for stamp, mood in [
+            ("2026-03-01 08:00", "calm"),
+            ("2026-03-01 20:00", "sad"),
+            ("2026-03-02 12:00", "calm"),
+            ("2026-03-03 07:00", "happy"),
+            ("2026-03-03 22:00", "happy"),
+        ]:
+            entry = JournalEntry(
+                title="t",
+                content="c",
+                mood=mood,
+                user_id=user_id,
+                created_at=datetime.fromisoformat(stamp),
+            )
+            session.add(entry)
+            rollup_entry_added(session, entry)
+        session.commit()
+
+        def summary(start, end):
+            return mood_counts(
+                session,
+                user_id,
+                start and datetime.fromisoformat(start),
+                end and datetime.fromisoformat(end),
+            )
+
+        assert summary(None, None) == {"calm": 2, "sad": 1, "happy": 2}
+        assert summary("2026-03-01 12:00", "2026-03-03 12:00") == {
+            "sad": 1,
+            "calm": 1,
+            "happy": 1,
+        }
+        assert summary("2026-03-02 00:00", None) == {"calm": 1, "happy": 2}
+        assert summary("2026-03-03 06:00", "2026-03-03 08:00") == {"happy": 1}
+
+
+def test_stats_use_stored_counts(client, auth_headers):
+    headers = auth_headers()
+    assert client.get("/journals/stats", headers=headers).json() == {
+        "message": "No journal entries found."
+    }
+    for content, mood in [
+        ("one two three", "calm"),
+        ("four five", "sad"),
+        ("six", "calm"),
+    ]:
+        entry_id = client.post(
+            "/journals",
+            json={"title": "t", "content": content, "mood": mood},
+            headers=headers,
+        ).json()["entry"]["id"]
+
+    client.put(
+        f"/journals/{entry_id}", json={"content": "six seven eight"}, headers=headers
+    )
+    entry = client.get(f"/journals/{entry_id}", headers=headers).json()
+    with Session(test_engine) as session:
+        stored = session.get(JournalEntry, entry["id"])
+        assert (stored.word_count, stored.char_count) == (3, 15)
+
+    stats = client.get("/journals/stats", headers=headers).json()
+    assert stats["total_entries"] == 3
+    assert stats["total_words"] == 8
+    assert stats["total_characters"] == 13 + 9 + 15
+    assert stats["average_words_per_entry"] == 2.67
+    assert stats["most_common_mood"] == "calm"
+    assert stats["first_entry"] <= stats["latest_entry"]
@@ -0,0 +1,113 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.search  # noqa: F401  full-text index DDL
+from app import batch
+from app.database import async_database_url, get_async_session
+from app.etags import ETagMiddleware, NotModified, not_modified_handler
+from app.limiter import limiter
+from app.routes.async_auth_routes import router as auth_router
+from app.routes.async_journal_routes import router as journal_router
+
+
+@pytest.fixture()
+def async_client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    SQLModel.metadata.create_all(sync_engine)
+    async_engine = create_async_engine(async_database_url(url))
+
+    async def override_get_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    api = FastAPI()
+    api.state.limiter = limiter
+    api.add_middleware(ETagMiddleware)
+    api.add_exception_handler(NotModified, not_modified_handler)
+    api.include_router(auth_router)
+    api.include_router(journal_router)
+    api.dependency_overrides[get_async_session] = override_get_async_session
+    with TestClient(api) as client:
+        yield client
+    sync_engine.dispose()
+
+
+def test_async_url_swaps_driver():
+    assert (
+        async_database_url("sqlite:///journal.db") == "sqlite+aiosqlite:///journal.db"
+    )
+    assert (
+        async_database_url("postgresql+psycopg2://u:p@db/mv")
+        == "postgresql+asyncpg://u:p@db/mv"
+    )
+
+
+def test_async_journal_routes_round_trip(async_client, monkeypatch):
+    client = async_client
+    creds = {"email": "async@example.com", "password": "pw"}
+    assert client.post("/auth/register", json=creds).status_code == 200
+    assert client.post("/auth/register", json=creds).status_code == 400
+    token = client.post(
+        "/auth/login", data={"username": creds["email"], "password": "pw"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    ids = [
+        client.post(
+            "/journals",
+            json={"title": f"Async {i}", "content": "Quiet lake walk.", "mood": "calm"},
+            headers=headers,
+        ).json()["entry"]["id"]
+        for i in range(3)
+    ]
+    page = client.get("/journals?limit=2", headers=headers).json()
+    assert [e["id"] for e in page["items"]] == ids[:0:-1]
+    page = client.get(
+        f"/journals?limit=2&cursor={page['next_cursor']}", headers=headers
+    ).json()
+    assert [e["id"] for e in page["items"]] == ids[:1]
+
+    res = client.get("/journals/filter?search=lake", headers=headers)
+    assert len(res.json()["items"]) == 3
+    assert client.get("/journals/stats", headers=headers).json()["total_words"] == 9
+    assert client.get("/journals/streak", headers=headers).json() == {
+        "current_streak": 1,
+        "longest_streak": 1,
+    }
+    assert client.get("/journals/mood-summary", headers=headers).json() == {
+        "summary": {"calm": 3}
+    }
+
+    client.put(f"/journals/{ids[0]}", json={"mood": "happy"}, headers=headers)
+    client.delete(f"/journals/{ids[1]}", headers=headers)
+    assert client.get(f"/journals/{ids[1]}", headers=headers).status_code == 404
+    res = client.get(f"/journals/{ids[0]}/reflection", headers=headers).json()
+    assert res["reflection_status"] == "pending"
+    trends = client.get("/journals/mood-trends", headers=headers).json()
+    assert trends[0]["moods"] == {"calm": 1, "happy": 1}
+
+    etag = client.get("/journals/mood-trends", headers=headers).headers["etag"]
+    res = client.get(
+        "/journals/mood-trends", headers={**headers, "If-None-Match": etag}
+    )
+    assert res.status_code == 304
+
+    exported = client.get("/journals/export", headers=headers).content
+    assert exported.count(b"\n") == 2
+    report = client.post("/journals/import", content=exported, headers=headers)
+    assert report.json()["imported"] == 2
+
+    async def complete(prompt):
+        return "Noted."
+
+    monkeypatch.setattr(batch, "acomplete", complete)
+    entries = [{"title": "Synced", "content": "From the plane.", "mood": "calm"}, {}]
+    res = client.post("/journals/batch", json={"entries": entries}, headers=headers)
+    body = res.json()
+    assert (body["created"], body["invalid"], body["reflected"]) == (1, 1, 1)
+    assert body["items"][0]["entry"]["reflection"] == "Noted."
@@ -1,3 +1,4 @@
+import time
 import uuid
 
 
@@ -17,3 +18,54 @@ def test_register_and_login(client):
     res = client.post("/auth/login", data=login_data)
     assert res.status_code == 200
     assert "access_token" in res.json()
+
+
+def test_repeat_requests_skip_token_verification(client, monkeypatch):
+    from app import auth
+
+    email = f"testuser_{uuid.uuid4().hex[:6]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": email, "password": "pw"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(
+        auth.jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw)
+    )
+    for _ in range(3):
+        res = client.get("/users/me", headers=headers)
+        assert res.status_code == 200
+        assert res.json()["email"] == email
+    assert len(decodes) == 1
+
+
+def test_principal_cache_evicts_changed_users(session):
+    from app.auth import PrincipalCache, principal_cache
+    from app.models import User
+
+    user = User(email="cached@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    principal_cache.put("some-token", user, time.time() + 60)
+    assert principal_cache.get("some-token").email == "cached@example.com"
+
+    user.email = "renamed@example.com"
+    session.add(user)
+    session.commit()
+    assert principal_cache.get("some-token") is None
+
+    small = PrincipalCache(max_size=1)
+    small.put("a", user, time.time() + 60)
+    small.put("b", user, time.time() + 60)
+    assert small.get("a") is None
+    small.put("c", user, time.time() - 1)
+    assert small.get("c") is None
+
+
+def test_register_rejects_duplicate_email(client):
+    data = {"email": f"dup_{uuid.uuid4().hex[:6]}@example.com", "password": "pw"}
+    assert client.post("/auth/register", json=data).status_code == 200
+    assert client.post("/auth/register", json=data).status_code == 400
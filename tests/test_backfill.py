@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+from sqlmodel import select
+
+from app.commands.backfill_reflections import backfill, fake_completion
+from app.models import JournalEntry, ReflectionJob, User
+from tests.conftest import test_engine
+
+
+def _seed(session):
+    user = User(email="backfill@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    rows = [
+        ("Old entry", None, "failed"),
+        ("Broken call", "Error from OpenAI: timeout", "failed"),
+        ("Fine", "Already reflected.", "done"),
+        ("Queued", None, "pending"),
+        ("Another old one", None, "failed"),
+    ]
+    for title, reflection, status in rows:
+        session.add(
+            JournalEntry(
+                title=title,
+                content="Some text.",
+                mood="calm",
+                user_id=user.id,
+                reflection=reflection,
+                reflection_status=status,
+            )
+        )
+    session.commit()
+
+
+def _reflections(session):
+    session.expire_all()
+    entries = session.exec(select(JournalEntry).order_by(JournalEntry.id)).all()
+    return {e.title: (e.reflection, e.reflection_status) for e in entries}
+
+
+def test_backfill_fills_missing_and_failed_reflections(session, tmp_path):
+    _seed(session)
+    checkpoint = tmp_path / "progress.json"
+
+    report = asyncio.run(
+        backfill(
+            test_engine,
+            fake_completion(latency=0),
+            chunk_size=2,
+            concurrency=4,
+            requests_per_minute=0,
+            checkpoint_path=str(checkpoint),
+        )
+    )
+
+    assert report.processed == 3
+    assert report.updated == 3
+    result = _reflections(session)
+    assert result["Old entry"] == ("A gentle reflection on 'Old entry'.", "done")
+    assert result["Broken call"][1] == "done"
+    assert result["Fine"] == ("Already reflected.", "done")
+    assert result["Queued"] == (None, "pending")
+    assert not checkpoint.exists()  # drained, so the next run starts over
+
+
+def test_backfill_resumes_from_checkpoint(session, tmp_path):
+    _seed(session)
+    checkpoint = str(tmp_path / "progress.json")
+    calls = []
+
+    async def complete(prompt):
+        calls.append(prompt)
+        return "ok"
+
+    def run(max_chunks=None):
+        return asyncio.run(
+            backfill(
+                test_engine,
+                complete,
+                chunk_size=1,
+                requests_per_minute=0,
+                checkpoint_path=checkpoint,
+                max_chunks=max_chunks,
+            )
+        )
+
+    first = run(max_chunks=1)  # "interrupted" after one chunk
+    assert first.processed == 1
+    assert json.loads(open(checkpoint).read())["processed"] == 1
+    second = run()
+    assert second.processed == 3
+    assert len(calls) == 3
+
+
+def test_failures_are_recorded_not_raised(session):
+    _seed(session)
+
+    async def broken(prompt):
+        raise RuntimeError("quota exceeded")
+
+    report = asyncio.run(
+        backfill(test_engine, broken, requests_per_minute=0, checkpoint_path=None)
+    )
+    assert report.failed == 3
+    assert _reflections(session)["Old entry"] == (None, "failed")
+
+
+def test_a_finished_run_leaves_failures_for_the_next_one(session, tmp_path):
+    _seed(session)
+    checkpoint = str(tmp_path / "progress.json")
+    old = session.exec(select(JournalEntry).where(JournalEntry.title == "Old entry"))
+    entry_id = old.one().id
+    session.add(ReflectionJob(entry_id=entry_id, status="failed", attempts=5))
+    session.commit()
+
+    async def broken(prompt):
+        raise RuntimeError("quota exceeded")
+
+    def run(complete):
+        return asyncio.run(
+            backfill(
+                test_engine,
+                complete,
+                requests_per_minute=0,
+                checkpoint_path=checkpoint,
+            )
+        )
+
+    assert run(broken).failed == 3
+    retry = run(fake_completion(latency=0))
+    assert (retry.processed, retry.updated) == (3, 3)
+    assert _reflections(session)["Old entry"][1] == "done"
+    assert session.exec(select(ReflectionJob)).all() == []
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from sqlmodel import func, select
+
+from app import batch
+from app.config import JOURNAL_BATCH_MAX_ENTRIES
+from app.models import ReflectionJob
+
+
+def _entries(count):
+    return [
+        {"title": f"Offline {i}", "content": "Wrote this on the train.", "mood": "calm"}
+        for i in range(count)
+    ]
+
+
+def test_batch_reflects_concurrently_in_about_one_round_trip(
+    client, session, monkeypatch, auth_headers
+):
+    in_flight = peak = 0
+
+    async def slow_complete(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.2)
+        in_flight -= 1
+        return f"Reflection on {prompt.splitlines()[2]}"
+
+    monkeypatch.setattr(batch, "acomplete", slow_complete)
+    headers = auth_headers()
+    entries = _entries(30)
+    entries.insert(3, {"title": "No body", "mood": "calm"})
+
+    started = time.perf_counter()
+    res = client.post("/journals/batch", json={"entries": entries}, headers=headers)
+    elapsed = time.perf_counter() - started
+
+    assert res.status_code == 200
+    body = res.json()
+    assert (body["created"], body["invalid"], body["reflected"]) == (30, 1, 30)
+    assert body["items"][3] == {
+        "index": 3,
+        "status": "invalid",
+        "entry": None,
+        "error": "content: Field required",
+    }
+    first = body["items"][0]["entry"]
+    assert first["reflection"] == "Reflection on Title: Offline 0"
+    assert first["reflection_status"] == "done"
+    # 30 sequential calls would take 6 seconds
+    assert peak == 30
+    assert elapsed < 1.5
+
+    assert session.exec(select(func.count()).select_from(ReflectionJob)).one() == 0
+    stats = client.get("/journals/stats", headers=headers).json()
+    assert stats["total_entries"] == 30
+
+
+def test_failed_reflections_stay_queued_for_the_workers(
+    client, session, monkeypatch, auth_headers
+):
+    async def flaky_complete(prompt):
+        if "Offline 1" in prompt:
+            raise RuntimeError("upstream timeout")
+        return "Fine."
+
+    monkeypatch.setattr(batch, "acomplete", flaky_complete)
+    headers = auth_headers()
+    res = client.post("/journals/batch", json={"entries": _entries(3)}, headers=headers)
+
+    items = res.json()["items"]
+    assert [item["status"] for item in items] == ["created"] * 3
+    assert items[1]["error"] == "Reflection failed: upstream timeout (queued for retry)"
+    assert items[1]["entry"]["reflection_status"] == "pending"
+    assert items[2]["entry"]["reflection"] == "Fine."
+
+    job = session.exec(select(ReflectionJob)).one()
+    assert job.entry_id == items[1]["entry"]["id"]
+    assert (job.status, job.attempts, job.locked_at) == ("queued", 1, None)
+    assert job.last_error == "upstream timeout"
+
+
+def test_batch_counts_as_one_write_for_rate_limiting(client, monkeypatch, auth_headers):
+    async def complete(prompt):
+        return "Fine."
+
+    monkeypatch.setattr(batch, "acomplete", complete)
+    headers = auth_headers()
+    for _ in range(4):
+        res = client.post(
+            "/journals/batch", json={"entries": _entries(10)}, headers=headers
+        )
+        assert res.status_code == 200
+    single = {"title": "One more", "content": "Last one.", "mood": "calm"}
+    assert client.post("/journals", json=single, headers=headers).status_code == 200
+    res = client.post("/journals/batch", json={"entries": _entries(1)}, headers=headers)
+    assert res.status_code == 429
+
+
+def test_oversized_batches_are_rejected(client, auth_headers):
+    headers = auth_headers()
+    too_many = {"entries": _entries(JOURNAL_BATCH_MAX_ENTRIES + 1)}
+    res = client.post("/journals/batch", json=too_many, headers=headers)
+    assert res.status_code == 422
@@ -0,0 +1,69 @@
+import json
+from datetime import date
+
+from sqlmodel import Session, create_engine, func, select
+
+from app.analytics import rebuild_rollups
+from app.models import JournalDailyRollup, JournalEntry
+from app.streaks import compute_streak, read_streak
+from benchmarks import compare, datagen
+
+
+def test_seeded_data_is_reproducible_and_consistent(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'{n}.db'}") for n in (1, 2)]
+    seeded = [datagen.seed(e, 2, 60, seed=7, password_rounds=4) for e in engines]
+    assert [u.entries for u in seeded[0]] == [60, 60]
+
+    rows = []
+    for engine in engines:
+        with Session(engine) as session:
+            rows.append(
+                session.exec(
+                    select(JournalEntry.title, JournalEntry.mood).order_by(
+                        JournalEntry.id
+                    )
+                ).all()
+            )
+    assert rows[0] == rows[1]
+
+    # Rollups and streaks match what the app would have computed itself
+    with Session(engines[0]) as session:
+        user_id = seeded[0][0].id
+        streak = read_streak(session, user_id, date.today())
+        rollup_total = session.exec(
+            select(func.sum(JournalDailyRollup.count)).where(
+                JournalDailyRollup.user_id == user_id
+            )
+        ).one()
+        assert rollup_total == 60
+        assert rebuild_rollups(session, user_id) > 0
+        compute_streak(session, user_id)
+        assert read_streak(session, user_id, date.today()) == streak
+
+    # Seeding again reuses the existing users
+    again = datagen.seed(engines[0], 2, 60, seed=7, password_rounds=4)
+    assert [u.id for u in again] == [u.id for u in seeded[0]]
+
+
+def _results(path, rows):
+    payload = {"benchmark": "load", "key": ["endpoint"], "results": rows}
+    path.write_text(json.dumps(payload))
+    return str(path)
+
+
+def test_compare_flags_regressions_beyond_the_threshold(tmp_path, capsys):
+    before = _results(
+        tmp_path / "before.json",
+        [{"endpoint": "GET /journals", "requests": 100, "rps": 50.0, "p95_ms": 20.0}],
+    )
+    slower = _results(
+        tmp_path / "slower.json",
+        [{"endpoint": "GET /journals", "requests": 80, "rps": 40.0, "p95_ms": 21.0}],
+    )
+    assert compare.main([before, slower, "--threshold", "10"]) == 1
+    out = capsys.readouterr().out
+    assert "rps" in out and "-20.0%  REGRESSION" in out
+    assert "p95_ms" in out and "+5.0%" in out
+    assert out.count("REGRESSION") == 1  # request counts are never flagged
+
+    assert compare.main([before, slower, "--threshold", "25"]) == 0
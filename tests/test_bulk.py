@@ -0,0 +1,108 @@
+import csv
+import io
+
+import orjson
+from sqlmodel import func, select
+
+from app import bulk
+from app.models import JournalEntry, ReflectionJob
+from app.routes import journal_routes
+from tests.conftest import test_engine
+
+
+def _ndjson(count, start_day=1):
+    for i in range(count):
+        yield orjson.dumps(
+            {
+                "title": f"Imported {i}",
+                "content": "Rain on the window, tea on the desk.",
+                "mood": ("calm", "tired")[i % 2],
+                "created_at": f"2026-03-{start_day + i % 3:02d}T08:00:00Z",
+            }
+        ) + b"\n"
+
+
+def test_import_inserts_in_batches_and_keeps_derived_data(
+    client, session, monkeypatch, auth_headers
+):
+    monkeypatch.setattr(journal_routes, "JOURNAL_IMPORT_BATCH_SIZE", 4)
+    headers = auth_headers()
+    body = b"".join(_ndjson(10)) + b"not json\n" + b'{"title": "no body"}\n'
+
+    res = client.post("/journals/import", content=body, headers=headers)
+    assert res.status_code == 200
+    report = res.json()
+    assert report["imported"] == 10
+    assert report["failed"] == 2
+    assert [e["line"] for e in report["errors"]] == [11, 12]
+    assert report["rows_per_second"] > 0
+
+    stats = client.get("/journals/stats", headers=headers).json()
+    assert stats["total_entries"] == 10
+    assert stats["total_words"] == 80
+    summary = client.get("/journals/mood-summary", headers=headers).json()
+    assert summary == {"summary": {"calm": 5, "tired": 5}}
+    streak = client.get("/journals/streak", headers=headers).json()
+    assert streak["longest_streak"] == 3
+
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    jobs = session.exec(
+        select(func.count())
+        .select_from(ReflectionJob)
+        .join(JournalEntry, JournalEntry.id == ReflectionJob.entry_id)
+        .where(JournalEntry.user_id == user_id)
+    ).one()
+    assert jobs == 10
+
+
+def test_deferred_import_queues_no_reflections(client, session, auth_headers):
+    headers = auth_headers()
+    res = client.post(
+        "/journals/import?defer_reflections=true",
+        content=b"".join(_ndjson(3)),
+        headers=headers,
+    )
+    assert res.json()["imported"] == 3
+    items = client.get("/journals", headers=headers).json()["items"]
+    assert {item["reflection_status"] for item in items} == {"deferred"}
+    assert session.exec(select(func.count()).select_from(ReflectionJob)).one() == 0
+
+
+def test_export_round_trips_through_import(client, auth_headers):
+    alice = auth_headers()
+    client.post("/journals/import", content=b"".join(_ndjson(5)), headers=alice)
+
+    res = client.get("/journals/export", headers=alice)
+    assert res.headers["content-type"] == "application/x-ndjson"
+    lines = res.content.splitlines()
+    assert [orjson.loads(line)["title"] for line in lines] == [
+        "Imported 0",
+        "Imported 3",
+        "Imported 1",
+        "Imported 4",
+        "Imported 2",
+    ]
+
+    bob = auth_headers()
+    report = client.post("/journals/import", content=res.content, headers=bob).json()
+    assert report["imported"] == 5
+    again = client.get("/journals/export", headers=bob).content.splitlines()
+    strip = lambda line: {  # noqa: E731
+        k: v for k, v in orjson.loads(line).items() if k not in ("id", "updated_at")
+    }
+    assert [strip(line) for line in again] == [strip(line) for line in lines]
+
+    res = client.get("/journals/export?format=csv", headers=alice)
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert len(rows) == 5
+    assert rows[0]["created_at"] == "2026-03-01T08:00:00"
+
+
+def test_export_is_encoded_one_partition_at_a_time(client, monkeypatch, auth_headers):
+    headers = auth_headers()
+    client.post("/journals/import", content=b"".join(_ndjson(7)), headers=headers)
+    monkeypatch.setattr(bulk, "EXPORT_CHUNK_ROWS", 3)
+
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    chunks = list(bulk.export_entries(test_engine, user_id, "ndjson"))
+    assert [chunk.count(b"\n") for chunk in chunks] == [3, 3, 1]
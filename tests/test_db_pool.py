@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.auth import principal_cache
+from app.db_pool import PoolMetrics, TimedQueuePool, instrument
+from tests.conftest import test_engine
+
+
+def test_authenticated_request_checks_out_one_connection(client, auth_headers):
+    headers = auth_headers()
+    principal_cache.clear()  # force get_current_user to query the database
+
+    checkouts = []
+    record = lambda *args: checkouts.append(1)  # noqa: E731
+    event.listen(test_engine, "checkout", record)
+    try:
+        res = client.get("/journals", headers=headers)
+    finally:
+        event.remove(test_engine, "checkout", record)
+    assert res.status_code == 200
+    assert len(checkouts) == 1
+
+
+def test_pool_metrics_count_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    metrics = PoolMetrics()
+    instrument(engine, metrics)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        stats = metrics.snapshot()
+        assert stats["checked_out"] == 1
+    stats = metrics.snapshot()
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["connections_opened"] == 1
+    assert stats["checked_out"] == 0 and stats["size"] == 1
+    engine.dispose()
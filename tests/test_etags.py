@@ -0,0 +1,99 @@
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.ai.reflection_queue import finish_job
+from app.analytics import rebuild_rollups
+from app.models import ReflectionJob
+from tests.conftest import test_engine
+
+
+def _create(client, headers, title="Morning"):
+    res = client.post(
+        "/journals",
+        json={"title": title, "content": "Slept well.", "mood": "happy"},
+        headers=headers,
+    )
+    return res.json()["entry"]
+
+
+def test_unchanged_reads_answer_304_without_querying_entries(client, auth_headers):
+    headers = auth_headers()
+    _create(client, headers)
+
+    for path in ["/journals", "/journals/stats", "/journals/streak"]:
+        res = client.get(path, headers=headers)
+        assert res.status_code == 200
+        etag = res.headers["etag"]
+        assert etag.startswith('W/"')
+        assert res.headers["cache-control"] == "private, no-cache"
+
+        statements = []
+        record = lambda conn, cursor, sql, *args: statements.append(sql)  # noqa
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            res = client.get(path, headers={**headers, "If-None-Match": etag})
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+        assert res.status_code == 304
+        assert res.content == b""
+        assert res.headers["etag"] == etag
+        assert not [sql for sql in statements if "journalentry" in sql.lower()]
+
+
+def test_writes_change_the_etag(client, auth_headers):
+    headers = auth_headers()
+    entry = _create(client, headers)
+    etag = client.get("/journals", headers=headers).headers["etag"]
+
+    for write in (
+        lambda: _create(client, headers, "Evening"),
+        lambda: client.put(
+            f"/journals/{entry['id']}", json={"mood": "calm"}, headers=headers
+        ),
+        lambda: client.delete(f"/journals/{entry['id']}", headers=headers),
+    ):
+        write()
+        res = client.get("/journals", headers={**headers, "If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.headers["etag"] != etag
+        etag = res.headers["etag"]
+
+
+def test_finished_reflection_changes_the_etag(client, session, auth_headers):
+    headers = auth_headers()
+    entry = _create(client, headers)
+    etag = client.get("/journals", headers=headers).headers["etag"]
+
+    job = session.exec(
+        select(ReflectionJob).where(ReflectionJob.entry_id == entry["id"])
+    ).one()
+    finish_job(test_engine, job, "Nice rest.")
+
+    res = client.get("/journals", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["items"][0]["reflection"] == "Nice rest."
+
+
+def test_etags_differ_per_query_and_per_user(client, auth_headers):
+    alice, bob = auth_headers(), auth_headers()
+    first = client.get("/journals?limit=5", headers=alice).headers["etag"]
+    second = client.get("/journals?limit=6", headers=alice).headers["etag"]
+    other = client.get("/journals?limit=5", headers=bob).headers["etag"]
+    assert len({first, second, other}) == 3
+
+
+def test_rebuilding_rollups_changes_the_etag(client, auth_headers):
+    headers = auth_headers()
+    entry = _create(client, headers)
+    etags = {
+        path: client.get(path, headers=headers).headers["etag"]
+        for path in ["/journals/stats", "/journals/streak", "/journals/mood-trends"]
+    }
+
+    with Session(test_engine) as session:
+        rebuild_rollups(session, user_id=entry["user_id"])
+        session.commit()
+
+    for path, etag in etags.items():
+        res = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert res.status_code == 200
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app import health
+from app.health import HealthMonitor
+from app.routes import health_routes
+
+
+@pytest.fixture
+def pings(monkeypatch):
+    """Counts database pings; set ``pings.error`` or ``pings.delay`` to fail"""
+
+    class Pings:
+        count = 0
+        error = None
+        delay = 0.0
+
+    async def ping():
+        Pings.count += 1
+        await asyncio.sleep(Pings.delay)
+        if Pings.error:
+            raise Pings.error
+
+    monkeypatch.setattr(health, "ping_database", ping)
+    return Pings
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = HealthMonitor(interval=3600, stale_after=30, db_timeout=0.05)
+    monkeypatch.setattr(health_routes, "health_monitor", monitor)
+    return monitor
+
+
+def test_probes_read_the_cached_snapshot(client, pings, monitor):
+    ready = client.get("/health/ready")
+    detailed = client.get("/health/detailed")
+    assert ready.status_code == 200 and detailed.status_code == 200
+    assert pings.count == 1  # refreshed once, then served from the snapshot
+
+    body = detailed.json()
+    assert body["status"] == "healthy" and body["stale"] is False
+    assert body["age_seconds"] >= 0
+    assert set(body["checks"]) == {"database", "password_hasher", "memory", "disk"}
+    assert body["checks"]["database"]["pool"]["sync"]["size"] >= 1
+
+
+def test_failed_or_hung_database_makes_probes_fail(client, pings, monitor):
+    pings.error = RuntimeError("connection refused")
+    res = client.get("/health/ready")
+    assert res.status_code == 503
+    assert res.json()["error"]["error"] == "connection refused"
+    assert client.get("/health/detailed").status_code == 503
+
+    pings.error, pings.delay = None, 1.0
+    asyncio.run(monitor.refresh())
+    database = monitor.checks["database"]
+    assert (database["status"], database["error"]) == (
+        "unhealthy",
+        "no answer within 0.05s",
+    )
+
+
+def test_stale_snapshot_marks_the_service_degraded(pings):
+    async def scenario():
+        monitor = HealthMonitor(interval=3600, stale_after=30)
+        monitor.start()
+        while monitor.checks is None:
+            await asyncio.sleep(0.01)
+        fresh = await monitor.report()
+        monitor._checked_monotonic -= 31  # running, but no refresh since
+        stale = await monitor.report()
+        await monitor.stop()
+        return fresh, stale
+
+    fresh, stale = asyncio.run(scenario())
+    assert (fresh["status"], fresh["stale"]) == ("healthy", False)
+    assert (stale["status"], stale["stale"]) == ("degraded", True)
+    assert stale["age_seconds"] >= 31
+    assert pings.count == 1  # probes never run checks while the monitor runs
@@ -51,4 +51,69 @@ def test_empty_journal_list(client):
 
     res = client.get("/journals", headers=headers)
     assert res.status_code == 200
+    assert res.json() == {"items": [], "next_cursor": None}
+
+    res = client.get("/journals?paginate=false", headers=headers)
+    assert res.status_code == 200
     assert res.json() == []
+
+
+def test_journal_cursor_pagination(client, auth_headers):
+    headers = auth_headers()
+
+    for i in range(5):
+        client.post(
+            "/journals",
+            json={"title": f"Day {i}", "content": "Walked the dog.", "mood": "calm"},
+            headers=headers,
+        )
+
+    for path in ("/journals?limit=2", "/journals/filter?search=dog&limit=2"):
+        titles, url = [], path
+        while True:
+            page = client.get(url, headers=headers).json()
+            titles += [e["title"] for e in page["items"]]
+            if not page["next_cursor"]:
+                break
+            url = f"{path}&cursor={page['next_cursor']}"
+        assert sorted(titles) == [f"Day {i}" for i in range(5)], path
+        assert len(titles) == 5, path
+
+    newest = client.get("/journals?limit=2", headers=headers).json()["items"][0]
+    assert newest["title"] == "Day 4"
+    res = client.get("/journals?cursor=not-a-cursor", headers=headers)
+    assert res.status_code == 400
+
+
+def test_update_sets_updated_at_and_ignores_a_client_value(client, auth_headers):
+    headers = auth_headers()
+    entry = client.post(
+        "/journals",
+        json={"title": "t", "content": "c", "mood": "calm"},
+        headers=headers,
+    ).json()["entry"]
+
+    res = client.put(
+        f"/journals/{entry['id']}",
+        json={"title": "new", "updated_at": "1999-01-01T00:00:00"},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    updated = res.json()["entry"]
+    assert updated["title"] == "new"
+    assert updated["updated_at"] > entry["updated_at"]
+
+
+def test_update_rejects_null_for_required_fields(client, auth_headers):
+    headers = auth_headers()
+    entry = client.post(
+        "/journals",
+        json={"title": "t", "content": "c", "mood": "calm"},
+        headers=headers,
+    ).json()["entry"]
+
+    res = client.put(f"/journals/{entry['id']}", json={"title": None}, headers=headers)
+    assert res.status_code == 422
+    assert "title cannot be null" in res.text
+    res = client.get(f"/journals/{entry['id']}", headers=headers)
+    assert res.json()["title"] == "t"
@@ -0,0 +1,134 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from app import logger as logger_module
+from app.logger import (
+    LogThrottle,
+    QueueHandler,
+    configure_logging,
+    log_noisy,
+    parse_levels,
+    stop_logging,
+)
+
+
+@pytest.fixture
+def capture():
+    """configure_logging() into a buffer; call the result to flush and read it"""
+    stream = io.StringIO()
+
+    def configure(**options):
+        configure_logging(stream=stream, **options)
+
+        def lines():
+            stop_logging()  # drains the queue
+            return stream.getvalue().splitlines()
+
+        return lines
+
+    yield configure
+    configure_logging()
+
+
+class Expensive:
+    formatted = 0
+
+    def __str__(self):
+        Expensive.formatted += 1
+        return "expensive"
+
+
+def test_records_are_written_as_json_lines(capture):
+    lines = capture(fmt="json")
+    log = logging.getLogger("mindvault.test.json")
+    log.info("Entry %s saved", 42, extra={"user_id": 7})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("It broke")
+
+    saved, broke = [json.loads(line) for line in lines()]
+    assert saved["msg"] == "Entry 42 saved"
+    assert (saved["level"], saved["logger"], saved["user_id"]) == (
+        "INFO",
+        "mindvault.test.json",
+        7,
+    )
+    assert broke["level"] == "ERROR"
+    assert "ValueError: boom" in broke["exc"]
+
+
+def test_per_logger_levels_skip_formatting(capture):
+    assert parse_levels(" a=debug, b.c=WARNING,broken") == {
+        "a": "DEBUG",
+        "b.c": "WARNING",
+    }
+    lines = capture(fmt="text", levels="mindvault.test.quiet=WARNING")
+    quiet = logging.getLogger("mindvault.test.quiet")
+    quiet.info("not shown: %s", Expensive())
+    quiet.warning("shown")
+    assert Expensive.formatted == 0
+    (line,) = lines()
+    assert line.endswith("[WARNING] shown")
+
+
+def test_noisy_events_are_throttled_per_key(capture, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(logger_module, "throttle", LogThrottle(burst=2, window=60))
+    lines = capture(fmt="json")
+
+    for _ in range(5):
+        log_noisy("auth.invalid_token", logging.INFO, "Bad token %s", "x")
+    log_noisy("http.404", logging.INFO, "Not found")
+    log_noisy("auth.login", logging.INFO, "Login", sample_rate=0.0)
+    now[0] += 61
+    log_noisy("auth.invalid_token", logging.INFO, "Bad token %s", "y")
+
+    records = [json.loads(line) for line in lines()]
+    assert [r["event"] for r in records] == [
+        "auth.invalid_token",
+        "auth.invalid_token",
+        "http.404",
+        "auth.invalid_token",
+    ]
+    assert records[-1]["msg"] == "Bad token y (3 similar suppressed)"
+    assert records[-1]["suppressed"] == 3
+
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    log_queue = queue.Queue(maxsize=1)
+    handler = QueueHandler(log_queue)
+    log = logging.getLogger("mindvault.test.full")
+    for n in range(3):
+        handler.handle(log.makeRecord(log.name, logging.INFO, "", 0, "%d", (n,), None))
+    assert handler.dropped == 2
+
+    assert log_queue.get_nowait().getMessage() == "0"
+    handler.handle(log.makeRecord(log.name, logging.INFO, "", 0, "later", (), None))
+    assert log_queue.qsize() == 1  # the drop notice fits, the record does not
+    assert log_queue.get_nowait().getMessage() == "Log queue full, dropped 2 records"
+
+
+def test_dropped_records_are_counted_across_threads():
+    log_queue = queue.Queue(maxsize=50)
+    handler = QueueHandler(log_queue)
+    log = logging.getLogger("mindvault.test.threads")
+    record = log.makeRecord(log.name, logging.INFO, "", 0, "x", (), None)
+
+    def spam():
+        for _ in range(2000):
+            handler.handle(record)
+
+    threads = [threading.Thread(target=spam) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert log_queue.qsize() == 50
+    assert handler.dropped == 8 * 2000 - 50
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import create_engine
+
+from app.ai import openai_utils
+from app.metrics import MetricsRegistry, instrument_statements, metrics
+
+
+def _samples(body):
+    """{'name{labels}': value} for every sample line of a scrape"""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in body.splitlines()
+        if line and not line.startswith("#")
+    }
+
+
+def test_requests_are_counted_per_route_template(client, auth_headers):
+    headers = auth_headers()
+    metrics.reset()
+    for entry_id in (101, 102):
+        client.get(f"/journals/{entry_id}", headers=headers)
+    client.get("/no-such-page")
+
+    res = client.get("/metrics")
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(res.text)
+    route = 'method="GET",route="/journals/{entry_id}"'
+    assert samples[f'http_requests_total{{{route},status="404"}}'] == 2
+    assert samples[f"http_request_duration_seconds_count{{{route}}}"] == 2
+    assert samples[f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 2
+    assert samples[f"http_request_duration_seconds_sum{{{route}}}"] > 0
+    unmatched = 'http_requests_total{method="GET",route="unmatched",status="404"}'
+    assert samples[unmatched] == 1
+
+
+def test_statements_are_timed_by_type():
+    registry = MetricsRegistry(directory=None)
+    engine = instrument_statements(create_engine("sqlite://"), registry)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1), (2)"))
+        conn.execute(text("SELECT x FROM t")).all()
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT nope FROM t"))
+
+    samples = _samples(registry.render())
+    count = "db_statement_duration_seconds_count"
+    assert samples[f'{count}{{operation="insert"}}'] == 1
+    assert samples[f'{count}{{operation="select"}}'] == 1
+    assert samples[f'{count}{{operation="other"}}'] == 1
+    assert samples['db_statement_errors_total{operation="select"}'] == 1
+
+
+def test_worker_snapshots_are_summed(tmp_path):
+    this_worker = MetricsRegistry(directory=str(tmp_path))
+    other_worker = MetricsRegistry(directory=str(tmp_path))
+    for registry, seconds in ((this_worker, 0.003), (other_worker, 0.2)):
+        registry.inc("http_requests_total", ("GET", "/health", "200"))
+        registry.observe("http_request_duration_seconds", ("GET", "/health"), seconds)
+    other_worker.write()
+    this_worker.write()  # its own file must not be counted twice
+
+    samples = _samples(this_worker.render())
+    labels = 'method="GET",route="/health"'
+    assert samples[f'http_requests_total{{{labels},status="200"}}'] == 2
+    bucket = "http_request_duration_seconds_bucket"
+    assert samples[f'{bucket}{{{labels},le="0.005"}}'] == 1
+    assert samples[f'{bucket}{{{labels},le="0.25"}}'] == 2
+    assert samples[f"http_request_duration_seconds_sum{{{labels}}}"] == 0.203
+
+
+def test_exited_workers_are_folded_into_one_file(tmp_path):
+    live = MetricsRegistry(directory=str(tmp_path))
+    live.inc("http_requests_total", ("GET", "/health", "200"))
+    live.write()
+    for _ in range(2):
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        gone = MetricsRegistry(directory=str(tmp_path))
+        gone._filename = f"{exited.pid}-{1_000_000_000}.json"
+        gone.inc("http_requests_total", ("GET", "/health", "200"), 2)
+        gone.write()
+        assert live.compact() == 1
+
+    assert sorted(p for p in os.listdir(tmp_path) if p.endswith(".json")) == [
+        live._filename,
+        "retired.json",
+    ]
+    scraper = MetricsRegistry(directory=str(tmp_path))
+    samples = _samples(scraper.render())
+    assert (
+        samples['http_requests_total{method="GET",route="/health",status="200"}'] == 5
+    )
+    assert live.compact() == 0  # the live worker's snapshot stays
+
+
+def test_openai_latency_and_errors_are_recorded(monkeypatch):
+    calls = []
+
+    async def create(model, messages, temperature, **kwargs):
+        calls.append(messages)
+        if len(calls) == 2:
+            raise RuntimeError("rate limited")
+        message = SimpleNamespace(content="Fine.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(openai_utils, "get_async_client", lambda: client)
+    monkeypatch.setattr(openai_utils, "get_semaphore", asyncio.Semaphore)
+    metrics.reset()
+
+    assert asyncio.run(openai_utils.acomplete("a", use_cache=False)) == "Fine."
+    assert asyncio.run(openai_utils.ask_gpt("b")) == "Error from OpenAI: rate limited"
+
+    samples = _samples(metrics.render())
+    count = "openai_request_duration_seconds_count"
+    assert samples[f'{count}{{kind="completion",outcome="ok"}}'] == 1
+    assert samples[f'{count}{{kind="completion",outcome="error"}}'] == 1
@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app import auth
+from app.models import User
+from app.passwords import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    _hash,
+    make_context,
+)
+
+
+def test_pool_hashes_and_verifies_in_worker_processes():
+    hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+    try:
+        hashed = hasher.hash("s3cret")
+        assert hashed.startswith("$2b$04$")
+        assert hasher.verify("s3cret", hashed)
+        assert not hasher.verify("wrong", hashed)
+        assert hasher.stats()["pending"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_pool_rejects_instead_of_queueing():
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=4)
+    try:
+        in_flight = hasher._submit(_hash, "first", 4)
+        with pytest.raises(PasswordHasherBusy) as busy:
+            hasher.hash("second")
+        assert busy.value.status_code == 503
+        assert hasher.stats()["rejected"] == 1
+
+        in_flight.result()
+        assert hasher.verify("first", in_flight.result())
+    finally:
+        hasher.shutdown()
+
+
+def test_busy_login_answers_503_with_retry_after(client, monkeypatch):
+    email = f"testuser_{uuid.uuid4().hex[:6]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "pw"})
+
+    saturated = PasswordHasher(workers=1, max_pending=0)
+    monkeypatch.setattr(auth, "password_hasher", saturated)
+    res = client.post("/auth/login", data={"username": email, "password": "pw"})
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+
+
+def test_login_rehashes_password_stored_with_another_cost(client, session):
+    email = f"testuser_{uuid.uuid4().hex[:6]}@example.com"
+    session.add(User(email=email, hashed_password=make_context(4).hash("pw")))
+    session.commit()
+
+    hasher = auth.password_hasher
+    res = client.post("/auth/login", data={"username": email, "password": "pw"})
+    assert res.status_code == 200
+
+    session.expire_all()
+    stored = session.exec(select(User).where(User.email == email)).one()
+    assert stored.hashed_password.startswith(f"$2b${hasher.rounds:02d}$")
+    assert not hasher.needs_rehash(stored.hashed_password)
+    assert hasher.verify("pw", stored.hashed_password)
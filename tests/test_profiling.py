@@ -0,0 +1,106 @@
+import json
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.commands import profiles
+from app.main import app as main_app
+from app.profiling import ProfilingMiddleware, prune
+
+
+def _crunch(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(200))
+
+
+def _client(directory, **options):
+    api = FastAPI()
+
+    @api.get("/sync/{n}")
+    def sync_route(n: int):
+        _crunch(0.08)
+        return {"n": n}
+
+    @api.get("/async")
+    async def async_route():
+        _crunch(0.08)
+        return {}
+
+    options.setdefault("sample_rate", 0)
+    options.setdefault("token", "s3cret")
+    api.add_middleware(
+        ProfilingMiddleware, directory=str(directory), interval_ms=1, **options
+    )
+    return TestClient(api)
+
+
+def _dumps(directory):
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def test_disabled_profiler_is_not_installed():
+    assert not any(m.cls is ProfilingMiddleware for m in main_app.user_middleware)
+
+
+def test_admin_header_profiles_a_sync_handler(tmp_path, capsys):
+    client = _client(tmp_path)
+    res = client.get("/sync/7", headers={"X-Profile": "s3cret"})
+    profile_id = res.headers["x-profile-id"]
+    assert _dumps(tmp_path) == [f"{profile_id}.collapsed", f"{profile_id}.json"]
+
+    meta = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert meta["route"] == "/sync/{n}"
+    assert (meta["method"], meta["path"], meta["status"]) == ("GET", "/sync/7", 200)
+    assert meta["user"] == "ip:testclient"
+    assert meta["duration_ms"] >= 80
+    # Sample counts follow the wall clock; only require that some were taken
+    assert meta["thread_samples"] >= 1
+    stacks = (tmp_path / f"{profile_id}.collapsed").read_text()
+    assert "sync_route;tests.test_profiling._crunch" in stacks
+
+    profiles.main(["--dir", str(tmp_path), "--route", "/sync/{n}", "--top", "3"])
+    out = capsys.readouterr().out
+    assert "/sync/{n}" in out
+    assert "tests.test_profiling._crunch" in out
+
+
+def test_async_handlers_are_sampled_on_the_event_loop(tmp_path):
+    client = _client(tmp_path, sample_rate=1.0)
+    res = client.get("/async")
+    assert "x-profile-id" not in res.headers  # sampled, not requested
+    (meta_file,) = [name for name in _dumps(tmp_path) if name.endswith(".json")]
+    meta = json.loads((tmp_path / meta_file).read_text())
+    assert meta["loop_samples"] >= 1
+    assert meta["requested"] is False
+    stacks = (tmp_path / meta_file.replace(".json", ".collapsed")).read_text()
+    assert "async_route;tests.test_profiling._crunch" in stacks
+
+
+def test_wrong_token_is_not_profiled(tmp_path):
+    client = _client(tmp_path)
+    res = client.get("/sync/1", headers={"X-Profile": "guess"})
+    assert res.status_code == 200
+    assert "x-profile-id" not in res.headers
+    assert _dumps(tmp_path) == []
+
+
+def test_rotation_drops_the_oldest_dumps(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"dump-{i}.collapsed"
+        path.write_text("x" * 100)
+        os.utime(path, (i, i))
+    prune(str(tmp_path), max_bytes=250)
+    assert _dumps(tmp_path) == ["dump-3.collapsed", "dump-4.collapsed"]
+
+
+def test_rotation_removes_both_files_of_a_dump(tmp_path):
+    for i in range(3):
+        for suffix, size in ((".collapsed", 100), (".json", 20)):
+            path = tmp_path / f"dump-{i}{suffix}"
+            path.write_text("x" * size)
+            os.utime(path, (i, i))
+    prune(str(tmp_path), max_bytes=200)
+    assert _dumps(tmp_path) == ["dump-2.collapsed", "dump-2.json"]
@@ -0,0 +1,78 @@
+"""EXPLAIN the statements the journal routes really issue.
+
+Every statement the app sends while exercising the routes is captured and
+replayed as ``EXPLAIN QUERY PLAN`` against a fresh SQLite schema built from
+the models. A ``SCAN <table>`` step means a full table (or full index) scan,
+i.e. a lookup that lost its index.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.models import SQLModel
+from app.pagination import encode_cursor
+from tests.conftest import test_engine
+
+
+@pytest.fixture()
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(
+            ("SELECT", "UPDATE", "DELETE")
+        ):
+            statements.append((statement, parameters))
+
+    event.listen(test_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(test_engine, "before_cursor_execute", capture)
+
+
+def _exercise_journal_routes(client, headers):
+    entry = {"title": "Plan", "content": "Index me.", "mood": "calm"}
+    entry_id = client.post("/journals", json=entry, headers=headers).json()["entry"][
+        "id"
+    ]
+    recent = encode_cursor("recent", [datetime.utcnow(), entry_id + 1])
+    relevant = encode_cursor("relevance", [-100.0, datetime.utcnow(), entry_id + 1])
+    for path in (
+        "/journals",
+        f"/journals?limit=1&cursor={recent}",
+        f"/journals/filter?search=index&sort=recent&cursor={recent}",
+        f"/journals/filter?search=index&cursor={relevant}",
+        "/journals/filter?mood=calm&search=index&start_date=2020-01-01T00:00:00",
+        "/journals/filter?search=index&sort=recent",
+        "/journals/mood-summary?start_date=2020-01-01T00:00:00",
+        "/journals/mood-trends",
+        "/journals/streak",
+        "/journals/stats",
+        "/journals/7-day-summary",
+        f"/journals/{entry_id}",
+        f"/journals/{entry_id}/reflection",
+    ):
+        assert client.get(path, headers=headers).status_code == 200, path
+    client.put(f"/journals/{entry_id}", json=entry, headers=headers)
+    client.delete(f"/journals/{entry_id}", headers=headers)
+
+
+def test_journal_routes_never_scan_tables(client, captured_statements, auth_headers):
+    _exercise_journal_routes(client, auth_headers())
+    assert captured_statements
+
+    tables = set(SQLModel.metadata.tables)
+    scans = []
+    with test_engine.connect() as conn:
+        for statement, parameters in captured_statements:
+            plan = conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).fetchall()
+            for row in plan:
+                detail = row[-1]
+                words = detail.split()
+                if words[0] == "SCAN" and words[1] in tables:
+                    scans.append(f"{detail}\n    in: {statement}")
+
+    assert not scans, "Sequential scans found:\n" + "\n".join(scans)
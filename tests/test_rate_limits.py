@@ -0,0 +1,56 @@
+import multiprocessing
+import time
+
+from limits import parse
+from limits.strategies import FixedWindowRateLimiter
+
+from app.rate_limit_storage import SQLiteStorage
+
+
+def _hammer(uri: str, start, hits: int, results) -> None:
+    storage = SQLiteStorage(uri)
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse("5/minute")
+    start.wait()
+    results.put(sum(limiter.hit(item, "login", "10.0.0.1") for _ in range(hits)))
+
+
+def test_worker_processes_share_one_budget(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'ratelimit.db'}"
+    ctx = multiprocessing.get_context("spawn")
+    start, results = ctx.Event(), ctx.Queue()
+    workers = [
+        ctx.Process(target=_hammer, args=(uri, start, 10, results)) for _ in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    start.set()
+    allowed = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join()
+    # In-memory storage would have allowed 5 per process
+    assert sum(allowed) == 5
+
+
+def test_expired_windows_restart_and_are_swept(tmp_path):
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'var' / 'ratelimit.db'}")
+    assert storage.incr("a", expiry=0.05) == 1
+    assert storage.incr("a", expiry=0.05) == 2
+    storage.incr("b", expiry=60)
+    time.sleep(0.1)
+
+    assert storage.get("a") == 0
+    assert storage.incr("a", expiry=0.05) == 1
+    time.sleep(0.1)
+    assert storage.sweep() == 1
+    assert storage.get("b") == 1
+
+
+def test_limits_are_per_user_with_a_token_and_per_ip_without(client, auth_headers):
+    alice, bob = auth_headers(), auth_headers()
+    entry = {"title": "t", "content": "c", "mood": "calm"}
+    for _ in range(5):
+        assert client.post("/journals", json=entry, headers=alice).status_code == 200
+    assert client.post("/journals", json=entry, headers=alice).status_code == 429
+    # Same client IP, different user: its own budget
+    assert client.post("/journals", json=entry, headers=bob).status_code == 200
@@ -0,0 +1,91 @@
+import asyncio
+
+from app.ai.reflection_cache import CachedCompletion, ReflectionCache, cache_key
+from tests.conftest import test_engine
+
+
+def _counting_compute(calls, text="answer", delay=0.0):
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return CachedCompletion(text=text, total_tokens=40, latency_ms=1500)
+
+    return compute
+
+
+def test_key_ignores_whitespace_but_not_parameters():
+    base = cache_key("gpt", 0.7, "sys", "Hello   world\n")
+    assert base == cache_key("gpt", 0.7, "sys", " Hello world")
+    assert base != cache_key("gpt", 0.2, "sys", "Hello world")
+    assert base != cache_key("gpt-4", 0.7, "sys", "Hello world")
+    assert base != cache_key("gpt", 0.7, "other", "Hello world")
+
+
+def test_concurrent_identical_requests_share_one_call():
+    cache = ReflectionCache(engine=test_engine)
+    calls = []
+
+    async def run():
+        compute = _counting_compute(calls, delay=0.02)
+        return await asyncio.gather(
+            *(cache.get_or_compute("k", "gpt", compute) for _ in range(5))
+        )
+
+    assert asyncio.run(run()) == ["answer"] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["tokens_saved"] == 160
+
+
+def test_lru_evicts_oldest_and_ttl_expires():
+    cache = ReflectionCache(engine=test_engine, max_size=2, persist=False)
+    calls = []
+    compute = _counting_compute(calls)
+
+    async def get(key):
+        return await cache.get_or_compute(key, "gpt", compute)
+
+    for key in ("a", "b", "a", "c", "a", "b"):
+        asyncio.run(get(key))
+    # "b" was evicted when "c" arrived; "a" stayed hot
+    assert len(calls) == 4
+
+    expired = ReflectionCache(engine=test_engine, ttl_seconds=0, persist=False)
+    asyncio.run(expired.get_or_compute("x", "gpt", compute))
+    asyncio.run(expired.get_or_compute("x", "gpt", compute))
+    assert len(calls) == 6
+
+
+def test_persistent_tier_survives_restart():
+    calls = []
+    compute = _counting_compute(calls)
+    asyncio.run(ReflectionCache(engine=test_engine).get_or_compute("k", "gpt", compute))
+
+    restarted = ReflectionCache(engine=test_engine)
+    result = asyncio.run(restarted.get_or_compute("k", "gpt", compute))
+    assert result == "answer"
+    assert len(calls) == 1
+    assert restarted.stats()["db_hits"] == 1
+
+
+def test_errors_are_not_cached():
+    cache = ReflectionCache(engine=test_engine)
+
+    async def broken():
+        raise RuntimeError("rate limited")
+
+    for _ in range(2):
+        try:
+            asyncio.run(cache.get_or_compute("k", "gpt", broken))
+        except RuntimeError:
+            pass
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_stats_require_a_login(client, auth_headers):
+    assert client.get("/api/ai/cache-stats").status_code == 401
+    res = client.get("/api/ai/cache-stats", headers=auth_headers())
+    assert res.status_code == 200
+    assert "hit_ratio" in res.json()
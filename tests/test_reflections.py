@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlmodel import select
+
+from app.ai import openai_utils, reflection_queue
+from app.ai.reflection_queue import ReflectionWorkerPool, enqueue_reflection
+from app.models import JournalEntry, ReflectionJob, User
+from tests.conftest import test_engine
+
+
+def _queued_entry(session):
+    user = User(email=f"worker_{uuid.uuid4().hex[:6]}@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    entry = JournalEntry(
+        title="Walk", content="Long walk.", mood="calm", user_id=user.id
+    )
+    session.add(entry)
+    session.flush()
+    enqueue_reflection(session, entry)
+    session.commit()
+    return entry.id
+
+
+def test_create_journal_does_not_call_ai(client, monkeypatch, auth_headers):
+    def fail(*args, **kwargs):
+        raise AssertionError("AI must not run inside the request")
+
+    monkeypatch.setattr(openai_utils, "get_async_client", fail)
+    headers = auth_headers()
+
+    res = client.post(
+        "/journals",
+        json={"title": "Morning", "content": "Slept well.", "mood": "happy"},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    entry = res.json()["entry"]
+    assert entry["reflection_status"] == "pending"
+    assert entry["reflection"] is None
+
+    res = client.get(f"/journals/{entry['id']}/reflection", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["reflection_status"] == "pending"
+
+
+def test_worker_fills_in_reflection(session):
+    entry_id = _queued_entry(session)
+
+    async def fake_complete(prompt):
+        assert "Long walk." in prompt
+        return "Nice walk."
+
+    pool = ReflectionWorkerPool(engine=test_engine, complete=fake_complete)
+    assert asyncio.run(pool.run_once()) is True
+    assert asyncio.run(pool.run_once()) is False
+
+    session.expire_all()
+    entry = session.get(JournalEntry, entry_id)
+    assert entry.reflection == "Nice walk."
+    assert entry.reflection_status == "done"
+    assert session.exec(select(ReflectionJob)).all() == []
+
+
+def test_failed_job_is_retried_then_marked_failed(session, monkeypatch):
+    monkeypatch.setattr(reflection_queue, "REFLECTION_MAX_ATTEMPTS", 2)
+    entry_id = _queued_entry(session)
+
+    async def broken_complete(prompt):
+        raise RuntimeError("upstream timeout")
+
+    pool = ReflectionWorkerPool(engine=test_engine, complete=broken_complete)
+    assert asyncio.run(pool.run_once()) is True
+
+    session.expire_all()
+    job = session.exec(select(ReflectionJob)).one()
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.available_at > datetime.utcnow()
+    assert job.last_error == "upstream timeout"
+
+    # Backoff keeps the job hidden until it is due
+    assert asyncio.run(pool.run_once()) is False
+    job.available_at = datetime.utcnow()
+    session.add(job)
+    session.commit()
+    assert asyncio.run(pool.run_once()) is True
+
+    session.expire_all()
+    job = session.exec(select(ReflectionJob)).one()
+    assert job.status == "failed"
+    assert session.get(JournalEntry, entry_id).reflection_status == "failed"
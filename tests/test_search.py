@@ -0,0 +1,75 @@
+from tests.conftest import test_engine
+from app.search import fts_backend
+
+
+def _create(client, headers, title, content):
+    res = client.post(
+        "/journals",
+        json={"title": title, "content": content, "mood": "calm"},
+        headers=headers,
+    )
+    return res.json()["entry"]["id"]
+
+
+def test_search_prefix_matches_and_ranks_title_hits_first(client, auth_headers):
+    headers = auth_headers()
+    _create(client, headers, "Groceries", "Bought apples after my meditation class.")
+    _create(client, headers, "Meditation morning", "Sat quietly for ten minutes.")
+    _create(client, headers, "Work", "Long meeting about budgets.")
+
+    res = client.get("/journals/filter?search=medit", headers=headers)
+    assert res.status_code == 200
+    titles = [e["title"] for e in res.json()["items"]]
+    assert titles == ["Meditation morning", "Groceries"]
+    if fts_backend(test_engine):
+        assert "<mark>meditation</mark>" in res.json()["items"][1]["snippet"]
+
+    res = client.get("/journals/filter?search=medit&sort=recent", headers=headers)
+    assert [e["title"] for e in res.json()["items"]] == [
+        "Meditation morning",
+        "Groceries",
+    ]
+    if fts_backend(test_engine):
+        assert "<mark>meditation</mark>" in res.json()["items"][1]["snippet"]
+
+
+def test_search_index_follows_updates_and_deletes(client, auth_headers):
+    headers = auth_headers()
+    entry_id = _create(client, headers, "Hiking", "Climbed the ridge trail.")
+
+    client.put(
+        f"/journals/{entry_id}",
+        json={"title": "Swimming", "content": "Laps at the pool.", "mood": "calm"},
+        headers=headers,
+    )
+    assert (
+        client.get("/journals/filter?search=ridge", headers=headers).status_code == 404
+    )
+    assert (
+        client.get("/journals/filter?search=laps", headers=headers).status_code == 200
+    )
+
+    client.delete(f"/journals/{entry_id}", headers=headers)
+    assert (
+        client.get("/journals/filter?search=laps", headers=headers).status_code == 404
+    )
+
+
+def test_search_is_scoped_to_the_user(client, auth_headers):
+    alice, bob = auth_headers(), auth_headers()
+    _create(client, alice, "Secret", "Only alice writes about zeppelins.")
+    assert (
+        client.get("/journals/filter?search=zeppelin", headers=bob).status_code == 404
+    )
+
+
+def test_search_snippets_escape_entry_markup(client, auth_headers):
+    headers = auth_headers()
+    _create(client, headers, "Note", 'Trail <img src=x onerror="alert(1)"> sunrise')
+
+    res = client.get("/journals/filter?search=sunrise", headers=headers)
+    snippet = res.json()["items"][0]["snippet"]
+    if fts_backend(test_engine):
+        assert "<img" not in snippet
+        assert "&lt;img" in snippet
+        assert "<mark>sunrise</mark>" in snippet
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.compression import negotiate
+from app.models import JournalEntry
+from app.schemas.journal_schemas import JournalEntryResponse
+
+
+def _seed(session, user_id, count):
+    session.execute(
+        insert(JournalEntry),
+        [
+            {
+                "title": f"Entry {i}",
+                "content": "Walked by the river and thought about work. " * 5,
+                "mood": "calm",
+                "user_id": user_id,
+                "created_at": datetime(2026, 1, 1, 8, 30, i % 60, i * 1000),
+                "updated_at": datetime(2026, 1, 1, 9, 0),
+            }
+            for i in range(count)
+        ],
+    )
+    session.commit()
+
+
+def test_row_path_matches_the_response_model(client, session, auth_headers):
+    headers = auth_headers()
+    _seed(session, client.get("/users/me", headers=headers).json()["id"], 3)
+
+    items = client.get("/journals", headers=headers).json()["items"]
+    for item in items:
+        single = client.get(f"/journals/{item['id']}", headers=headers).json()
+        assert item == single
+        assert JournalEntryResponse.model_validate(item).model_dump(mode="json") == item
+
+
+def test_large_bodies_are_compressed_as_negotiated(client, session, auth_headers):
+    headers = auth_headers()
+    _seed(session, client.get("/users/me", headers=headers).json()["id"], 50)
+
+    res = client.get("/journals", headers={**headers, "Accept-Encoding": "gzip, br"})
+    assert res.headers["content-encoding"] == "br"
+    assert len(res.json()["items"]) == 20
+
+    res = client.get(
+        "/journals", headers={**headers, "Accept-Encoding": "br;q=0.5, gzip"}
+    )
+    assert res.headers["content-encoding"] == "gzip"
+
+    res = client.get("/journals", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+
+    # Below COMPRESSION_MIN_BYTES
+    res = client.get("/journals/streak", headers=headers)
+    assert "content-encoding" not in res.headers
+
+
+def test_negotiate_honours_q_values():
+    assert negotiate("") is None
+    assert negotiate("gzip;q=0, br;q=0") is None
+    assert negotiate("*") == "br"
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("br;q=0.2, gzip;q=0.8") == "gzip"
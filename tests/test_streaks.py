@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.analytics import rebuild_rollups, rollup_entry_added
+from tests.conftest import test_engine
+from app.models import JournalEntry, UserStreak
+from app.streaks import compute_streak, streak_entry_added
+
+
+def _backdate(user_id, days_ago):
+    """Insert an entry the way create_journal does, but in the past."""
+    with Session(test_engine) as session:
+        entry = JournalEntry(
+            title="t",
+            content="c",
+            mood="calm",
+            user_id=user_id,
+            created_at=datetime.utcnow() - timedelta(days=days_ago),
+        )
+        session.add(entry)
+        session.flush()
+        rollup_entry_added(session, entry)
+        streak_entry_added(session, user_id, entry.created_at)
+        session.commit()
+        return entry.id
+
+
+def test_streak_state_tracks_creates_and_deletes(client, auth_headers):
+    headers = auth_headers()
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+
+    def streak():
+        return client.get("/journals/streak", headers=headers).json()
+
+    assert streak() == {"current_streak": 0, "longest_streak": 0}
+    client.post(
+        "/journals",
+        json={"title": "t", "content": "c", "mood": "calm"},
+        headers=headers,
+    )
+    assert streak() == {"current_streak": 1, "longest_streak": 1}
+
+    _backdate(user_id, 1)
+    _backdate(user_id, 2)
+    _backdate(user_id, 5)
+    _backdate(user_id, 4)
+    assert streak() == {"current_streak": 3, "longest_streak": 3}
+
+    bridge = _backdate(user_id, 3)
+    assert streak() == {"current_streak": 6, "longest_streak": 6}
+
+    client.delete(f"/journals/{bridge}", headers=headers)
+    assert streak() == {"current_streak": 3, "longest_streak": 3}
+
+    with Session(test_engine) as session:
+        cached = session.get(UserStreak, user_id).model_dump()
+        assert compute_streak(session, user_id).model_dump() == cached
+
+
+def test_streak_is_computed_for_users_without_state(client, auth_headers):
+    headers = auth_headers()
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    _backdate(user_id, 9)
+    _backdate(user_id, 8)
+    with Session(test_engine) as session:
+        session.delete(session.get(UserStreak, user_id))
+        session.commit()
+
+    res = client.get("/journals/streak", headers=headers).json()
+    assert res == {"current_streak": 0, "longest_streak": 2}
+
+
+def test_rebuilding_rollups_refreshes_the_streak(client, auth_headers):
+    headers = auth_headers()
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    _backdate(user_id, 0)
+    assert client.get("/journals/streak", headers=headers).json() == {
+        "current_streak": 1,
+        "longest_streak": 1,
+    }
+
+    # Imported behind the API's back: no rollup or streak bookkeeping
+    with Session(test_engine) as session:
+        for days_ago in (1, 2, 3):
+            session.execute(
+                text(
+                    "INSERT INTO journalentry (title, content, mood, user_id, "
+                    "created_at, updated_at, reflection_status, word_count, "
+                    "char_count) VALUES ('t', 'c', 'calm', :user_id, :at, :at, "
+                    "'done', 1, 1)"
+                ),
+                {
+                    "user_id": user_id,
+                    "at": datetime.utcnow() - timedelta(days=days_ago),
+                },
+            )
+        session.commit()
+        rebuild_rollups(session)
+        session.commit()
+
+    res = client.get("/journals/streak", headers=headers).json()
+    assert res == {"current_streak": 4, "longest_streak": 4}
+
+
+def test_first_write_tolerates_a_concurrently_created_state_row(client, auth_headers):
+    headers = auth_headers()
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    with Session(test_engine) as session:
+        assert session.get(UserStreak, user_id) is None
+        # Another request creates the row after this one has looked for it
+        with Session(test_engine) as other:
+            compute_streak(other, user_id)
+            other.commit()
+
+        entry = JournalEntry(title="t", content="c", mood="calm", user_id=user_id)
+        session.add(entry)
+        session.flush()
+        rollup_entry_added(session, entry)
+        streak_entry_added(session, user_id, entry.created_at)
+        session.commit()
+
+    res = client.get("/journals/streak", headers=headers).json()
+    assert res == {"current_streak": 1, "longest_streak": 1}